@@ -0,0 +1,51 @@
+import os
+import statistics
+import subprocess
+import sys
+
+# Czas importu modułów klienta w świeżym interpreterze (python -X importtime)
+# oraz najcięższe moduły ładowane przez start_client. Pozwala śledzić czas
+# startu węzła bez GUI. Uruchomienie: python -m benchmarks.bench_startup
+
+MODULES = [
+    "start_client",
+    "sensors.sensor_manager",
+    "logger.logger",
+    "network.async_client",
+    "gui.gui",
+    "gui.views.sensor_plot_view",
+]
+REPEATS = 5
+TOP = 10
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def import_times(module):
+    # Słownik moduł -> skumulowany czas importu w us (ostatni wpis wygrywa)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+def main():
+    print(f"{'moduł':<30}{'import ms (mediana)':>22}{'matplotlib':>12}{'tkinter':>10}")
+    for module in MODULES:
+        runs = [import_times(module) for _ in range(REPEATS)]
+        median_ms = statistics.median(run[module] for run in runs) / 1000
+        loaded = runs[0]
+        print(f"{module:<30}{median_ms:>22.1f}{'tak' if 'matplotlib' in loaded else 'nie':>12}"
+              f"{'tak' if 'tkinter' in loaded else 'nie':>10}")
+
+    print(f"\nNajcięższe importy start_client (top {TOP}, ms):")
+    heaviest = sorted(import_times("start_client").items(), key=lambda item: item[1], reverse=True)
+    for name, cumulative in heaviest[1:TOP + 1]:
+        print(f"  {name:<40}{cumulative / 1000:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import json
+import time
+from datetime import datetime, timedelta
+from network.batch import encode_batch
+from network.wire import BinaryEncoder, BinaryDecoder, HEADER
+
+# Porównanie formatu JSON (linie) z binarnym: koszt kodowania/dekodowania
+# i liczba bajtów na odczyt. Uruchomienie: python -m benchmarks.bench_wire_format
+
+READINGS = 10_000
+BATCH = 50
+SENSORS = ["T1", "H1", "P1", "L1"]
+
+def make_readings(n):
+    start = datetime(2025, 5, 26, 12, 0, 0)
+    return [{
+        "type": "logger_event",
+        "event": "log_reading",
+        "timestamp": (start + timedelta(seconds=i)).isoformat(),
+        "details": {
+            "timestamp": (start + timedelta(seconds=i)).isoformat(),
+            "sensor_id": SENSORS[i % len(SENSORS)],
+            "sensor_name": f"Czujnik {SENSORS[i % len(SENSORS)]}",
+            "value": 20.0 + (i % 100) / 10,
+            "unit": "°C",
+            "filename": "./logs/sensors_20250526.csv",
+            "buffer_size": 100
+        }
+    } for i in range(n)]
+
+def batches(messages):
+    return [encode_batch(messages[i:i + BATCH]) for i in range(0, len(messages), BATCH)]
+
+def bench_json(frames):
+    started = time.perf_counter()
+    encoded = [(json.dumps(frame) + '\n').encode('utf-8') for frame in frames]
+    encode_s = time.perf_counter() - started
+    started = time.perf_counter()
+    for raw in encoded:
+        json.loads(raw)
+    decode_s = time.perf_counter() - started
+    return encode_s, decode_s, sum(len(raw) for raw in encoded)
+
+def bench_binary(frames):
+    encoder, decoder = BinaryEncoder(), BinaryDecoder()
+    started = time.perf_counter()
+    encoded = [encoder.encode(frame, seq) for seq, frame in enumerate(frames)]
+    encode_s = time.perf_counter() - started
+    started = time.perf_counter()
+    for raw in encoded:
+        view = memoryview(raw)
+        length, kind, _ = HEADER.unpack_from(view)
+        decoder.decode(kind, view[HEADER.size:HEADER.size + length])
+    decode_s = time.perf_counter() - started
+    return encode_s, decode_s, sum(len(raw) for raw in encoded)
+
+def main():
+    messages = make_readings(READINGS)
+    cases = [
+        ("json / pojedyncze", messages, bench_json),
+        ("json / batch", batches(messages), bench_json),
+        ("binary / pojedyncze", messages, bench_binary),
+        ("binary / batch", batches(messages), bench_binary),
+    ]
+    print(f"{'format':<22}{'enc us/odczyt':>15}{'dec us/odczyt':>15}{'B/odczyt':>10}")
+    for name, frames, bench in cases:
+        encode_s, decode_s, size = bench(frames)
+        print(f"{name:<22}{encode_s / READINGS * 1e6:>15.2f}{decode_s / READINGS * 1e6:>15.2f}{size / READINGS:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -1,66 +1,100 @@
 from gui.window import Window
-import tkinter as tk
-from tkinter import ttk
 from gui.views.default_view import DefaultView
 from sensors.sensor_manager import SensorManager
-from gui.views.sensor_plot_view import SensorPlotView
+from sensors.snapshot import SnapshotChannel
 from gui.views.sensor_edit_view import SensorEditView
-import asyncio
-import tkinter as tk
+from logger.playback import HistoryLoader
+# Widoki z wykresami importują matplotlib - ładowane przy pierwszym otwarciu wykresu
 
 class GUI:
-    def __init__(self, sensor_manager : SensorManager, *args, **kwargs):
+    # GUI działa we własnym wątku z jednym mainloop tkinter. Stan czujników czyta
+    # wyłącznie z SnapshotChannel, a polecenia (start/stop/edycja) przekazuje do
+    # pętli asyncio czujników przez call_soon_threadsafe - rysowanie nie opóźnia
+    # próbkowania, a próbkowanie nie blokuje okna.
+    def __init__(self, sensor_manager : SensorManager, channel: SnapshotChannel, loop, logger=None, *args, **kwargs):
         self.app = Window()
-        self._running = False
-        self._task = None
         self.sensor_manager = sensor_manager
-        self.current_sensor = None
+        self.channel = channel
+        self.loop = loop
+        # Historia z plików logów wczytywana w osobnym wątku
+        self.history_loader = HistoryLoader(logger) if logger is not None else None
+        self.current_sensor = None  # id wybranego czujnika
 
         self.app.show_view(DefaultView)
 
-        for sensor in sensor_manager.get_all_sensors():
+        for sensor in channel.latest().values():
             self.app.add_top_button(
                 sensor.name,
-                lambda s=sensor: self.show_sensor_plot(s)
+                lambda sensor_id=sensor.sensor_id: self.show_sensor_plot(sensor_id)
             )
 
         self.app.add_left_button("Pokaż wykres czujnika", self.show_sensor_plot)
 
+        self.app.add_left_button("Pokaż wszystkie czujniki", self.show_dashboard)
+
+        if self.history_loader is not None:
+            self.app.add_left_button("Historia czujnika", self.show_history)
+
         self.app.add_left_button("Włącz/wyłącz czujnik", self.toggle_sensor)
 
         self.app.add_left_button("Konfiguruj czujnik", self.edit_sensor)
 
-        self._task = asyncio.create_task(self.async_mainloop())
+    def run(self):
+        try:
+            self.app.mainloop()
+        finally:
+            if self.history_loader is not None:
+                self.history_loader.close()
 
-    def show_sensor_plot(self, sensor=None):
-        if sensor == None:
+    def show_sensor_plot(self, sensor_id=None):
+        from gui.views.sensor_plot_view import SensorPlotView
+        if sensor_id == None:
             if not self.current_sensor:
                 return
-            self.app.show_view(SensorPlotView, self.current_sensor)
+            self.app.show_view(SensorPlotView, self.channel, self.current_sensor)
         else:
-            self.current_sensor = sensor
-            self.app.show_view(SensorPlotView, sensor)
+            self.current_sensor = sensor_id
+            self.app.show_view(SensorPlotView, self.channel, sensor_id)
+
+    def show_dashboard(self):
+        from gui.views.dashboard_view import DashboardView
+        self.app.show_view(DashboardView, self.channel)
+
+    def show_history(self):
+        from gui.views.history_view import HistoryView
+        sensor = self.channel.get(self.current_sensor)
+        if not sensor:
+            return
+        self.app.show_view(HistoryView, self.history_loader, sensor)
 
     def toggle_sensor(self):
-        if not self.current_sensor:
+        sensor = self.channel.get(self.current_sensor)
+        if not sensor:
             return
-        if self.current_sensor.active:
-            self.current_sensor.stop()
+        if sensor.active:
+            self._call(self.sensor_manager.stop_sensor, sensor.sensor_id)
         else:
-            self.current_sensor.start()
+            self._call(self.sensor_manager.start_sensor, sensor.sensor_id)
 
-    def edit_sensor(self, sensor=None):
-        if sensor == None:
-            if not self.current_sensor:
-                return
-        self.app.show_view(SensorEditView,self.current_sensor)
+    def edit_sensor(self):
+        sensor = self.channel.get(self.current_sensor)
+        if not sensor:
+            return
+        self.app.show_view(SensorEditView, sensor, on_save=lambda values: self._save_sensor(sensor.sensor_id, values))
 
-    async def async_mainloop(self, interval=0.01):
-        self._running = True
+    def _save_sensor(self, sensor_id, values):
+        self.current_sensor = values["sensor_id"]
+        self._call(self._edit_in_loop, sensor_id, values)
+
+    def _edit_in_loop(self, sensor_id, values):
+        # Wykonywane w wątku czujników
+        sensor = self.sensor_manager.get_sensor(sensor_id)
+        if sensor is None:
+            return
         try:
-            while self._running:
-                self.app.update()
-                await asyncio.sleep(interval)
-        except tk.TclError:
-            self._running = False
+            sensor.edit_values(**values)
+        except Exception as e:
+            print(f"Błąd podczas zapisu: {e}")
 
+    def _call(self, func, *args):
+        self.loop.call_soon_threadsafe(func, *args)
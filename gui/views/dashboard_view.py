@@ -0,0 +1,148 @@
+import math
+from tkinter import ttk
+import numpy as np
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
+from matplotlib.transforms import Bbox
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from gui.scrollable_frame import ScrollableFrame
+from gui.views.sensor_plot_view import SECONDS_PER_DAY, expand_limits, local_offset
+
+class DashboardView(ttk.Frame):
+    # Siatka małych wykresów wielu czujników na jednej figurze i jednym płótnie.
+    # Jeden zegar odświeża wszystkie panele; pomijane są panele bez nowych próbek
+    # oraz te, które są poza widocznym obszarem ScrollableFrame. Linie są
+    # dorysowywane przez blitting jak w SensorPlotView, a po zmianie granic osi
+    # przerysowywany jest tylko dany panel, nie cała figura. Dane z SnapshotChannel.
+    def __init__(self, parent, channel, columns=4, max_points=100, fps=5,
+                 panel_size=(2.6, 1.8)):
+        super().__init__(parent)
+        self.channel = channel
+        self.max_points = max_points
+        self.interval_ms = max(1, int(1000 / fps))
+        self._offset = local_offset()
+        self._timer = None
+        self._needs_full_draw = True
+
+        sensors = list(channel.latest().values())
+        rows = max(1, math.ceil(len(sensors) / columns))
+        self.fig = Figure(figsize=(panel_size[0] * columns, panel_size[1] * rows), constrained_layout=True)
+
+        self.panels = []
+        for i, sensor in enumerate(sensors):
+            ax = self.fig.add_subplot(rows, columns, i + 1)
+            line, = ax.plot([], [], '-', linewidth=1, animated=True)
+            ax.set_title(f"{sensor.name} [{sensor.unit}]", fontsize=8)
+            ax.tick_params(labelsize=6)
+            ax.xaxis_date()
+            ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
+            ax.xaxis.set_major_locator(mdates.AutoDateLocator(maxticks=3))
+            ax.grid(True)
+            self.panels.append({"sensor_id": sensor.sensor_id, "ax": ax, "line": line, "total": None,
+                                "background": None, "extent": None})
+
+        # Figura wyższa niż okno - przewijana; rysowane są tylko widoczne panele
+        self.scroll = ScrollableFrame(self, orient='vertical')
+        self.scroll.pack(fill="both", expand=True)
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.scroll.scrollable_frame)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+        self.update_plots()
+
+    def update_plots(self):
+        snapshots = self.channel.latest()  # jedna spójna publikacja na klatkę
+        changed = []
+        for panel in self.panels:
+            sensor = snapshots.get(panel["sensor_id"])
+            if sensor is None or sensor.history.total == panel["total"] or not self._is_visible(panel):
+                continue
+            panel["total"] = sensor.history.total
+            rescaled = self._update_panel(panel, sensor)
+            if panel["background"] is None:
+                self._needs_full_draw = True  # panel jeszcze nigdy nie był narysowany
+            else:
+                changed.append((panel, rescaled))
+
+        if self._needs_full_draw:
+            self._needs_full_draw = False
+            self.canvas.draw_idle()  # tła i linie odświeży _on_draw
+        else:
+            for panel, rescaled in changed:
+                if rescaled:
+                    self._redraw_panel(panel)
+                else:
+                    self._blit_panel(panel)
+
+        self._timer = self.after(self.interval_ms, self.update_plots)
+
+    def destroy(self):
+        if self._timer is not None:
+            self.after_cancel(self._timer)
+            self._timer = None
+        super().destroy()
+
+    # --- Metody pomocnicze ---
+
+    def _update_panel(self, panel, sensor) -> bool:
+        # Ustawia dane linii; zwraca True, jeśli zmieniły się granice osi
+        ax = panel["ax"]
+        timestamps, values = sensor.history.window(self.max_points)
+        if not len(values):
+            return False
+        xs = (np.frombuffer(timestamps) + self._offset) / SECONDS_PER_DAY
+        values = np.frombuffer(values)
+        panel["line"].set_data(xs, values)
+
+        rescaled = False
+        if expand_limits(ax.get_xlim(), xs[0], xs[-1] + 1e-9) is not None:
+            span = max(xs[-1] - xs[0], sensor.frequency * self.max_points / SECONDS_PER_DAY)
+            ax.set_xlim(xs[0], xs[0] + span * 1.2)
+            rescaled = True
+        y_limits = expand_limits(ax.get_ylim(), values.min(), values.max())
+        if y_limits is not None:
+            ax.set_ylim(*y_limits)
+            rescaled = True
+        return rescaled
+
+    def _redraw_panel(self, panel):
+        # Nowe granice osi: czyszczony (tłem figury) i rysowany jest tylko obszar
+        # panelu razem z opisami osi, potem odświeżane jest jego tło do blittingu
+        ax = panel["ax"]
+        renderer = self.canvas.get_renderer()
+        extent = ax.get_tightbbox(renderer)
+        region = Bbox.union([extent, panel["extent"]]) if panel["extent"] is not None else extent
+        patch = self.fig.patch
+        patch.set_clip_box(region)
+        patch.draw(renderer)
+        patch.set_clip_box(None)
+        ax.draw(renderer)  # linia (animated=True) jest pomijana
+        panel["extent"] = extent
+        panel["background"] = self.canvas.copy_from_bbox(ax.bbox)
+        ax.draw_artist(panel["line"])
+        self.canvas.blit(region)
+
+    def _blit_panel(self, panel):
+        self.canvas.restore_region(panel["background"])
+        panel["ax"].draw_artist(panel["line"])
+        self.canvas.blit(panel["ax"].bbox)
+
+    def _is_visible(self, panel) -> bool:
+        # Zakres pikseli figury (od góry) widoczny w przewijanym obszarze
+        fig_height = self.fig.bbox.height
+        top_frac, bottom_frac = self.scroll.canvas.yview()
+        view_top, view_bottom = top_frac * fig_height, bottom_frac * fig_height
+        bbox = panel["ax"].bbox
+        panel_top, panel_bottom = fig_height - bbox.y1, fig_height - bbox.y0
+        return panel_bottom >= view_top and panel_top <= view_bottom
+
+    def _on_draw(self, event):
+        renderer = self.canvas.get_renderer()
+        for panel in self.panels:
+            panel["background"] = self.canvas.copy_from_bbox(panel["ax"].bbox)
+            panel["extent"] = panel["ax"].get_tightbbox(renderer)
+            if self._is_visible(panel):
+                panel["ax"].draw_artist(panel["line"])
+            else:
+                panel["total"] = None  # linia dorysowana po przewinięciu do panelu
+        self.canvas.blit(self.fig.bbox)
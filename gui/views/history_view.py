@@ -0,0 +1,79 @@
+from tkinter import ttk
+from datetime import datetime, timedelta
+import numpy as np
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from logger.playback import HistoryLoader
+from gui.views.sensor_plot_view import SECONDS_PER_DAY, expand_limits
+
+EPOCH = datetime(1970, 1, 1)
+
+class HistoryView(ttk.Frame):
+    # Przeglądanie zapisanych logów czujnika: przesuwanie i powiększanie paskiem
+    # narzędzi matplotlib. Po zmianie zakresu osi X zlecane jest wczytanie
+    # widocznego okna w HistoryLoader (w tle, z cache i redukcją min/max do
+    # szerokości osi w pikselach), a wynik odbierany jest przy kolejnej klatce.
+    def __init__(self, parent, loader: HistoryLoader, sensor, span=timedelta(hours=24), fps=10):
+        super().__init__(parent)
+        self.loader = loader
+        self.sensor_id = sensor.sensor_id
+        self.interval_ms = max(1, int(1000 / fps))
+        self._request = None
+        self._range_changed = True
+        self._timer = None
+
+        self.fig = Figure(figsize=(6, 3))
+        self.ax = self.fig.add_subplot()
+        self.line, = self.ax.plot([], [], '-', linewidth=1)
+        self.ax.set_xlabel("Czas")
+        self.ax.set_ylabel(f"{sensor.name} [{sensor.unit}]")
+        self.ax.set_title(f"Historia czujnika: {sensor.name} (ID: {sensor.sensor_id})")
+        # Czas lokalny bez strefy - tak jak w plikach logów
+        now = datetime.now()
+        self.ax.set_xlim(now - span, now)
+        self.ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(self.ax.xaxis.get_major_locator()))
+        self.ax.grid(True)
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self)
+        toolbar = NavigationToolbar2Tk(self.canvas, self, pack_toolbar=False)
+        toolbar.pack(side="bottom", fill="x")
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.ax.callbacks.connect("xlim_changed", self._on_xlim_changed)
+
+        self.update_plot()
+
+    def update_plot(self):
+        if self._range_changed:
+            # Zmiany zakresu z kolejnych zdarzeń myszy łączone są w jedno zlecenie na klatkę
+            self._range_changed = False
+            low, high = self.ax.get_xlim()
+            self._request = self.loader.request(
+                self.sensor_id,
+                EPOCH + timedelta(days=low),
+                EPOCH + timedelta(days=high),
+                max(1, int(self.ax.bbox.width))
+            )
+        result = self.loader.poll()
+        if result is not None and result[0] == self._request:
+            self._show(result[1], result[2])
+        self._timer = self.after(self.interval_ms, self.update_plot)
+
+    def destroy(self):
+        if self._timer is not None:
+            self.after_cancel(self._timer)
+            self._timer = None
+        super().destroy()
+
+    def _on_xlim_changed(self, ax):
+        self._range_changed = True
+
+    def _show(self, timestamps, values):
+        xs = np.frombuffer(timestamps) / SECONDS_PER_DAY
+        values = np.frombuffer(values)
+        self.line.set_data(xs, values)
+        if len(values):
+            y_limits = expand_limits(self.ax.get_ylim(), values.min(), values.max())
+            if y_limits is not None:
+                self.ax.set_ylim(*y_limits)
+        self.canvas.draw_idle()
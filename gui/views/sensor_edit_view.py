@@ -2,9 +2,11 @@ import tkinter as tk
 from tkinter import ttk
 
 class SensorEditView(ttk.Frame):
-    def __init__(self, parent, sensor):
+    def __init__(self, parent, sensor, on_save=None):
         super().__init__(parent)
         self.sensor = sensor
+        # on_save(values) pozwala przekazać zmiany do wątku czujników zamiast edytować bezpośrednio
+        self.on_save = on_save
 
         self.entries = {}
 
@@ -42,6 +44,9 @@ class SensorEditView(ttk.Frame):
                 "frequency": float(self.entries["frequency"].get())
             }
 
-            self.sensor.edit_values(**new_values)
+            if self.on_save is not None:
+                self.on_save(new_values)
+            else:
+                self.sensor.edit_values(**new_values)
         except Exception as e:
             print(f"Błąd podczas zapisu: {e}")
@@ -3,27 +3,48 @@ from tkinter import ttk
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.dates as mdates
+import numpy as np
 import datetime
 
+SECONDS_PER_DAY = 86400.0
+
+def local_offset() -> float:
+    # Przesunięcie strefy lokalnej - oś czasu matplotlib liczy dni od epoch w UTC
+    return datetime.datetime.now().astimezone().utcoffset().total_seconds()
+
+def expand_limits(current, data_min, data_max, margin=0.1):
+    # Nowe granice osi tylko wtedy, gdy dane z nich wychodzą; inaczej None
+    low, high = current
+    if low <= data_min and data_max <= high:
+        return None
+    span = max(data_max - data_min, 1e-9)
+    return data_min - span * margin, data_max + span * margin
+
 class SensorPlotView(ttk.Frame):
-    def __init__(self, parent, sensor, max_points=100):
+    # Wykres rysowany przyrostowo: tło osi jest zapamiętywane, a w każdej klatce
+    # odtwarzane i dorysowywana jest tylko linia (blitting). Pełne przerysowanie
+    # tylko przy zmianie zakresu osi. Odświeżanie co 1/fps s niezależnie od frequency.
+    # Dane pochodzą z SnapshotChannel, więc widok nie czyta bufora czujnika z innego wątku.
+    def __init__(self, parent, channel, sensor_id, max_points=100, fps=10):
         super().__init__(parent)
-        self.sensor = sensor
+        self.channel = channel
+        self.sensor_id = sensor_id
+        sensor = channel.get(sensor_id)
         self.max_points = max_points
-
-        # Inicjalizacja historii z sensora
-        self.times = []
-        self.values = []
-        for timestamp, value in list(sensor.history)[-self.max_points:]:  # ostatnie max_points danych
-            self.times.append(timestamp)
-            self.values.append(value)
+        self.interval_ms = max(1, int(1000 / fps))
+        self._offset = local_offset()
+        self._background = None
+        self._last_count = None
+        self._timer = None
 
         # Tworzymy wykres
         self.fig, self.ax = plt.subplots(figsize=(6, 3))
-        self.line, = self.ax.plot_date(self.times, self.values, '-', label=f"Wartość {self.sensor.name}")
+        self.line, = self.ax.plot([], [], '-', label=f"Wartość {sensor.name}", animated=True)
         self.ax.set_xlabel("Czas")
-        self.ax.set_ylabel(f"{self.sensor.name} [{self.sensor.unit}]")
-        self.ax.set_title(f"Wartość czujnika: {self.sensor.name} (ID: {self.sensor.sensor_id})")
+        self.ax.set_ylabel(f"{sensor.name} [{sensor.unit}]")
+        self.ax.set_title(f"Wartość czujnika: {sensor.name} (ID: {sensor.sensor_id})")
+        self.ax.xaxis_date()
+        self.ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
         self.ax.legend()
         self.ax.grid(True)
         self.fig.autofmt_xdate()
@@ -31,37 +52,55 @@ class SensorPlotView(ttk.Frame):
         # Osadzenie wykresu w tkinter
         self.canvas = FigureCanvasTkAgg(self.fig, master=self)
         self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.canvas.mpl_connect("draw_event", self._on_draw)
 
         # Start aktualizacji
-        self.after(int(self.sensor.frequency * 1000) , self.update_plot)
+        self.update_plot()
 
     def update_plot(self):
-        try:
-            val = self.sensor.get_last_value()
-        except Exception as e:
-            val = None
-            print(f"Błąd odczytu sensora {self.sensor.name}:", e)
-
-        if val is not None:
-            now = datetime.datetime.now()
-            self.times.append(now)
-            self.values.append(val)
-
-            # Ograniczamy do max_points
-            if len(self.times) > self.max_points:
-                self.times.pop(0)
-                self.values.pop(0)
+        sensor = self.channel.get(self.sensor_id)
+        if sensor is not None and sensor.history.total != self._last_count:
+            self._last_count = sensor.history.total
+            self._render(sensor)
+        # Zaplanuj kolejną klatkę wg fps
+        self._timer = self.after(self.interval_ms, self.update_plot)
 
-            self.line.set_data(self.times, self.values)
+    def destroy(self):
+        if self._timer is not None:
+            self.after_cancel(self._timer)
+            self._timer = None
+        plt.close(self.fig)
+        super().destroy()
 
-            # Automatyczne skalowanie osi
-            self.ax.relim()
-            self.ax.autoscale_view()
+    def _render(self, sensor):
+        timestamps, values = sensor.history.window(self.max_points)
+        if not len(values):
+            return
+        # Oś X w dniach (jednostka dat matplotlib), czas lokalny; widoki bufora bez kopiowania do list
+        xs = (np.frombuffer(timestamps) + self._offset) / SECONDS_PER_DAY
+        values = np.frombuffer(values)
+        self.line.set_data(xs, values)
 
-            # Formatowanie osi czasu
-            self.ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
+        rescaled = False
+        x_limits = expand_limits(self.ax.get_xlim(), xs[0], xs[-1] + 1e-9, margin=0.05)
+        if x_limits is not None:
+            # Okno czasu przesuwa się z zapasem, żeby nie przerysowywać osi co klatkę
+            span = max(xs[-1] - xs[0], sensor.frequency * self.max_points / SECONDS_PER_DAY)
+            self.ax.set_xlim(xs[0], xs[0] + span * 1.2)
+            rescaled = True
+        y_limits = expand_limits(self.ax.get_ylim(), values.min(), values.max())
+        if y_limits is not None:
+            self.ax.set_ylim(*y_limits)
+            rescaled = True
 
-            self.canvas.draw()
+        if rescaled or self._background is None:
+            self.canvas.draw_idle()  # pełne przerysowanie; tło zapamięta _on_draw
+            return
+        self.canvas.restore_region(self._background)
+        self.ax.draw_artist(self.line)
+        self.canvas.blit(self.ax.bbox)
 
-        # Zaplanuj kolejną aktualizację wg frequency
-        self.after(int(self.sensor.frequency * 1000), self.update_plot)
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.line)
+        self.canvas.blit(self.ax.bbox)
@@ -2,7 +2,6 @@ import tkinter as tk
 from tkinter import ttk
 from gui.scrollable_frame import ScrollableFrame
 from typing import List
-import asyncio
 
 class Window(tk.Tk):
     def __init__(self):
@@ -76,12 +75,3 @@ class Window(tk.Tk):
         window_width = self.winfo_width()
         new_width = int(window_width * 0.1)
         self.left_button_frame.canvas.config(width=new_width)
-
-    async def async_mainloop(self):
-        try:
-            while True:
-                self.update()
-                await asyncio.sleep(0.01)  # odpuszcza sterowanie asyncio
-        except tk.TclError:
-            # Okno zostało zamknięte, kończymy pętlę
-            pass
@@ -0,0 +1,176 @@
+import csv
+import json
+import struct
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import compress
+from typing import Dict, Iterator, Optional
+
+# Kolumnowy format archiwum (.col): kolejne bloki skompresowane zlib, każdy z
+# kolumnami int64 (czas w mikrosekundach epoch), uint16 lub uint32 (kod
+# czujnika; typ zapisany w bloku jako code_type) i float64 (wartość), a na
+# końcu stopka JSON ze słownikiem czujników i statystykami bloków (zakres
+# czasu, kody czujników). Wiersze w bloku są uporządkowane po czasie.
+COLUMNAR_SUFFIX = ".col"
+MAGIC = b"SLCOL001"
+TRAILER = struct.Struct("<I8s")  # długość stopki, MAGIC
+
+
+def _to_us(ts: datetime) -> int:
+    return int(ts.timestamp()) * 1_000_000 + ts.microsecond
+
+
+def _from_us(us: int) -> datetime:
+    return datetime.fromtimestamp(us // 1_000_000).replace(microsecond=us % 1_000_000)
+
+
+def _load_numpy():
+    # numpy jest opcjonalny - przyspiesza filtrowanie bloków przy odczycie
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def write_columnar(csv_path: str, col_path: str, block_rows: int = 10000, level: int = 6):
+    entries = {}
+    blocks = []
+    with open(csv_path, 'r', encoding='utf-8', newline='') as src, open(col_path, 'wb') as dst:
+        dst.write(MAGIC)
+        columns = (array('q'), array('I'), array('d'))
+
+        def flush_block():
+            timestamps, codes, values = columns
+            if not timestamps:
+                return
+            if any(a > b for a, b in zip(timestamps, timestamps[1:])):
+                # Wiersze bloku są porządkowane po czasie (stabilnie) raz przy zapisie,
+                # żeby odczyt zawsze mógł wyznaczyć zakres wyszukiwaniem binarnym
+                order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+                for column in columns:
+                    column[:] = array(column.typecode, map(column.__getitem__, order))
+            # Kody 16-bitowe, dopóki słownik się w nich mieści
+            packed = array('H', codes) if max(codes) <= 0xFFFF else codes
+            payload = zlib.compress(timestamps.tobytes() + packed.tobytes() + values.tobytes(), level)
+            blocks.append({
+                "offset": dst.tell(),
+                "length": len(payload),
+                "rows": len(timestamps),
+                "min_ts": min(timestamps),
+                "max_ts": max(timestamps),
+                "sorted": True,
+                "codes": sorted(set(codes)),
+                "code_type": packed.typecode
+            })
+            dst.write(payload)
+            for column in columns:
+                del column[:]
+
+        for row in csv.DictReader(src):
+            try:
+                ts = _to_us(datetime.fromisoformat(row["timestamp"]))
+                value = float(row["value"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            key = (row["sensor_id"], row.get("sensor_name") or "", row.get("unit") or "")
+            code = entries.setdefault(key, len(entries))
+            columns[0].append(ts)
+            columns[1].append(code)
+            columns[2].append(value)
+            if len(columns[0]) >= block_rows:
+                flush_block()
+        flush_block()
+
+        footer = json.dumps({
+            "entries": [list(key) for key in sorted(entries, key=entries.get)],
+            "blocks": blocks
+        }).encode('utf-8')
+        dst.write(footer)
+        dst.write(TRAILER.pack(len(footer), MAGIC))
+
+
+def read_footer(col_path: str) -> dict:
+    with open(col_path, 'rb') as f:
+        f.seek(-TRAILER.size, 2)
+        footer_len, magic = TRAILER.unpack(f.read(TRAILER.size))
+        if magic != MAGIC:
+            raise ValueError(f"Nieprawidłowy plik kolumnowy: {col_path}")
+        f.seek(-TRAILER.size - footer_len, 2)
+        return json.loads(f.read(footer_len))
+
+
+def read_columnar(col_path: str, start: datetime, end: datetime,
+                  sensor_id: Optional[str] = None) -> Iterator[Dict]:
+    footer = read_footer(col_path)
+    entries = footer["entries"]
+    codes_wanted = None
+    if sensor_id is not None:
+        codes_wanted = {code for code, entry in enumerate(entries) if entry[0] == sensor_id}
+        if not codes_wanted:
+            return
+    start_us, end_us = _to_us(start), _to_us(end)
+    np = _load_numpy()
+
+    with open(col_path, 'rb') as f:
+        for block in footer["blocks"]:
+            # Bloki spoza zakresu lub bez szukanego czujnika nie są nawet dekompresowane
+            if block["min_ts"] > end_us or block["max_ts"] < start_us:
+                continue
+            if codes_wanted is not None and codes_wanted.isdisjoint(block["codes"]):
+                continue
+            f.seek(block["offset"])
+            raw = zlib.decompress(f.read(block["length"]))
+            select = _select_numpy if np is not None else _select_array
+            timestamps, codes, values = select(raw, block, start_us, end_us, codes_wanted, np)
+
+            for ts, code, value in zip(timestamps, codes, values):
+                entry = entries[code]
+                yield {
+                    "timestamp": _from_us(ts),
+                    "sensor_id": entry[0],
+                    "value": value,
+                    "unit": entry[2]
+                }
+
+
+def _select_array(raw: bytes, block: dict, start_us: int, end_us: int, codes_wanted, np=None):
+    # Wiersze bloku z zakresu czasu i czujnika - kolumny z modułu array
+    n = block["rows"]
+    code_type = block.get("code_type", "H")  # starsze pliki - zawsze uint16
+    timestamps, codes, values = array('q'), array(code_type), array('d')
+    codes_end = 8 * n + codes.itemsize * n
+    timestamps.frombytes(raw[:8 * n])
+    codes.frombytes(raw[8 * n:codes_end])
+    values.frombytes(raw[codes_end:])
+
+    if block["sorted"]:
+        # Zakres czasu wyznaczany wyszukiwaniem binarnym zamiast porównań wiersz po wierszu
+        selected = range(bisect_left(timestamps, start_us), bisect_right(timestamps, end_us))
+    else:
+        # Tylko pliki zapisane przed sortowaniem bloków - ta ścieżka zostaje O(n) w Pythonie
+        selected = [i for i in range(n) if start_us <= timestamps[i] <= end_us]
+    if codes_wanted is not None:
+        # Maska liczona przez map/compress (w C), bez pętli Pythona po wierszach
+        selected = list(compress(selected, map(codes_wanted.__contains__, map(codes.__getitem__, selected))))
+    return map(timestamps.__getitem__, selected), map(codes.__getitem__, selected), map(values.__getitem__, selected)
+
+
+def _select_numpy(raw: bytes, block: dict, start_us: int, end_us: int, codes_wanted, np):
+    # To samo co _select_array, ale na widokach numpy bez kopiowania bufora
+    n = block["rows"]
+    code_dtype = np.uint16 if block.get("code_type", "H") == "H" else np.uint32
+    timestamps = np.frombuffer(raw, np.int64, n)
+    codes = np.frombuffer(raw, code_dtype, n, 8 * n)
+    values = np.frombuffer(raw, np.float64, n, 8 * n + codes.itemsize * n)
+
+    if block["sorted"]:
+        selected = np.arange(np.searchsorted(timestamps, start_us, 'left'),
+                             np.searchsorted(timestamps, end_us, 'right'))
+    else:
+        selected = np.flatnonzero((timestamps >= start_us) & (timestamps <= end_us))
+    if codes_wanted is not None:
+        selected = selected[np.isin(codes[selected], list(codes_wanted))]
+    return timestamps[selected].tolist(), codes[selected].tolist(), values[selected].tolist()
@@ -0,0 +1,190 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+INDEX_SUFFIX = ".idx.json"
+# Dziennik zmian indeksu (plik.csv.idx.json.journal) - jeden wiersz JSON na flush
+JOURNAL_SUFFIX = ".journal"
+
+class LogIndex:
+    # Indeks pliku CSV zapisywany obok niego (plik.csv.idx.json): zakres
+    # czasu, zbiór czujników oraz bloki wierszy z przesunięciami w bajtach.
+    # Czasy są przechowywane jako epoch (float). Przy zapisie wierszy do dziennika
+    # dopisywane są tylko zmienione bloki (append), a pełny indeks jest
+    # zapisywany przy rotacji lub zamknięciu pliku (save).
+    def __init__(self, block_rows: int = 1000):
+        self.block_rows = block_rows
+        self.rows = 0
+        self.end = 0
+        self.min_ts = None
+        self.max_ts = None
+        self.sensor_ids = set()
+        self.blocks = []
+        self._dirty_from = 0  # pierwszy blok niezapisany od ostatniego save/append
+
+    def add_rows(self, offset: int, end: int, rows: Iterable[Tuple[float, str]]):
+        rows = list(rows)
+        if not rows:
+            return
+        timestamps = [ts for ts, _ in rows]
+        sensors = {sensor_id for _, sensor_id in rows}
+        block_min, block_max = min(timestamps), max(timestamps)
+
+        last = self.blocks[-1] if self.blocks else None
+        if last is not None and last["end"] == offset and last["rows"] < self.block_rows:
+            last["end"] = end
+            last["rows"] += len(rows)
+            last["min_ts"] = min(last["min_ts"], block_min)
+            last["max_ts"] = max(last["max_ts"], block_max)
+            last["sensor_ids"] |= sensors
+        else:
+            self.blocks.append({
+                "offset": offset,
+                "end": end,
+                "rows": len(rows),
+                "min_ts": block_min,
+                "max_ts": block_max,
+                "sensor_ids": sensors
+            })
+        self._dirty_from = min(self._dirty_from, len(self.blocks) - 1)
+
+        self.rows += len(rows)
+        self.end = end
+        self.min_ts = block_min if self.min_ts is None else min(self.min_ts, block_min)
+        self.max_ts = block_max if self.max_ts is None else max(self.max_ts, block_max)
+        self.sensor_ids |= sensors
+
+    def overlaps(self, start: datetime, end: datetime, sensor_id: Optional[str] = None) -> bool:
+        if self.min_ts is None:
+            return False
+        if sensor_id is not None and sensor_id not in self.sensor_ids:
+            return False
+        return self.min_ts <= end.timestamp() and self.max_ts >= start.timestamp()
+
+    def blocks_for(self, start: datetime, end: datetime, sensor_id: Optional[str] = None) -> List[Tuple[int, int]]:
+        start_ts, end_ts = start.timestamp(), end.timestamp()
+        return [
+            (block["offset"], block["end"])
+            for block in self.blocks
+            if block["min_ts"] <= end_ts and block["max_ts"] >= start_ts
+            and (sensor_id is None or sensor_id in block["sensor_ids"])
+        ]
+
+    def copy(self) -> "LogIndex":
+        # Niezależna kopia dla czytelników z innych wątków
+        index = LogIndex(self.block_rows)
+        index.rows = self.rows
+        index.end = self.end
+        index.min_ts = self.min_ts
+        index.max_ts = self.max_ts
+        index.sensor_ids = set(self.sensor_ids)
+        index.blocks = [dict(block, sensor_ids=set(block["sensor_ids"])) for block in self.blocks]
+        index._dirty_from = len(index.blocks)
+        return index
+
+    def save(self, path: str):
+        # Pełny zapis indeksu; dziennik staje się zbędny
+        data = {
+            "block_rows": self.block_rows,
+            "rows": self.rows,
+            "end": self.end,
+            "min_ts": self.min_ts,
+            "max_ts": self.max_ts,
+            "sensor_ids": sorted(self.sensor_ids),
+            "blocks": [dict(block, sensor_ids=sorted(block["sensor_ids"])) for block in self.blocks]
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+        if os.path.isfile(path + JOURNAL_SUFFIX):
+            os.remove(path + JOURNAL_SUFFIX)
+        self._dirty_from = len(self.blocks)
+
+    def append(self, path: str):
+        # Dopisuje do dziennika tylko bloki zmienione od ostatniego zapisu -
+        # koszt zależy od rozmiaru flusha, a nie całego pliku
+        record = {
+            "block_rows": self.block_rows,
+            "end": self.end,
+            "blocks": [dict(block, sensor_ids=sorted(block["sensor_ids"])) for block in self.blocks[self._dirty_from:]]
+        }
+        with open(path + JOURNAL_SUFFIX, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + "\n")
+        self._dirty_from = len(self.blocks)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["LogIndex"]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            if not os.path.isfile(path + JOURNAL_SUFFIX):
+                return None
+            data = None  # plik jeszcze nie był zamknięty - tylko dziennik
+        except ValueError:
+            return None
+        if data is None:
+            index = cls()
+        else:
+            index = cls(data.get("block_rows", 1000))
+            index.end = data["end"]
+            index.blocks = [dict(block, sensor_ids=set(block["sensor_ids"])) for block in data["blocks"]]
+        index._replay(path + JOURNAL_SUFFIX)
+        index._dirty_from = len(index.blocks)
+        return index
+
+    def _replay(self, journal_path: str):
+        try:
+            with open(journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # niedokończony ostatni wpis (np. po awarii)
+                    blocks = [dict(block, sensor_ids=set(block["sensor_ids"])) for block in record["blocks"]]
+                    if blocks:
+                        # Pierwszy blok wpisu zastępuje swoją wcześniejszą (krótszą) wersję
+                        self.blocks = [b for b in self.blocks if b["offset"] < blocks[0]["offset"]] + blocks
+                    self.block_rows = record.get("block_rows", self.block_rows)
+                    self.end = record["end"]
+        except FileNotFoundError:
+            pass
+        self.rows = sum(block["rows"] for block in self.blocks)
+        self.min_ts = min((block["min_ts"] for block in self.blocks), default=None)
+        self.max_ts = max((block["max_ts"] for block in self.blocks), default=None)
+        self.sensor_ids = set().union(*(block["sensor_ids"] for block in self.blocks))
+
+    @classmethod
+    def build(cls, path: str, block_rows: int = 1000) -> "LogIndex":
+        # Odbudowa indeksu dla pliku bez (aktualnego) pliku indeksu
+        index = cls(block_rows)
+        index.extend(path)
+        return index
+
+    def extend(self, path: str):
+        # Dopisuje wiersze dodane za self.end - przy aktualnym indeksie
+        # czytany jest tylko koniec pliku, a nie cały plik
+        with open(path, 'rb') as f:
+            if self.end == 0:
+                self.end = len(f.readline())  # nagłówek
+            f.seek(self.end)
+            offset = self.end
+            pending, block_start = [], offset
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # niedokończony ostatni wiersz
+                try:
+                    row = next(csv.reader(io.StringIO(raw.decode('utf-8'))))
+                    pending.append((datetime.fromisoformat(row[0]).timestamp(), row[1]))
+                except (ValueError, IndexError, StopIteration):
+                    pass
+                offset += len(raw)
+                if len(pending) >= self.block_rows:
+                    self.add_rows(block_start, offset, pending)
+                    pending, block_start = [], offset
+            self.add_rows(block_start, offset, pending)
+            self.end = offset
@@ -1,15 +1,28 @@
 import os
+import io
 import json
 import csv
+import queue
 import shutil
+import asyncio
 import zipfile
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Optional, Iterator, Dict
+from typing import Optional, Iterator, Dict, List, Union
 from pathlib import Path
 from network.client import NetworkClient  
+from network.async_client import AsyncNetworkClient
+from logger.index import LogIndex, INDEX_SUFFIX
+from logger.columnar import COLUMNAR_SUFFIX, write_columnar, read_columnar
+from logger.rollup import RollupStore
+
+CSV_FIELDS = ["timestamp", "sensor_id", "sensor_name", "value", "unit"]
+ARCHIVE_SUFFIXES = (".csv.zip", COLUMNAR_SUFFIX)
+_STOP = object()
 
 class Logger:
-    def __init__(self, config_path: str, client: Optional[NetworkClient] = None):
+    def __init__(self, config_path: str, client: Optional[Union[NetworkClient, AsyncNetworkClient]] = None):
         # Wczytaj konfigurację JSON
         with open(config_path, 'r', encoding='utf-8') as f:
             cfg = json.load(f)
@@ -22,6 +35,15 @@ class Logger:
         self.max_size_mb = cfg.get("max_size_mb", 10)
         self.rotate_after_lines = cfg.get("rotate_after_lines", None)
         self.retention_days = cfg.get("retention_days", 30)
+        self.index_block_rows = cfg.get("index_block_rows", 1000)
+        self.archive_format = cfg.get("archive_format", "zip")
+        self.columnar_block_rows = cfg.get("columnar_block_rows", 10000)
+        if self.archive_format not in ("zip", "columnar"):
+            raise ValueError(f"Nieznany format archiwum: {self.archive_format}")
+        # Zapis, rotacja i kompresja w osobnych wątkach - log_reading tylko kolejkuje wiersz
+        self.background_writer = cfg.get("background_writer", False)
+        self.flush_interval = cfg.get("flush_interval_ms", 1000) / 1000.0
+        self.rollup_enabled = cfg.get("rollup", False)
 
         os.makedirs(self.log_dir, exist_ok=True)
         os.makedirs(self.archive_dir, exist_ok=True)
@@ -32,43 +54,52 @@ class Logger:
         self.current_filename = None
         self.current_file_start_time = None
         self.lines_written = 0
+        self.bytes_written = 0
         self.client = client
+        self._index = None
+        self._row_buffer = io.StringIO(newline='')
+        self._scanned_archives = {}
+        self._rollup = None
+        if self.rollup_enabled:
+            self._rollup = RollupStore(os.path.join(self.log_dir, "rollup"), retention_days=self.retention_days,
+                                       coarse_retention_days=cfg.get("rollup_retention_days", 365))
+        self._lock = threading.RLock()
+        self._queue = queue.Queue()
+        self._archive_queue = queue.Queue()
+        self._writer_thread = None
+        self._archiver_thread = None
+        self._loop = None
+        self._loop_thread = None
 
     def start(self) -> None:
-        now = datetime.now()
-        filename = now.strftime(self.filename_pattern)
-        self.current_filename = os.path.join(self.log_dir, filename)
-        self.current_file_start_time = now
-        file_exists = os.path.isfile(self.current_filename)
-        self.current_file = open(self.current_filename, mode='a', newline='', encoding='utf-8')
-        self.current_writer = csv.writer(self.current_file)
-        if not file_exists:
-            # Zapisz nagłówek
-            self.current_writer.writerow(["timestamp", "sensor_id","sensor_name", "value", "unit"])
-            self.lines_written = 1
-        else:
-            # Licz linię w pliku (bez nagłówka)
-            self.lines_written = sum(1 for _ in open(self.current_filename, 'r', encoding='utf-8')) - 1
-
-        self._send_event("start", {
-            "filename": self.current_filename,
-            "buffer_size": self.buffer_size
-        })
+        try:
+            # Zdarzenia z wątków roboczych są przekazywane do pętli asyncio klienta
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread = threading.get_ident()
+        except RuntimeError:
+            self._loop = None
+        self._open_file()
+        if self.background_writer and self._writer_thread is None:
+            self._writer_thread = threading.Thread(target=self._run_writer, name="LoggerWriter", daemon=True)
+            self._archiver_thread = threading.Thread(target=self._run_archiver, name="LoggerArchiver", daemon=True)
+            self._writer_thread.start()
+            self._archiver_thread.start()
+        for staged in self._unfinished_archives():
+            self._submit_archive(staged)
 
     def stop(self) -> None:
-        self._flush_buffer()
-        if self.current_file:
-            self.current_file.close()
-            self.current_file = None
-
-        self._send_event("stop", {
-            "filename": self.current_filename,
-            "buffer_size": self.buffer_size
-        })
+        if self._writer_thread is not None:
+            # Wątek zapisujący opróżnia kolejkę przed zakończeniem
+            self._queue.put(_STOP)
+            self._writer_thread.join()
+            self._archive_queue.put(_STOP)
+            self._archiver_thread.join()
+            self._writer_thread = None
+            self._archiver_thread = None
+        self._close_file()
 
     def log_reading(self, timestamp: datetime,sensor_id: str,sensor_name: str, value: float, unit: str) -> None:
         row = [timestamp.isoformat(), sensor_id,sensor_name, value, unit]
-        self.buffer.append(row)
         self._send_event(
             "log_reading", {
             "timestamp": timestamp.isoformat(),
@@ -78,13 +109,41 @@ class Logger:
             "unit": unit,
             "filename": self.current_filename,
             "buffer_size": self.buffer_size
+        }, buffered=True)
+        if self._writer_thread is not None:
+            self._queue.put([row])
+            return
+        self.buffer.append(row)
+        if not self.current_file:
+            return
+        if len(self.buffer) >= self.buffer_size:
+            self._flush_buffer()
+            # Rotacja sprawdzana tylko po zapisie bufora
+            if self._should_rotate():
+                self._rotate()
+
+    def log_readings(self, readings) -> None:
+        # Wiele odczytów naraz: lista krotek (timestamp, sensor_id, sensor_name, value, unit)
+        # albo słownik kolumn o tych nazwach (np. tablice z Sensor.read_values; pojedynczy
+        # napis jest powielany). Jedno zdarzenie sieciowe na całą paczkę.
+        rows = self._rows_from_batch(readings)
+        if not rows:
+            return
+        self._send_event("log_readings", {
+            "readings": rows,
+            "filename": self.current_filename,
+            "buffer_size": self.buffer_size
         })
+        if self._writer_thread is not None:
+            self._queue.put(rows)
+            return
+        self.buffer.extend(rows)
         if not self.current_file:
             return
         if len(self.buffer) >= self.buffer_size:
             self._flush_buffer()
-        if self._should_rotate():
-            self._rotate()
+            if self._should_rotate():
+                self._rotate()
 
     def read_logs(
         self,
@@ -92,32 +151,192 @@ class Logger:
         end: datetime,
         sensor_id: Optional[str] = None
     ) -> Iterator[Dict]:
-        # Przeszukaj pliki csv w log_dir
+        # Przeszukaj pliki csv w log_dir; pliki i bloki spoza zakresu
+        # (albo bez szukanego czujnika) są pomijane na podstawie indeksu
         for filename in os.listdir(self.log_dir):
             if not filename.endswith(".csv"):
                 continue
             full_path = os.path.join(self.log_dir, filename)
-            yield from self._read_file(full_path, start, end, sensor_id)
-
-        # Przeszukaj archiwa zip w archive_dir
-        for filename in os.listdir(self.archive_dir):
-            if not filename.endswith(".zip"):
+            index = self._load_index(full_path)
+            if index is not None and not index.overlaps(start, end, sensor_id):
                 continue
+            yield from self._read_file(full_path, start, end, sensor_id, index)
+
+        # Przeszukaj archiwa zip i kolumnowe w archive_dir
+        names = os.listdir(self.archive_dir)
+        for filename in names:
             full_path = os.path.join(self.archive_dir, filename)
-            yield from self._read_zip(full_path, start, end, sensor_id)
+            if filename.endswith(ARCHIVE_SUFFIXES):
+                yield from self._read_archive(full_path, start, end, sensor_id)
+                continue
+            if not filename.endswith(".csv"):
+                continue
+            # Plik czekający na kompresję w tle; gotowe archiwum ma pierwszeństwo
+            archived = [full_path[:-4] + suffix for suffix in ARCHIVE_SUFFIXES]
+            if any(os.path.basename(path) in names for path in archived):
+                continue
+            try:
+                yield from self._read_file(full_path, start, end, sensor_id, self._load_index(full_path))
+            except FileNotFoundError:
+                # Został skompresowany po wylistowaniu katalogu
+                for path in archived:
+                    if os.path.isfile(path):
+                        yield from self._read_archive(path, start, end, sensor_id)
+
+    def read_rollup(
+        self,
+        start: datetime,
+        end: datetime,
+        sensor_id: str,
+        max_points: int = 500,
+        resolution: Optional[int] = None
+    ) -> List[Dict]:
+        # Agregaty (count/mean/min/max/last) w najdrobniejszej rozdzielczości,
+        # przy której wynik mieści się w max_points punktach (albo w podanej resolution)
+        if self._rollup is None:
+            raise RuntimeError("Agregaty są wyłączone (opcja 'rollup' w konfiguracji)")
+        with self._lock:
+            # Wątek zapisujący dodaje kubełki podczas flusha
+            return self._rollup.query(start, end, sensor_id, max_points, resolution)
+
+    @property
+    def rollup_resolutions(self) -> tuple:
+        # Dostępne rozdzielczości agregatów w sekundach (puste, gdy wyłączone)
+        return self._rollup.resolutions if self._rollup is not None else ()
 
     # --- Prywatne metody ---
 
+    def _open_file(self):
+        now = datetime.now()
+        filename = now.strftime(self.filename_pattern)
+        self.current_filename = os.path.join(self.log_dir, filename)
+        self.current_file_start_time = now
+        file_exists = os.path.isfile(self.current_filename)
+        self.current_file = open(self.current_filename, mode='ab')
+        self.current_writer = csv.writer(self._row_buffer)
+        self.bytes_written = self.current_file.tell()
+        if not file_exists:
+            # Zapisz nagłówek
+            self._write_rows([CSV_FIELDS])
+            self.lines_written = 1
+            self._index = LogIndex(self.index_block_rows)
+        else:
+            # Liczba wierszy z indeksu (bez nagłówka) zamiast czytania całego pliku
+            self._index = None
+            self._index = self._load_index(self.current_filename, rebuild=True)
+            self.lines_written = self._index.rows
+
+        self._send_event("start", {
+            "filename": self.current_filename,
+            "buffer_size": self.buffer_size
+        })
+
+    def _close_file(self):
+        with self._lock:
+            self._flush_buffer()
+            if self.current_file:
+                self.current_file.close()
+                self.current_file = None
+                # Pełny indeks (zamiast dziennika) przy rotacji i zamknięciu
+                self._index.save(self.current_filename + INDEX_SUFFIX)
+
+        self._send_event("stop", {
+            "filename": self.current_filename,
+            "buffer_size": self.buffer_size
+        })
+
+    def _run_writer(self):
+        # Grupowy zapis: wiersze są zbierane do buffer_size albo przez flush_interval
+        while True:
+            item = self._queue.get()
+            stopping = item is _STOP
+            if not stopping:
+                self.buffer.extend(item)
+                deadline = time.monotonic() + self.flush_interval
+                while len(self.buffer) < self.buffer_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    self.buffer.extend(item)
+            try:
+                with self._lock:
+                    self._flush_buffer()
+                    if not stopping and self._should_rotate():
+                        self._rotate()
+            except Exception as e:
+                print(f"[Logger] Błąd zapisu w tle: {e}")
+            if stopping:
+                return
+
+    def _run_archiver(self):
+        while True:
+            item = self._archive_queue.get()
+            if item is _STOP:
+                return
+            try:
+                self._finish_archive(*item)
+                self._clean_old_archives()
+            except Exception as e:
+                print(f"[Logger] Błąd archiwizacji w tle: {e}")
+
     def _flush_buffer(self):
         if not self.buffer:
             return
-        for row in self.buffer:
-            self.current_writer.writerow(row)
+        offset = self.bytes_written
+        self._write_rows(self.buffer)
         self.lines_written += len(self.buffer)
         self.current_file.flush()
+        timestamps = [datetime.fromisoformat(row[0]) for row in self.buffer]
+        self._index.add_rows(offset, self.bytes_written, (
+            (ts.timestamp(), row[1]) for ts, row in zip(timestamps, self.buffer)
+        ))
+        self._index.append(self.current_filename + INDEX_SUFFIX)
+        if self._rollup is not None:
+            self._rollup.add((ts, row[1], float(row[3])) for ts, row in zip(timestamps, self.buffer))
+            self._rollup.save()
         self.buffer.clear()
         self._send_event("flush", {"rows": len(self.buffer)})
 
+    @staticmethod
+    def _rows_from_batch(readings) -> List[list]:
+        def iso(ts):
+            if isinstance(ts, datetime):
+                return ts.isoformat()
+            return datetime.fromtimestamp(float(ts)).isoformat()  # czas epoch
+
+        if isinstance(readings, dict):
+            values = readings["value"]
+            n = len(values)
+            columns = []
+            for field in ("sensor_id", "sensor_name", "unit"):
+                column = readings.get(field, "")
+                columns.append([column] * n if isinstance(column, str) else column)
+            return [
+                [iso(ts), sensor_id, sensor_name, float(value), unit]
+                for ts, sensor_id, sensor_name, value, unit
+                in zip(readings["timestamp"], columns[0], columns[1], values, columns[2])
+            ]
+        return [
+            [iso(ts), sensor_id, sensor_name, float(value), unit]
+            for ts, sensor_id, sensor_name, value, unit in readings
+        ]
+
+    def _write_rows(self, rows):
+        # Wiersze są kodowane w pamięci, więc rozmiar pliku znany jest bez stat()
+        self._row_buffer.seek(0)
+        self._row_buffer.truncate()
+        self.current_writer.writerows(rows)
+        data = self._row_buffer.getvalue().encode('utf-8')
+        self.current_file.write(data)
+        self.bytes_written += len(data)
+
     def _should_rotate(self) -> bool:
         # Rotacja co rotate_every_hours
         elapsed = datetime.now() - self.current_file_start_time
@@ -125,8 +344,7 @@ class Logger:
             return True
 
         # Rotacja po rozmiarze
-        self.current_file.flush()
-        size_mb = os.path.getsize(self.current_filename) / (1024 * 1024)
+        size_mb = self.bytes_written / (1024 * 1024)
         if size_mb >= self.max_size_mb:
             return True
 
@@ -137,20 +355,30 @@ class Logger:
         return False
 
     def _rotate(self):
-        self.stop()
-        self._archive()
-        self._clean_old_archives()
-        self.start()
+        with self._lock:
+            self._close_file()
+            staged = self._stage_archive()
+            self._open_file()
+        self._submit_archive(staged)
         self._send_event("rotate", {"filename": self.current_filename})
 
-    def _archive(self):
-        # Przenieś i spakuj aktualny plik do archive/
+    def _submit_archive(self, staged):
+        if self._archiver_thread is not None:
+            # Kompresja i sprzątanie archiwum nie wstrzymują zapisu nowych odczytów
+            self._archive_queue.put(staged)
+        else:
+            self._finish_archive(*staged)
+            self._clean_old_archives()
+
+    def _stage_archive(self):
+        # Przenieś aktualny plik (z indeksem) do archive/ - kompresja w _finish_archive
         base_name = os.path.basename(self.current_filename)
         archive_path = os.path.join(self.archive_dir, base_name)
+        suffix = COLUMNAR_SUFFIX if self.archive_format == "columnar" else ".csv.zip"
         name = archive_path[0:-4]
         i=1
         while True:
-            if not os.path.isfile(name + ".csv.zip"):
+            if not os.path.isfile(name + suffix) and not os.path.isfile(name + ".csv"):
                 break
             if i==1:
                 name += str("-" + str(i))
@@ -160,75 +388,170 @@ class Logger:
                 name+=str(i)
             i+=1
 
-        zip_path = name + ".csv.zip"
-        shutil.move(self.current_filename, archive_path)
-        
-        # Kompresja zip
-        with zipfile.ZipFile(zip_path, mode='w', compression=zipfile.ZIP_DEFLATED) as zipf:
-            zipf.write(archive_path, arcname=base_name)
-        os.remove(archive_path)
-        self._send_event("archive", {"zip_path": zip_path})
+        staged_path = name + ".csv"
+        shutil.move(self.current_filename, staged_path)
+        index_path = self.current_filename + INDEX_SUFFIX
+        if os.path.isfile(index_path):
+            os.replace(index_path, staged_path + INDEX_SUFFIX)
+        return staged_path, name + suffix
+
+    def _finish_archive(self, staged_path: str, archive_path: str):
+        # Archiwum powstaje pod tymczasową nazwą, więc read_logs nigdy nie widzi niepełnego pliku
+        tmp_path = archive_path + ".tmp"
+        index_path = staged_path + INDEX_SUFFIX
+        if archive_path.endswith(COLUMNAR_SUFFIX):
+            # Format kolumnowy ma własne statystyki bloków - indeks CSV jest zbędny
+            write_columnar(staged_path, tmp_path, self.columnar_block_rows)
+            if os.path.isfile(index_path):
+                os.remove(index_path)
+        else:
+            # Kompresja zip
+            with zipfile.ZipFile(tmp_path, mode='w', compression=zipfile.ZIP_DEFLATED) as zipf:
+                zipf.write(staged_path, arcname=os.path.basename(staged_path))
+            if os.path.isfile(index_path):
+                os.replace(index_path, archive_path + INDEX_SUFFIX)
+        os.replace(tmp_path, archive_path)
+        os.remove(staged_path)
+        key = "col_path" if archive_path.endswith(COLUMNAR_SUFFIX) else "zip_path"
+        self._send_event("archive", {key: archive_path})
+
+    def _unfinished_archives(self):
+        # Pliki przeniesione do archive/, ale nieskompresowane przed zamknięciem programu
+        suffix = COLUMNAR_SUFFIX if self.archive_format == "columnar" else ".csv.zip"
+        for filename in os.listdir(self.archive_dir):
+            if not filename.endswith(".csv"):
+                continue
+            staged_path = os.path.join(self.archive_dir, filename)
+            if any(os.path.isfile(staged_path[:-4] + s) for s in ARCHIVE_SUFFIXES):
+                # Archiwum gotowe, brakowało tylko usunięcia pliku źródłowego
+                os.remove(staged_path)
+                if os.path.isfile(staged_path + INDEX_SUFFIX):
+                    os.remove(staged_path + INDEX_SUFFIX)
+                continue
+            yield staged_path, staged_path[:-4] + suffix
 
     def _clean_old_archives(self):
         now = datetime.now()
         cutoff = now - timedelta(days=self.retention_days)
         removed = []
         for filename in os.listdir(self.archive_dir):
-            if not filename.endswith(".zip"):
+            if not filename.endswith(ARCHIVE_SUFFIXES):
                 continue
             full_path = os.path.join(self.archive_dir, filename)
             file_mtime = datetime.fromtimestamp(os.path.getmtime(full_path))
             if file_mtime < cutoff:
                 os.remove(full_path)
+                if os.path.isfile(full_path + INDEX_SUFFIX):
+                    os.remove(full_path + INDEX_SUFFIX)
                 removed.append(filename)
         self._send_event("cleanup", {"removed_files": removed})
 
-    def _read_file(self, filepath: str, start: datetime, end: datetime, sensor_id: Optional[str]) -> Iterator[Dict]:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                try:
-                    ts = datetime.fromisoformat(row["timestamp"])
-                    if ts < start or ts > end:
-                        continue
-                    if sensor_id is not None and row["sensor_id"] != sensor_id:
-                        continue
-                    yield {
-                        "timestamp": ts,
-                        "sensor_id": row["sensor_id"],
-                        "value": float(row["value"]),
-                        "unit": row["unit"]
-                    }
-                except Exception:
-                    continue
+    def _load_index(self, filepath: str, rebuild: bool = False) -> Optional[LogIndex]:
+        with self._lock:
+            if filepath == self.current_filename and self._index is not None:
+                # Kopia - wątek zapisujący zmienia indeks bieżącego pliku w trakcie odczytu
+                return self._index.copy()
+        index = LogIndex.load(filepath + INDEX_SUFFIX)
+        size = os.path.getsize(filepath)
+        if index is not None and index.end == size:
+            return index
+        if not rebuild:
+            return None  # brak lub nieaktualny indeks - pełne przeszukanie
+        if index is None or index.end > size:
+            index = LogIndex(self.index_block_rows)
+        # Przy indeksie za krótkim (np. po awarii) skanowany jest tylko koniec pliku
+        index.extend(filepath)
+        index.save(filepath + INDEX_SUFFIX)
+        return index
+
+    def _read_archive(self, full_path: str, start: datetime, end: datetime, sensor_id: Optional[str]) -> Iterator[Dict]:
+        if full_path.endswith(COLUMNAR_SUFFIX):
+            yield from read_columnar(full_path, start, end, sensor_id)
+            return
+        index = LogIndex.load(full_path + INDEX_SUFFIX)
+        if index is not None and not index.overlaps(start, end, sensor_id):
+            return
+        yield from self._read_zip(full_path, start, end, sensor_id, index)
+
+    def _read_file(self, filepath: str, start: datetime, end: datetime, sensor_id: Optional[str],
+                   index: Optional[LogIndex] = None) -> Iterator[Dict]:
+        if index is None:
+            with open(filepath, 'r', encoding='utf-8', newline='') as f:
+                yield from self._parse_rows(csv.DictReader(f), start, end, sensor_id)
+            return
+        with open(filepath, 'rb') as f:
+            yield from self._read_blocks(f, index, start, end, sensor_id)
+
+    def _read_zip(self, zip_path: str, start: datetime, end: datetime, sensor_id: Optional[str],
+                  index: Optional[LogIndex] = None) -> Iterator[Dict]:
+        # Archiwum bez indeksu, które zostało już w całości przeczytane,
+        # jest pomijane na podstawie zapamiętanego zakresu czasu i czujników
+        mtime = os.path.getmtime(zip_path)
+        with self._lock:
+            scanned = self._scanned_archives.get(zip_path)
+        if index is None and scanned is not None and scanned["mtime"] == mtime:
+            if scanned["min_ts"] is None or scanned["min_ts"] > end or scanned["max_ts"] < start:
+                return
+            if sensor_id is not None and sensor_id not in scanned["sensor_ids"]:
+                return
 
-    def _read_zip(self, zip_path: str, start: datetime, end: datetime, sensor_id: Optional[str]) -> Iterator[Dict]:
         with zipfile.ZipFile(zip_path, 'r') as zipf:
-            for name in zipf.namelist():
-                if not name.endswith(".csv"):
-                    continue
+            names = [name for name in zipf.namelist() if name.endswith(".csv")]
+            seen = {"mtime": mtime, "min_ts": None, "max_ts": None, "sensor_ids": set()}
+            for name in names:
                 with zipf.open(name) as f:
-                    text = f.read().decode('utf-8').splitlines()
-                    reader = csv.DictReader(text)
-                    for row in reader:
-                        try:
-                            ts = datetime.fromisoformat(row["timestamp"])
-                            if ts < start or ts > end:
-                                continue
-                            if sensor_id is not None and row["sensor_id"] != sensor_id:
-                                continue
-                            yield {
-                                "timestamp": ts,
-                                "sensor_id": row["sensor_id"],
-                                "value": float(row["value"]),
-                                "unit": row["unit"]
-                            }
-                        except Exception:
-                            continue
-
-    def _send_event(self, event: str, details: Optional[dict] = None):
+                    if index is not None and len(names) == 1:
+                        yield from self._read_blocks(f, index, start, end, sensor_id)
+                        continue
+                    # Strumieniowa dekompresja - pamięć nie zależy od rozmiaru archiwum
+                    text = io.TextIOWrapper(f, encoding='utf-8', newline='')
+                    yield from self._parse_rows(csv.DictReader(text), start, end, sensor_id, seen)
+            if index is None:
+                with self._lock:
+                    self._scanned_archives[zip_path] = seen
+
+    def _read_blocks(self, f, index: LogIndex, start: datetime, end: datetime, sensor_id: Optional[str]) -> Iterator[Dict]:
+        # Czyta tylko bloki indeksu pasujące do zakresu i czujnika
+        for offset, block_end in index.blocks_for(start, end, sensor_id):
+            f.seek(offset)
+            chunk = f.read(block_end - offset).decode('utf-8')
+            reader = csv.DictReader(io.StringIO(chunk, newline=''), fieldnames=CSV_FIELDS)
+            yield from self._parse_rows(reader, start, end, sensor_id)
+
+    def _parse_rows(self, reader, start: datetime, end: datetime, sensor_id: Optional[str],
+                    seen: Optional[dict] = None) -> Iterator[Dict]:
+        for row in reader:
+            try:
+                ts = datetime.fromisoformat(row["timestamp"])
+                if seen is not None:
+                    seen["min_ts"] = ts if seen["min_ts"] is None else min(seen["min_ts"], ts)
+                    seen["max_ts"] = ts if seen["max_ts"] is None else max(seen["max_ts"], ts)
+                    seen["sensor_ids"].add(row["sensor_id"])
+                # Wiersze nie muszą być uporządkowane w czasie (np. serwer z wieloma
+                # klientami), więc przeglądany jest cały plik lub blok
+                if ts < start or ts > end:
+                    continue
+                if sensor_id is not None and row["sensor_id"] != sensor_id:
+                    continue
+                yield {
+                    "timestamp": ts,
+                    "sensor_id": row["sensor_id"],
+                    "value": float(row["value"]),
+                    "unit": row["unit"]
+                }
+            except Exception:
+                continue
+
+    def _send_event(self, event: str, details: Optional[dict] = None, buffered: bool = False):
         if self.client is None:
             return
+        if self._loop is not None and threading.get_ident() != self._loop_thread:
+            # Klient asynchroniczny nie jest bezpieczny wątkowo
+            try:
+                self._loop.call_soon_threadsafe(self._send_event, event, details, buffered)
+            except RuntimeError:
+                pass  # pętla już zamknięta
+            return
         message = {
             "type": "logger_event",
             "event": event,
@@ -236,6 +559,10 @@ class Logger:
             "details": details or {}
         }
         try:
-            self.client.send(message)
+            # Zdarzenia odczytów mogą być łączone przez klienta w paczki
+            if buffered:
+                self.client.send_buffered(message)
+            else:
+                self.client.send(message)
         except Exception as e:
             print(f"[Logger] Błąd wysyłania eventu '{event}': {e}")
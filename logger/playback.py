@@ -0,0 +1,156 @@
+import math
+import threading
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Tuple
+
+from logger.rollup import EPOCH, _seconds
+
+MIN_LEVEL = -3  # najwęższa kolumna: 1/8 s
+
+
+def downsample_minmax(points: Iterable[Tuple[float, float, float]], start: float, width: float,
+                      columns: int) -> Tuple[array, array]:
+    # Redukcja do co najwyżej dwóch punktów (minimum i maksimum) na kolumnę
+    # szerokości width sekund, zaczynając od start. points to (czas w s, min, max),
+    # w dowolnej kolejności - strumień nie jest zapamiętywany w całości.
+    # Dla surowych odczytów min == max == wartość.
+    lows, highs = {}, {}
+    for t, low, high in points:
+        column = int((t - start) // width)
+        if not 0 <= column < columns:
+            continue
+        current = lows.get(column)
+        if current is None:
+            lows[column] = (t, low)
+            highs[column] = (t, high)
+            continue
+        if low < current[1]:
+            lows[column] = (t, low)
+        if high > highs[column][1]:
+            highs[column] = (t, high)
+
+    timestamps, values = array('d'), array('d')
+    for column in sorted(lows):
+        low, high = lows[column], highs[column]
+        # Kolejność punktów w kolumnie zgodna z czasem, żeby linia nie cofała się
+        for t, value in sorted({low, high}):
+            timestamps.append(t)
+            values.append(value)
+    return timestamps, values
+
+
+class HistoryLoader:
+    # Dane historyczne czujnika dla widoku z przesuwaniem i powiększaniem.
+    # Zakres czasu jest dzielony na kafelki o stałej liczbie kolumn; szerokość
+    # kolumny jest zaokrąglana do potęgi dwójki (poziom szczegółowości), więc
+    # przesunięcie widoku trafia w te same kafelki. Kafelki trzymane są w cache
+    # LRU. Kolumny szersze niż najmniejszy kubełek agregatów są liczone z
+    # agregatów loggera (min/max), węższe - z surowych odczytów read_logs.
+    # Wczytywanie odbywa się w wątku roboczym; liczy się tylko ostatnie zlecenie.
+    def __init__(self, logger, cache_size: int = 128, tile_columns: int = 256):
+        self.logger = logger
+        self.cache_size = cache_size
+        self.tile_columns = tile_columns
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = None
+        self._result = None
+        self._request_id = 0
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = None
+
+    def request(self, sensor_id: str, start: datetime, end: datetime, columns: int) -> int:
+        # Zlecenie wczytania w tle; wcześniejsze nieobsłużone zlecenie jest porzucane
+        self._request_id += 1
+        self._pending = (self._request_id, sensor_id, start, end, columns)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="HistoryLoader", daemon=True)
+            self._thread.start()
+        self._wakeup.set()
+        return self._request_id
+
+    def poll(self) -> Optional[Tuple[int, array, array]]:
+        # Ostatni gotowy wynik (id zlecenia, czasy w s od epoch bez strefy, wartości)
+        result, self._result = self._result, None
+        return result
+
+    def load(self, sensor_id: str, start: datetime, end: datetime, columns: int) -> Tuple[array, array]:
+        # Synchroniczne wczytanie zakresu z co najwyżej dwoma punktami na kolumnę
+        start_s, end_s = _seconds(start), _seconds(end)
+        level = self._level((end_s - start_s) / max(1, columns))
+        tile_span = 2.0 ** level * self.tile_columns
+        timestamps, values = array('d'), array('d')
+        for tile in range(int(start_s // tile_span), int(end_s // tile_span) + 1):
+            tile_timestamps, tile_values = self._tile(sensor_id, level, tile)
+            timestamps.extend(tile_timestamps)
+            values.extend(tile_values)
+        return timestamps, values
+
+    def close(self, timeout: float = 2.0):
+        # Wątek jest demonem - długi odczyt nie wstrzymuje zamknięcia okna
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    # --- Metody pomocnicze ---
+
+    @staticmethod
+    def _level(width: float) -> int:
+        return max(MIN_LEVEL, math.ceil(math.log2(width))) if width > 0 else MIN_LEVEL
+
+    def _tile(self, sensor_id: str, level: int, tile: int) -> Tuple[array, array]:
+        key = (sensor_id, level, tile)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        width = 2.0 ** level
+        tile_start = tile * width * self.tile_columns
+        tile_end = tile_start + width * self.tile_columns
+        data = downsample_minmax(self._points(sensor_id, tile_start, tile_end, width), tile_start, width,
+                                 self.tile_columns)
+
+        if EPOCH + timedelta(seconds=tile_end) <= datetime.now():
+            # Kafelki obejmujące bieżącą chwilę jeszcze się zmieniają - bez cache
+            with self._lock:
+                self._cache[key] = data
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return data
+
+    def _points(self, sensor_id: str, start: float, end: float, width: float):
+        start_dt = EPOCH + timedelta(seconds=start)
+        end_dt = EPOCH + timedelta(seconds=end)
+        resolutions = [res for res in self.logger.rollup_resolutions if res <= width]
+        if resolutions:
+            for bucket in self.logger.read_rollup(start_dt, end_dt, sensor_id, resolution=resolutions[-1]):
+                middle = _seconds(bucket["timestamp"]) + bucket["resolution"] / 2
+                yield middle, bucket["min"], bucket["max"]
+            return
+        for row in self.logger.read_logs(start_dt, end_dt, sensor_id):
+            t = _seconds(row["timestamp"])
+            yield t, row["value"], row["value"]
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self._closed:
+                return
+            pending, self._pending = self._pending, None
+            if pending is None:
+                continue
+            request_id, sensor_id, start, end, columns = pending
+            try:
+                timestamps, values = self.load(sensor_id, start, end, columns)
+            except Exception as e:
+                print(f"[HistoryLoader] Błąd wczytywania historii: {e}")
+                continue
+            self._result = (request_id, timestamps, values)
@@ -0,0 +1,165 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+RESOLUTIONS = (60, 3600, 86400)  # 1 min, 1 h, 1 dzień
+EPOCH = datetime(1970, 1, 1)
+COMPACT_MIN_LINES = 1000  # nadmiarowe wpisy w pliku, po których jest przepisywany
+PRUNE_INTERVAL = timedelta(minutes=1)
+
+
+def _seconds(ts: datetime) -> float:
+    # Czas "lokalny" liczony bez strefy - kubełki dobowe zaczynają się o północy
+    return (ts - EPOCH).total_seconds()
+
+
+class RollupStore:
+    # Agregaty per czujnik (count/sum/min/max/last) w kubełkach 1 min, 1 h i 1 dzień.
+    # Każda rozdzielczość ma własny plik rollup_<sekundy>.jsonl, do którego
+    # dopisywane są zmienione kubełki; przy wczytaniu późniejszy wpis wygrywa.
+    # Gdy plik urośnie do ponad dwukrotności liczby kubełków, jest przepisywany
+    # (tmp + os.replace) tylko z bieżącymi kubełkami. Stare kubełki są usuwane
+    # także w trakcie pracy: minutowe po retention_days, pośrednie (godzinowe)
+    # po coarse_retention_days; najgrubsze (dobowe) zostają.
+    def __init__(self, directory: str, resolutions: Tuple[int, ...] = RESOLUTIONS,
+                 retention_days: Optional[int] = None, coarse_retention_days: Optional[int] = None):
+        self.directory = directory
+        self.resolutions = tuple(sorted(resolutions))
+        self.retention_days = retention_days
+        self.coarse_retention_days = coarse_retention_days
+        # rozdzielczość -> sensor_id -> początek kubełka -> [count, sum, min, max, last]
+        self._buckets: Dict[int, Dict[str, Dict[int, list]]] = {res: {} for res in self.resolutions}
+        self._dirty = {res: set() for res in self.resolutions}
+        self._lines = {res: 0 for res in self.resolutions}
+        self._last_prune = None
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        for res in self.resolutions:
+            self._load(res)
+
+    def add(self, rows: Iterable[Tuple[datetime, str, float]]):
+        with self._lock:
+            for ts, sensor_id, value in rows:
+                seconds = _seconds(ts)
+                for res in self.resolutions:
+                    bucket_start = int(seconds // res) * res
+                    buckets = self._buckets[res].setdefault(sensor_id, {})
+                    bucket = buckets.get(bucket_start)
+                    if bucket is None:
+                        buckets[bucket_start] = [1, value, value, value, value]
+                    else:
+                        bucket[0] += 1
+                        bucket[1] += value
+                        bucket[2] = min(bucket[2], value)
+                        bucket[3] = max(bucket[3], value)
+                        bucket[4] = value
+                    self._dirty[res].add((sensor_id, bucket_start))
+
+    def save(self):
+        with self._lock:
+            now = datetime.now()
+            if self._last_prune is None or now - self._last_prune >= PRUNE_INTERVAL:
+                self._last_prune = now
+                for res in self.resolutions:
+                    self._prune(res, now)
+            for res in self.resolutions:
+                dirty = [key for key in self._dirty[res] if key[1] in self._buckets[res].get(key[0], ())]
+                self._dirty[res].clear()
+                if not dirty:
+                    continue
+                if self._lines[res] + len(dirty) > 2 * self._count(res) + COMPACT_MIN_LINES:
+                    self._compact(res)
+                    continue
+                with open(self._path(res), 'a', encoding='utf-8') as f:
+                    for sensor_id, bucket_start in dirty:
+                        f.write(json.dumps([sensor_id, bucket_start] + self._buckets[res][sensor_id][bucket_start]) + "\n")
+                self._lines[res] += len(dirty)
+
+    def choose_resolution(self, start: datetime, end: datetime, max_points: int) -> int:
+        # Najdrobniejsza rozdzielczość, przy której zakres mieści się w limicie punktów
+        span = max(0.0, (end - start).total_seconds())
+        for res in self.resolutions:
+            if span / res <= max_points:
+                return res
+        return self.resolutions[-1]
+
+    def query(self, start: datetime, end: datetime, sensor_id: str,
+              max_points: int = 500, resolution: Optional[int] = None) -> List[Dict]:
+        res = resolution or self.choose_resolution(start, end, max_points)
+        if res not in self._buckets:
+            raise ValueError(f"Nieobsługiwana rozdzielczość agregatów: {res} s (dostępne: {self.resolutions})")
+        first = int(_seconds(start) // res) * res
+        last = _seconds(end)
+        with self._lock:
+            # Przeglądane są tylko kubełki wskazanego czujnika
+            selected = sorted(
+                (bucket_start, list(bucket))
+                for bucket_start, bucket in self._buckets[res].get(sensor_id, {}).items()
+                if first <= bucket_start <= last
+            )
+        return [
+            {
+                "timestamp": EPOCH + timedelta(seconds=bucket_start),
+                "resolution": res,
+                "count": count,
+                "mean": total / count,
+                "min": low,
+                "max": high,
+                "last": last_value
+            }
+            for bucket_start, (count, total, low, high, last_value) in selected
+        ]
+
+    # --- Metody pomocnicze ---
+
+    def _path(self, res: int) -> str:
+        return os.path.join(self.directory, f"rollup_{res}.jsonl")
+
+    def _retention(self, res: int) -> Optional[int]:
+        if res == self.resolutions[0]:
+            return self.retention_days  # najdrobniejsze kubełki tak jak surowe logi
+        if res == self.resolutions[-1]:
+            return None
+        return self.coarse_retention_days
+
+    def _count(self, res: int) -> int:
+        return sum(len(buckets) for buckets in self._buckets[res].values())
+
+    def _prune(self, res: int, now: datetime):
+        days = self._retention(res)
+        if days is None:
+            return
+        cutoff = _seconds(now - timedelta(days=days))
+        for sensor_id, buckets in list(self._buckets[res].items()):
+            for bucket_start in [key for key in buckets if key < cutoff]:
+                del buckets[bucket_start]
+            if not buckets:
+                del self._buckets[res][sensor_id]
+
+    def _compact(self, res: int):
+        # Po jednym wpisie na kubełek; podmiana pliku jest atomowa
+        path = self._path(res)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for sensor_id, buckets in self._buckets[res].items():
+                for bucket_start, values in buckets.items():
+                    f.write(json.dumps([sensor_id, bucket_start] + values) + "\n")
+        os.replace(tmp_path, path)
+        self._lines[res] = self._count(res)
+
+    def _load(self, res: int):
+        path = self._path(res)
+        if not os.path.isfile(path):
+            return
+        buckets = self._buckets[res]
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    sensor_id, bucket_start, *values = json.loads(line)
+                except ValueError:
+                    continue  # niedokończony wpis po przerwanym zapisie
+                buckets.setdefault(sensor_id, {})[bucket_start] = values
+        self._prune(res, datetime.now())
+        self._compact(res)
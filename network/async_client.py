@@ -0,0 +1,322 @@
+import asyncio
+import json
+import os
+from datetime import datetime
+from typing import Optional, List
+from network.config import load_config
+from network.batch import MessageBatcher, encode_batch
+from network.spool import Spool
+from network.wire import FORMAT_JSON, FORMAT_BINARY, BinaryEncoder, hello_message
+
+class AsyncNetworkClient:
+    # Polityki przy pełnej kolejce wychodzącej:
+    #   drop_oldest - usuwa najstarszą wiadomość i przyjmuje nową,
+    #   block       - send_async() czeka na miejsce; send() nie czeka, ale wiadomość
+    #                 trafia do kolejki w zadaniu pętli zdarzeń (w kolejności wywołań),
+    #   spill       - nadmiar trafia do spoola na dysku i jest dosyłany, gdy kolejka się zwolni.
+    # Niezależnie od polityki wiadomości niedostarczone po wyczerpaniu prób
+    # trafiają do spoola i są dosyłane po czasie backoff (wykładniczym).
+    BACKPRESSURE_POLICIES = ("drop_oldest", "block", "spill")
+
+    def __init__(self, config_path="../configs/client_config.yaml"):
+        base_dir = os.path.dirname(__file__)
+        config_path = os.path.abspath(os.path.join(base_dir, config_path))
+        config = load_config(config_path)
+        self.host = config.get("host", "localhost")
+        self.port = config.get("port", 12345)
+        self.timeout = config.get("timeout", 5.0)
+        self.retries = config.get("retries", 3)
+        self.pipeline_window = max(1, config.get("pipeline_window", 64))
+        self.wire_format = config.get("wire_format", FORMAT_JSON)
+        self.queue_size = max(1, config.get("queue_size", 1000))
+        self.backpressure = config.get("backpressure", "drop_oldest")
+        if self.backpressure not in self.BACKPRESSURE_POLICIES:
+            raise ValueError(f"Nieznana polityka backpressure: {self.backpressure}")
+        self.spill_dir = os.path.abspath(os.path.join(
+            os.path.dirname(config_path), config.get("spool_dir", "../logs/spool")))
+        self.spill_max_mb = config.get("spool_max_mb", 50)
+        self.spool_backoff = config.get("spool_backoff", 0.5)
+        self.spool_max_backoff = config.get("spool_max_backoff", 30.0)
+
+        self.dropped = 0
+        self.spilled = 0
+        self._batcher = MessageBatcher(
+            self.send_batch,
+            max_messages=config.get("batch_max_messages", 1),
+            max_delay_ms=config.get("batch_max_ms", 1000),
+        )
+
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._spool = None
+        self._writer_task = None
+        self._loop = None
+        self._waiting = set()  # zadania czekające na miejsce w kolejce (polityka "block")
+        self._reader = None
+        self._writer = None
+        self._encoder = None
+        self._seq = 0
+        self._in_flight = 0
+        self._backoff = self.spool_backoff
+        self._retry_at = 0.0
+
+    def connect(self):
+        # Połączenie jest nawiązywane leniwie przez zadanie zapisujące
+        self._loop = asyncio.get_running_loop()
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = self._loop.create_task(self._run_writer())
+        self._send_event("started connection")
+
+    def send(self, data: dict) -> bool:
+        # Nigdy nie czeka na sieć - tylko wstawia wiadomość do kolejki
+        if self._waiting:
+            return self._put_later(data)  # za wiadomościami czekającymi na miejsce
+        try:
+            self._queue.put_nowait(data)
+            return True
+        except asyncio.QueueFull:
+            return self._on_queue_full(data)
+
+    def send_buffered(self, data: dict) -> bool:
+        # Odczyty są łączone w jedną ramkę typu "batch"
+        if self._batcher.max_messages <= 1:
+            return self.send(data)
+        self._batcher.add(data)
+        return True
+
+    def send_batch(self, messages: List[dict]) -> bool:
+        if len(messages) == 1:
+            return self.send(messages[0])
+        return self.send(encode_batch(messages))
+
+    async def send_async(self, data: dict) -> bool:
+        if self.backpressure == "block":
+            await self._queue.put(data)
+            return True
+        return self.send(data)
+
+    def close(self):
+        self._batcher.flush()
+        for task in list(self._waiting):
+            task.cancel()
+        if self._writer_task:
+            self._writer_task.cancel()
+            self._writer_task = None
+        self._close_stream()
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+
+    async def aclose(self, flush_timeout: Optional[float] = None):
+        # Wysyła zdarzenie zamknięcia i czeka na opróżnienie kolejki
+        self._batcher.flush()
+        self._send_event("closed connection")
+        flush_timeout = self.timeout if flush_timeout is None else flush_timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + flush_timeout
+        while (not self._queue.empty() or self._in_flight or self._waiting) and loop.time() < deadline:
+            if self._writer_task is None or self._writer_task.done():
+                break
+            await asyncio.sleep(0.01)
+        self.close()
+
+    # --- Metody pomocnicze ---
+
+    def _serialize(self, data: dict) -> bytes:
+        return (json.dumps(data) + '\n').encode('utf-8')
+
+    def _deserialize(self, raw: bytes) -> dict:
+        return json.loads(raw.decode('utf-8'))
+
+    def _on_queue_full(self, data: dict) -> bool:
+        if self.backpressure == "drop_oldest":
+            self._queue.get_nowait()
+            self._queue.put_nowait(data)
+            self.dropped += 1
+            return True
+        if self.backpressure == "spill":
+            self._spill([data])
+            return True
+        return self._put_later(data)
+
+    def _put_later(self, data: dict) -> bool:
+        # "block": synchroniczne send() nie może blokować pętli zdarzeń, więc
+        # czeka na miejsce zadanie w pętli - tak jak send_async()
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            self.dropped += 1
+            return False
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not loop:
+            # Wywołanie z innego wątku (np. wątku zapisu loggera)
+            loop.call_soon_threadsafe(self.send, data)
+            return True
+        task = loop.create_task(self._queue.put(data))
+        self._waiting.add(task)
+        task.add_done_callback(self._waiting.discard)
+        return True
+
+    def _spill(self, messages: List[dict]):
+        if self._spool is None:
+            self._spool = Spool(self.spill_dir, max_bytes=int(self.spill_max_mb * 1024 * 1024))
+        self._spool.append(messages)
+        self.spilled += len(messages)
+
+    def _spill_pending(self) -> bool:
+        if self._spool is None and os.path.isdir(self.spill_dir):
+            # spool z poprzedniego uruchomienia
+            self._spool = Spool(self.spill_dir, max_bytes=int(self.spill_max_mb * 1024 * 1024))
+        return self._spool is not None and self._spool.has_pending()
+
+    async def _run_writer(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                if self._spill_pending():
+                    if loop.time() >= self._retry_at:
+                        await self._replay_spill(loop)
+                        continue
+                    # Spool czeka na koniec backoff - nowe wiadomości nie mogą go zablokować
+                    try:
+                        first = await asyncio.wait_for(self._queue.get(), self._retry_at - loop.time())
+                    except asyncio.TimeoutError:
+                        continue
+                else:
+                    first = await self._queue.get()
+                batch = [first]
+                while len(batch) < self.pipeline_window and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+
+                if loop.time() < self._retry_at:
+                    # Serwer niedawno nie odpowiadał - nie ponawiamy przed końcem backoff
+                    self._spill(batch)
+                    continue
+
+                self._in_flight = len(batch)
+                try:
+                    undelivered = await self._deliver(batch)
+                except Exception as e:
+                    # Błąd jednej paczki nie może zakończyć zadania zapisującego
+                    print(f"[AsyncClient] Błąd wysyłania paczki: {e}")
+                    self._close_stream()
+                    undelivered = batch
+                finally:
+                    self._in_flight = 0
+                if undelivered:
+                    self._spill(undelivered)
+                    self._delay_retry(loop)
+                else:
+                    self._backoff = self.spool_backoff
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._close_stream()
+
+    async def _replay_spill(self, loop):
+        # Wiadomości zostają w spoolu do potwierdzenia przez serwer - po błędzie
+        # (albo awarii procesu) są ponawiane od tego samego miejsca
+        messages, position = self._spool.read_batch(self.pipeline_window)
+        if not messages:
+            self._spool.commit(position)
+            return
+        self._in_flight = len(messages)
+        try:
+            undelivered = await self._deliver(messages)
+        except Exception as e:
+            print(f"[AsyncClient] Błąd wysyłania paczki ze spoola: {e}")
+            self._close_stream()
+            undelivered = messages
+        finally:
+            self._in_flight = 0
+        if undelivered:
+            self._delay_retry(loop)
+        else:
+            self._spool.commit(position)
+            self._backoff = self.spool_backoff
+
+    def _delay_retry(self, loop):
+        self._retry_at = loop.time() + self._backoff
+        self._backoff = min(self._backoff * 2, self.spool_max_backoff)
+
+    async def _deliver(self, batch: List[dict]) -> List[dict]:
+        # Zwraca wiadomości niepotwierdzone przez serwer (pusta lista - sukces)
+        pending = {}
+        for message in batch:
+            self._seq += 1
+            pending[self._seq] = message
+
+        for attempt in range(1, self.retries + 1):
+            try:
+                if self._writer is None:
+                    await self._open_connection()
+                self._writer.write(self._encode_pending(pending))
+                await asyncio.wait_for(self._writer.drain(), self.timeout)
+                while pending:
+                    line = await asyncio.wait_for(self._reader.readline(), self.timeout)
+                    if not line:
+                        raise ConnectionError("Serwer zamknął połączenie przed potwierdzeniem")
+                    parts = line.strip().split()
+                    if not parts or parts[0] != b"ACK":
+                        raise ConnectionError(f"Oczekiwano ACK, otrzymano: {line}")
+                    seq = int(parts[1]) if len(parts) > 1 else min(pending)
+                    pending.pop(seq, None)
+                return []
+            except (ConnectionError, asyncio.TimeoutError, OSError) as e:
+                print(f"[AsyncClient] Próba {attempt}/{self.retries} nieudana: {e}")
+                self._close_stream()
+                if attempt < self.retries:
+                    await asyncio.sleep(min(0.1 * 2 ** attempt, self.timeout))
+        return list(pending.values())
+
+    async def _open_connection(self):
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout)
+        self._encoder = None
+        if self.wire_format == FORMAT_BINARY:
+            self._seq += 1
+            self._writer.write(self._serialize(hello_message(self._seq)))
+            line = await asyncio.wait_for(self._reader.readline(), self.timeout)
+            parts = line.strip().split()
+            if len(parts) >= 3 and parts[0] == b"ACK" and parts[2] == FORMAT_BINARY.encode():
+                self._encoder = BinaryEncoder()
+            else:
+                print("[AsyncClient] Serwer nie obsługuje formatu binarnego, używam JSON")
+
+    def _encode_pending(self, pending: dict) -> bytes:
+        # Wiadomość, której nie da się zakodować, nigdy nie zostanie wysłana -
+        # jest pomijana zamiast blokować całą paczkę (i spool)
+        frames = []
+        for seq, message in list(pending.items()):
+            try:
+                frames.append(self._encode(seq, message))
+            except (TypeError, ValueError, KeyError) as e:
+                print(f"[AsyncClient] Nie można zakodować wiadomości, pominięto: {e}")
+                del pending[seq]
+                self.dropped += 1
+        return b"".join(frames)
+
+    def _encode(self, seq: int, message: dict) -> bytes:
+        if self._encoder is not None:
+            return self._encoder.encode(message, seq)
+        return self._serialize(dict(message, seq=seq))
+
+    def _close_stream(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = None
+        self._writer = None
+        self._encoder = None
+
+    def _send_event(self, event: str, details: Optional[dict] = None):
+        message = {
+            "type": "client_event",
+            "event": event,
+            "timestamp": datetime.now().isoformat(),
+            "details": details or {}
+        }
+        try:
+            self.send(message)
+        except Exception as e:
+            print(f"[Logger] Błąd wysyłania eventu '{event}': {e}")
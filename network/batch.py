@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import time
+from typing import Callable, List
+
+BATCH_TYPE = "batch"
+
+def encode_batch(messages: List[dict]) -> dict:
+    # Klucze o identycznych wartościach we wszystkich wiadomościach
+    # (np. filename, buffer_size) są wysyłane tylko raz w "common"
+    common, items = _split_common(messages)
+    return {"type": BATCH_TYPE, "common": common, "items": items}
+
+def decode_batch(frame: dict) -> List[dict]:
+    common = frame.get("common", {})
+    return [_merge(common, item) for item in frame.get("items", [])]
+
+def is_batch(message) -> bool:
+    return isinstance(message, dict) and message.get("type") == BATCH_TYPE
+
+def _split_common(dicts: List[dict]):
+    if len(dicts) < 2:
+        return {}, [dict(d) for d in dicts]
+    common = {}
+    residuals = [dict(d) for d in dicts]
+    for key, value in dicts[0].items():
+        values = [d.get(key, _MISSING) for d in dicts]
+        if all(v == value for v in values):
+            common[key] = value
+            for r in residuals:
+                del r[key]
+        elif all(isinstance(v, dict) for v in values):
+            sub_common, sub_residuals = _split_common(values)
+            if sub_common:
+                common[key] = sub_common
+                for r, sub in zip(residuals, sub_residuals):
+                    r[key] = sub
+    return common, residuals
+
+def _merge(common: dict, item: dict) -> dict:
+    merged = dict(common)
+    for key, value in item.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+_MISSING = object()
+
+
+class MessageBatcher:
+    # Zbiera wiadomości i przekazuje je dalej paczką po max_messages
+    # wiadomościach albo po max_delay_ms od pierwszej wiadomości w paczce
+    def __init__(self, flush_callback: Callable[[List[dict]], object],
+                 max_messages: int = 50, max_delay_ms: float = 1000):
+        self.flush_callback = flush_callback
+        self.max_messages = max(1, max_messages)
+        self.max_delay_ms = max_delay_ms
+        self._items = []
+        self._first_at = None
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def add(self, message: dict):
+        with self._lock:
+            self._items.append(message)
+            if self._first_at is None:
+                self._first_at = time.monotonic()
+                self._schedule_flush()
+            full = len(self._items) >= self.max_messages
+            expired = (time.monotonic() - self._first_at) * 1000 >= self.max_delay_ms
+        if full or expired:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            items, self._items = self._items, []
+            self._first_at = None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if items:
+            self.flush_callback(items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def _schedule_flush(self):
+        delay = self.max_delay_ms / 1000
+        try:
+            # W pętli asyncio flush wykonuje się w tym samym wątku co add()
+            self._timer = asyncio.get_running_loop().call_later(delay, self.flush)
+        except RuntimeError:
+            self._timer = threading.Timer(delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
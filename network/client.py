@@ -1,9 +1,16 @@
 import socket
 import json
+import threading
 from network.config import load_config
+from network.batch import MessageBatcher, encode_batch
+from network.wire import FORMAT_JSON, FORMAT_BINARY, BinaryEncoder, hello_message
+from network.framing import FrameBuffer
+from network.spool import Spool
 import os
-from typing import Optional, Iterator, Dict
-from datetime import datetime, timedelta
+from typing import Optional, Dict, List
+from datetime import datetime
+
+ACK_MAX_SIZE = 1024
 
 class NetworkClient:
     def __init__(self, config_path="../configs/client_config.yaml"):
@@ -13,37 +20,260 @@ class NetworkClient:
         self.port = config.get("port", 12345)
         self.timeout = config.get("timeout", 5.0)
         self.retries = config.get("retries", 3)
+        # Tryb stałego połączenia: ramki wysyłane potokowo po jednym gnieździe
+        self.persistent = config.get("persistent", False)
+        self.pipeline_window = max(1, config.get("pipeline_window", 64))
+        # Format binarny jest negocjowany po połączeniu (tylko w trybie persistent)
+        self.wire_format = config.get("wire_format", FORMAT_JSON)
         self.sock = None
+        self._batcher = MessageBatcher(
+            self.send_batch,
+            max_messages=config.get("batch_max_messages", 1),
+            max_delay_ms=config.get("batch_max_ms", 1000),
+        )
+
+        self._seq = 0
+        self._ack_reader = FrameBuffer(ACK_MAX_SIZE)
+        self._encoder = None
+        self._lock = threading.Lock()
+
+        # Spool: trwała kolejka wiadomości na czas niedostępności serwera
+        spool_dir = config.get("spool_dir")
+        self.spool_dir = os.path.abspath(os.path.join(os.path.dirname(config_path), spool_dir)) if spool_dir else None
+        self.spool_max_mb = config.get("spool_max_mb", 50)
+        self.spool_segment_mb = config.get("spool_segment_mb", 1)
+        self.spool_batch = max(1, config.get("spool_batch", 200))
+        self.spool_backoff = config.get("spool_backoff", 0.5)
+        self.spool_max_backoff = config.get("spool_max_backoff", 30.0)
+        self._spool = None
+        self._server_down = False
+        self._drainer = None
+        self._stop_drainer = threading.Event()
+        self._spool_ready = threading.Event()
 
     def connect(self):
-        self.sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._ensure_spool()
+        try:
+            self._open_connection()
+        except OSError as e:
+            if self._spool is None:
+                raise
+            # Z włączonym spoolem wiadomości poczekają na dysku na serwer
+            print(f"[Client] Brak połączenia z serwerem, wiadomości trafią do spoola: {e}")
+            self._server_down = True
         self._send_event("started connection")
 
     def send(self, data: dict) -> bool:
+        return self.send_many([data])
+
+    def send_many(self, messages: List[dict]) -> bool:
+        if self.spool_dir is None:
+            return not self._deliver(messages, self.retries)
+
+        # Gdy serwer nie odpowiada albo spool nie jest pusty, wiadomość od razu
+        # trafia na dysk (bez czekania na kolejne próby i z zachowaniem kolejności)
+        if self._server_down or (self._spool is not None and self._spool.has_pending()):
+            self._spool_messages(messages)
+            return True
+        undelivered = self._deliver(messages, 1)
+        if undelivered:
+            # Do spoola trafiają tylko wiadomości niepotwierdzone przez serwer
+            self._server_down = True
+            self._spool_messages(undelivered)
+        return True
+
+    def _deliver(self, messages: List[dict], retries: int) -> List[dict]:
+        # Zwraca wiadomości, których nie udało się dostarczyć (pusta lista - sukces)
+        if self.persistent:
+            return self._deliver_pipelined(messages, retries)
+        for i, message in enumerate(messages):
+            if not self._deliver_single(message, retries):
+                # Kolejne nie są już próbowane, żeby zachować kolejność
+                return messages[i:]
+        return []
+
+    def _deliver_single(self, data: dict, retries: int) -> bool:
         message = json.dumps(data) + '\n'
-        for attempt in range(1, self.retries + 1):
+        for attempt in range(1, retries + 1):
             try:
                 with socket.create_connection((self.host, self.port), timeout=self.timeout) as sock:
                     sock.sendall(message.encode('utf-8'))
-                    ack = b""
-                    while not ack.endswith(b'\n'):
-                        chunk = sock.recv(1024)
-                        if not chunk:
-                            break
-                        ack += chunk
+                    reader = FrameBuffer(ACK_MAX_SIZE)
+                    ack = reader.next_line()
+                    while ack is None and reader.recv_into(sock):
+                        ack = reader.next_line()
+                    ack = reader.pending_bytes() if ack is None else ack.tobytes()
 
                     if ack.strip() == b"ACK":
                         return True
                     else:
                         print(f"[Client] Oczekiwano ACK, otrzymano: {ack}")
             except (ConnectionRefusedError, socket.timeout, OSError) as e:
-                print(f"[Client] Próba {attempt}/{self.retries} nieudana: {e}")
+                print(f"[Client] Próba {attempt}/{retries} nieudana: {e}")
         return False
 
+    def _deliver_pipelined(self, messages: List[dict], retries: int) -> List[dict]:
+        with self._lock:
+            # seq -> wiadomość; potwierdzone wiadomości są usuwane,
+            # więc po ponownym połączeniu wysyłamy tylko niepotwierdzone
+            pending = {self._next_seq(): message for message in messages}
+
+            attempt = 0
+            while attempt < retries:
+                # Zerwane wcześniej otwarte połączenie nie jest liczone jako próba
+                reused = self.sock is not None
+                try:
+                    if not reused:
+                        attempt += 1
+                        self._open_connection()
+                    self._pipeline(pending)
+                    return []
+                except (ConnectionError, socket.timeout, OSError) as e:
+                    print(f"[Client] Próba {attempt}/{retries} nieudana: {e}")
+                    self._drop_connection()
+            return list(pending.values())
+
+    def send_buffered(self, data: dict) -> bool:
+        # Odczyty są łączone w jedną ramkę typu "batch"
+        if self._batcher.max_messages <= 1:
+            return self.send(data)
+        self._batcher.add(data)
+        return True
+
+    def send_batch(self, messages: List[dict]) -> bool:
+        if len(messages) == 1:
+            return self.send(messages[0])
+        return self.send(encode_batch(messages))
+
     def close(self):
+        self._batcher.flush()
         if self.sock:
             self._send_event("closed connection")
-            self.sock.close()
+            self._drop_connection()
+        if self._drainer is not None:
+            self._stop_drainer.set()
+            self._spool_ready.set()
+            self._drainer.join(self.timeout)
+            self._drainer = None
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+
+    # --- Metody pomocnicze ---
+
+    def _ensure_spool(self):
+        if self.spool_dir is None or self._spool is not None:
+            return
+        self._spool = Spool(
+            self.spool_dir,
+            max_bytes=int(self.spool_max_mb * 1024 * 1024),
+            segment_bytes=int(self.spool_segment_mb * 1024 * 1024),
+        )
+        self._stop_drainer.clear()
+        self._drainer = threading.Thread(target=self._drain_spool, daemon=True)
+        self._drainer.start()
+        if self._spool.has_pending():
+            self._spool_ready.set()
+
+    def _spool_messages(self, messages: List[dict]):
+        self._ensure_spool()
+        self._spool.append(messages)
+        self._spool_ready.set()
+
+    def _drain_spool(self):
+        # Odtwarza spool paczkami; po błędzie czeka coraz dłużej (backoff wykładniczy)
+        backoff = self.spool_backoff
+        while not self._stop_drainer.is_set():
+            self._spool_ready.wait()
+            if self._stop_drainer.is_set():
+                return
+            records, position = self._spool.read_batch(self.spool_batch)
+            if not records:
+                self._spool.commit(position)
+                self._spool_ready.clear()
+                if self._spool.has_pending():
+                    self._spool_ready.set()  # w międzyczasie dopisano nowe wiadomości
+                else:
+                    self._server_down = False
+                continue
+            if not self._deliver(records, 1):
+                self._spool.commit(position)
+                backoff = self.spool_backoff
+            else:
+                self._stop_drainer.wait(backoff)
+                backoff = min(backoff * 2, self.spool_max_backoff)
+
+    def _serialize(self, data: dict) -> bytes:
+        return (json.dumps(data) + '\n').encode('utf-8')
+
+    def _deserialize(self, raw: bytes) -> dict:
+        return json.loads(raw.decode('utf-8'))
+
+    def _encode(self, seq: int, message: dict) -> bytes:
+        if self._encoder is not None:
+            return self._encoder.encode(message, seq)
+        return self._serialize(dict(message, seq=seq))
+
+    def _open_connection(self):
+        self.sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._encoder = None
+        if self.persistent and self.wire_format == FORMAT_BINARY:
+            self._negotiate_binary()
+
+    def _negotiate_binary(self):
+        seq = self._next_seq()
+        self.sock.sendall(self._serialize(hello_message(seq)))
+        parts = self._read_ack_line().split()
+        if len(parts) >= 3 and parts[0] == b"ACK" and parts[2] == FORMAT_BINARY.encode():
+            # Słownik czujników jest budowany od nowa dla każdego połączenia
+            self._encoder = BinaryEncoder()
+        else:
+            print("[Client] Serwer nie obsługuje formatu binarnego, używam JSON")
+
+    def _next_seq(self) -> int:
+        self._seq += 1
+        return self._seq
+
+    def _pipeline(self, pending: Dict[int, dict]):
+        # Wysyłamy okno ramek naraz, a dopiero potem zbieramy potwierdzenia
+        while pending:
+            window = list(pending)[:self.pipeline_window]
+            self.sock.sendall(b"".join(self._encode(seq, pending[seq]) for seq in window))
+            outstanding = set(window)
+            while outstanding:
+                seq = self._read_ack()
+                if seq is None:
+                    # Serwer bez numeracji ACK potwierdza ramki w kolejności
+                    seq = min(outstanding)
+                if seq in outstanding:
+                    outstanding.discard(seq)
+                    del pending[seq]
+
+    def _read_ack_line(self) -> bytes:
+        line = self._ack_reader.next_line()
+        while line is None:
+            if self._ack_reader.recv_into(self.sock) == 0:
+                raise ConnectionError("Serwer zamknął połączenie przed potwierdzeniem")
+            line = self._ack_reader.next_line()
+        with line:
+            return line.tobytes().strip()
+
+    def _read_ack(self) -> Optional[int]:
+        line = self._read_ack_line()
+        parts = line.split()
+        if not parts or parts[0] != b"ACK":
+            raise ConnectionError(f"Oczekiwano ACK, otrzymano: {line}")
+        return int(parts[1]) if len(parts) > 1 else None
+
+    def _drop_connection(self):
+        if self.sock:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+        self.sock = None
+        self._ack_reader = FrameBuffer(ACK_MAX_SIZE)
+        self._encoder = None
 
     def _send_event(self, event: str, details: Optional[dict] = None):
         message = {
@@ -56,4 +286,3 @@ class NetworkClient:
             self.send(message)
         except Exception as e:
             print(f"[Logger] Błąd wysyłania eventu '{event}': {e}")
-
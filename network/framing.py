@@ -0,0 +1,87 @@
+import struct
+from typing import Optional, Tuple
+
+DEFAULT_MAX_FRAME_SIZE = 1024 * 1024
+
+class FrameTooLarge(ValueError):
+    pass
+
+
+class FrameBuffer:
+    # Bufor odbiorczy wielokrotnego użytku: dane są wczytywane przez recv_into
+    # do jednego bytearray, a ramki zwracane jako memoryview bez kopiowania.
+    # Zwrócone widoki są ważne tylko do następnego wywołania recv_into()/feed().
+    def __init__(self, max_frame_size: int = DEFAULT_MAX_FRAME_SIZE, chunk_size: int = 4096):
+        self.max_frame_size = max_frame_size
+        self.chunk_size = chunk_size
+        self._buf = bytearray(chunk_size * 2)
+        self._start = 0
+        self._end = 0
+        self._scan = 0  # miejsce, od którego szukać separatora (wcześniejsze dane już przeszukano)
+
+    def recv_into(self, sock) -> int:
+        self._reserve(self.chunk_size)
+        with memoryview(self._buf) as view:
+            n = sock.recv_into(view[self._end:])
+        self._end += n
+        return n
+
+    def feed(self, data: bytes):
+        self._reserve(len(data))
+        self._buf[self._end:self._end + len(data)] = data
+        self._end += len(data)
+
+    def pending(self) -> int:
+        return self._end - self._start
+
+    def pending_bytes(self) -> bytes:
+        return bytes(self._buf[self._start:self._end])
+
+    def next_line(self, delimiter: bytes = b"\n") -> Optional[memoryview]:
+        index = self._buf.find(delimiter, max(self._scan, self._start), self._end)
+        if index < 0:
+            # Duża ramka przychodząca w wielu kawałkach nie jest przeszukiwana od początku
+            self._scan = max(self._start, self._end - len(delimiter) + 1)
+            if self.pending() > self.max_frame_size:
+                raise FrameTooLarge(f"Ramka przekracza limit {self.max_frame_size} B")
+            return None
+        if index - self._start > self.max_frame_size:
+            raise FrameTooLarge(f"Ramka przekracza limit {self.max_frame_size} B")
+        line = memoryview(self._buf)[self._start:index]
+        self._start = self._scan = index + len(delimiter)
+        return line
+
+    def next_frame(self, header: struct.Struct) -> Optional[Tuple[tuple, memoryview]]:
+        # Pierwsze pole nagłówka to długość danych ramki
+        if self.pending() < header.size:
+            return None
+        fields = header.unpack_from(self._buf, self._start)
+        length = fields[0]
+        if length > self.max_frame_size:
+            raise FrameTooLarge(f"Ramka {length} B przekracza limit {self.max_frame_size} B")
+        begin = self._start + header.size
+        if self._end - begin < length:
+            return None
+        payload = memoryview(self._buf)[begin:begin + length]
+        self._start = self._scan = begin + length
+        return fields, payload
+
+    def _reserve(self, size: int):
+        if self._start == self._end:
+            self._start = self._end = self._scan = 0
+        if len(self._buf) - self._end >= size:
+            return
+        pending = self.pending()
+        needed = pending + size
+        if needed <= len(self._buf) and self._start > 0:
+            # Przesunięcie niezużytych danych na początek bufora
+            self._buf[:pending] = self._buf[self._start:self._end]
+        else:
+            capacity = len(self._buf)
+            while capacity < needed:
+                capacity *= 2
+            grown = bytearray(capacity)
+            grown[:pending] = self._buf[self._start:self._end]
+            self._buf = grown
+        self._scan = max(0, self._scan - self._start)
+        self._start, self._end = 0, pending
@@ -0,0 +1,118 @@
+import asyncio
+from network.server.server import NetworkServer
+from network.wire import HEADER
+from network.framing import FrameTooLarge
+
+class AsyncNetworkServer(NetworkServer):
+    # Serwer na jednej pętli asyncio - bez wątku na połączenie i bez
+    # odpytywania accept() z timeoutem. Ramki dzieli StreamReader (readline,
+    # readexactly), który sam nie przeszukuje ponownie odebranych danych -
+    # FrameBuffer jest używany tylko przez serwer wątkowy.
+    def __init__(self, config_path="../../configs/server_config.yaml"):
+        super().__init__(config_path)
+        self.idle_timeout = self.config.get("idle_timeout", 60.0)
+        self._loop = None
+        self._stopped = None
+        self._connections = set()
+
+    def start(self):
+        self._start_pipeline()
+        try:
+            asyncio.run(self._serve())
+        except KeyboardInterrupt:
+            self.logger.info("Przerwano działanie serwera (Ctrl+C)")
+        except Exception as e:
+            self.logger.error(f"Błąd serwera: {e}")
+        finally:
+            self.running = False
+            self._stop_pipeline()
+            self.logger.info("Serwer zatrzymany")
+
+    def stop(self):
+        self.running = False
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            # stop() może zostać wywołane z innego wątku
+            loop.call_soon_threadsafe(self._stopped.set)
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        server = await asyncio.start_server(
+            self._handle_stream, "0.0.0.0", self.port, limit=self.max_frame_size)
+        self.sock = server.sockets[0]
+        self.running = True
+        self.logger.info(f"Serwer (asyncio) nasłuchuje na porcie {self.port}")
+
+        try:
+            async with server:
+                await self._stopped.wait()
+                server.close()
+                for writer in list(self._connections):
+                    writer.close()
+                await server.wait_closed()
+        finally:
+            self._loop = None
+
+    async def _handle_stream(self, reader, writer):
+        addr = writer.get_extra_info("peername")
+        self._connections.add(writer)
+        session = {"decoder": None}
+        received_any = False
+        try:
+            while True:
+                try:
+                    if session["decoder"] is None:
+                        ack, eof = await asyncio.wait_for(
+                            self._read_json_frame(reader, addr, session), self.idle_timeout)
+                    else:
+                        ack, eof = await asyncio.wait_for(
+                            self._read_binary_frame(reader, addr, session), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    self.logger.info(f"Zamykanie bezczynnego połączenia z {addr}")
+                    break
+                except asyncio.IncompleteReadError:
+                    self.logger.warning(f"Połączenie z {addr} zakończone w trakcie przesyłania danych.")
+                    break
+
+                if eof:
+                    if not received_any:
+                        self.logger.warning(f"Połączenie z {addr} zamknięte bez danych.")
+                    break
+                received_any = True
+                if ack is None:
+                    continue
+                if ack is False:
+                    break
+                writer.write(ack)
+                await writer.drain()
+        except (ConnectionError, ValueError) as e:
+            self.logger.error(f"[ERROR] Błąd klienta {addr}: {e}")
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    # Zwracają (ack, eof): ack None oznacza pustą linię, False - błąd ramki
+    async def _read_json_frame(self, reader, addr, session):
+        line = await reader.readline()
+        if not line:
+            return None, True
+        if not line.endswith(b"\n"):
+            raise asyncio.IncompleteReadError(line, None)
+        if not line.strip():
+            return None, False
+        ack = self._process_frame(line, addr, session)
+        return (False if ack is None else ack), False
+
+    async def _read_binary_frame(self, reader, addr, session):
+        header = await reader.read(HEADER.size)
+        if not header:
+            return None, True
+        if len(header) < HEADER.size:
+            header += await reader.readexactly(HEADER.size - len(header))
+        length, kind, seq = HEADER.unpack(header)
+        if length > self.max_frame_size:
+            raise FrameTooLarge(f"Ramka {length} B przekracza limit {self.max_frame_size} B")
+        payload = await reader.readexactly(length)
+        ack = self._process_binary_frame(kind, seq, memoryview(payload), addr, session)
+        return (False if ack is None else ack), False
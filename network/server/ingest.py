@@ -0,0 +1,194 @@
+import os
+import queue
+import threading
+import logging
+from datetime import datetime
+from typing import List, Optional
+from logger.logger import Logger
+
+def reading_from_message(message) -> Optional[tuple]:
+    # Zdarzenie log_reading -> (timestamp, sensor_id, sensor_name, value, unit)
+    if not isinstance(message, dict) or message.get("event") != "log_reading":
+        return None
+    details = message.get("details")
+    if not isinstance(details, dict):
+        return None
+    try:
+        return (
+            datetime.fromisoformat(details["timestamp"]),
+            details["sensor_id"],
+            details.get("sensor_name", ""),
+            float(details["value"]),
+            details.get("unit", "")
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def readings_from_message(message) -> List[tuple]:
+    # log_reading lub paczka log_readings (wiersze [timestamp, sensor_id, sensor_name, value, unit])
+    if isinstance(message, dict) and message.get("event") == "log_readings":
+        details = message.get("details")
+        readings = []
+        for row in (details.get("readings") or []) if isinstance(details, dict) else []:
+            try:
+                timestamp, sensor_id, sensor_name, value, unit = row
+                readings.append((datetime.fromisoformat(timestamp), sensor_id, sensor_name, float(value), unit))
+            except (TypeError, ValueError):
+                continue
+        return readings
+    reading = reading_from_message(message)
+    return [] if reading is None else [reading]
+
+
+class PrintSink:
+    # Dawne zachowanie serwera - tylko do debugowania
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def write(self, message: dict, addr):
+        with self._lock:
+            print(f"[RECEIVED from {addr}]:")
+            for k, v in message.items():
+                print(f"  {k}: {v}")
+
+    def close(self):
+        pass
+
+
+class CsvSink:
+    # Zapisuje odczyty przez Logger (bufor, rotacja i archiwizacja plików CSV)
+    def __init__(self, logger_config_path: str):
+        self.logger = Logger(logger_config_path)
+        self.logger.start()
+        self._lock = threading.Lock()
+
+    def write(self, message: dict, addr):
+        readings = readings_from_message(message)
+        if not readings:
+            return
+        with self._lock:
+            if len(readings) == 1:
+                self.logger.log_reading(*readings[0])
+            else:
+                self.logger.log_readings(readings)
+
+    def close(self):
+        with self._lock:
+            self.logger.stop()
+
+
+class AggregateSink:
+    # Bieżące statystyki per czujnik trzymane w pamięci
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def write(self, message: dict, addr):
+        readings = readings_from_message(message)
+        if not readings:
+            return
+        with self._lock:
+            for timestamp, sensor_id, sensor_name, value, unit in readings:
+                stats = self._stats.get(sensor_id)
+                if stats is None:
+                    self._stats[sensor_id] = {
+                        "sensor_name": sensor_name,
+                        "unit": unit,
+                        "count": 1,
+                        "sum": value,
+                        "min": value,
+                        "max": value,
+                        "last": value,
+                        "last_timestamp": timestamp
+                    }
+                    continue
+                stats["count"] += 1
+                stats["sum"] += value
+                stats["min"] = min(stats["min"], value)
+                stats["max"] = max(stats["max"], value)
+                stats["last"] = value
+                stats["last_timestamp"] = timestamp
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {sensor_id: dict(stats) for sensor_id, stats in self._stats.items()}
+
+    def close(self):
+        pass
+
+
+class IngestionPipeline:
+    # Wiadomości z jednego połączenia trafiają zawsze do tego samego wątku,
+    # dzięki czemu zachowują kolejność w zapisie do plików
+    def __init__(self, sinks: List, queue_size: int = 10000, workers: int = 2):
+        self.sinks = sinks
+        self.workers = max(1, workers)
+        self.dropped = 0
+        self._queues = [queue.Queue(maxsize=max(1, queue_size // self.workers)) for _ in range(self.workers)]
+        self._threads = []
+        self._logger = logging.getLogger('NetworkServer')
+
+    def start(self):
+        for q in self._queues:
+            thread = threading.Thread(target=self._run, args=(q,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, message: dict, addr) -> bool:
+        q = self._queues[hash(addr) % self.workers]
+        try:
+            q.put_nowait((message, addr))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                self._logger.warning(f"Kolejka ingestii pełna, odrzucono {self.dropped} wiadomości")
+            return False
+
+    def stop(self, timeout: float = 5.0):
+        for q in self._queues:
+            try:
+                q.put(None, timeout=timeout)
+            except queue.Full:
+                # Wątek nie odbiera z kolejki (np. zakończył się błędem) - nie czekamy w nieskończoność
+                self._logger.error("Kolejka ingestii nie została opróżniona przed zatrzymaniem")
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                self._logger.error(f"Błąd zamykania ujścia {type(sink).__name__}: {e}")
+
+    def _run(self, q: queue.Queue):
+        while True:
+            item = q.get()
+            if item is None:
+                return
+            message, addr = item
+            for sink in self.sinks:
+                try:
+                    sink.write(message, addr)
+                except Exception as e:
+                    self._logger.error(f"Błąd ujścia {type(sink).__name__}: {e}")
+
+
+def build_pipeline(config: dict, config_dir: str) -> IngestionPipeline:
+    sinks = []
+    for name in config.get("sinks", ["aggregate"]):
+        if name == "csv":
+            logger_config = os.path.join(config_dir, config.get("logger_config", "server_logger_config.json"))
+            sinks.append(CsvSink(logger_config))
+        elif name == "aggregate":
+            sinks.append(AggregateSink())
+        elif name == "print":
+            sinks.append(PrintSink())
+        else:
+            raise ValueError(f"Nieznane ujście ingestii: {name}")
+    return IngestionPipeline(
+        sinks,
+        queue_size=config.get("queue_size", 10000),
+        workers=config.get("workers", 2)
+    )
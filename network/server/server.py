@@ -1,18 +1,28 @@
 import socket
 import threading
 import json
+import struct
 import sys
 from network.config import load_config
+from network.batch import is_batch, decode_batch
+from network.wire import FORMAT_JSON, FORMAT_BINARY, HEADER, BinaryDecoder, is_hello
+from network.framing import FrameBuffer, FrameTooLarge, DEFAULT_MAX_FRAME_SIZE
+from network.server.ingest import build_pipeline
 import os
 import logging
+from typing import Optional
 
 class NetworkServer:
     def __init__(self, config_path="../../configs/server_config.yaml"):
         config_path = os.path.abspath(os.path.join(os.path.dirname(__file__), config_path))
         config = load_config(config_path)
+        self.config = config
         self.port = config.get("port", 12345)
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.sock.settimeout(1.0)  # timeout 1 sekunda na accept
+        self.allow_binary = config.get("allow_binary", True)
+        self.max_frame_size = config.get("max_frame_size", DEFAULT_MAX_FRAME_SIZE)
+        self.config_dir = os.path.dirname(config_path)
+        self.pipeline = None
+        self.sock = None
         self.logger = logging.getLogger('NetworkServer')
         self.logger.setLevel(logging.INFO)
         ch = logging.StreamHandler()
@@ -21,6 +31,9 @@ class NetworkServer:
         self.running = False
 
     def start(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.settimeout(1.0)  # timeout 1 sekunda na accept
+        self._start_pipeline()
         try:
             self.sock.bind(("0.0.0.0", self.port))
             self.sock.listen()
@@ -40,6 +53,7 @@ class NetworkServer:
             self.logger.error(f"Błąd serwera: {e}")
         finally:
             self.sock.close()
+            self._stop_pipeline()
             self.logger.info("Serwer zatrzymany")
 
     def stop(self):
@@ -48,30 +62,112 @@ class NetworkServer:
     def _handle_client(self, client_socket, addr):
         with client_socket:
             try:
-                data = b""
-                while not data.endswith(b"\n"):
-                    part = client_socket.recv(1024)
-                    if not part:
-                        if not data:
+                # Połączenie może nieść wiele ramek: linie JSON albo,
+                # po negocjacji, ramki binarne z prefiksem długości
+                buffer = FrameBuffer(self.max_frame_size)
+                session = {"decoder": None}
+                received_any = False
+                while True:
+                    if buffer.recv_into(client_socket) == 0:
+                        if not received_any:
                             self.logger.warning(f"Połączenie z {addr} zamknięte bez danych.")
-                        else:
+                        elif buffer.pending_bytes().strip():
                             self.logger.warning(f"Połączenie z {addr} zakończone w trakcie przesyłania danych.")
                         return  # zakończ wątek klienta
 
-                    data += part
+                    received_any = True
+                    acks, ok = self._consume_frames(buffer, session, addr)
+                    if acks:
+                        client_socket.sendall(b"".join(acks))
+                    if not ok:
+                        return
 
-                try:
-                    message = json.loads(data.decode())
-                except json.JSONDecodeError as e:
-                    self.logger.error(f"Nieprawidłowy JSON od {addr}: {e}")
-                    return
+            except FrameTooLarge as e:
+                self.logger.error(f"Zbyt duża ramka od {addr}: {e}")
+            except Exception as e:
+                self.logger.error(f"[ERROR] Błąd klienta {addr}: {e}")
 
-                print(f"[RECEIVED from {addr}]:")
-                for k, v in message.items():
-                    print(f"  {k}: {v}")
+    def _consume_frames(self, buffer: FrameBuffer, session: dict, addr):
+        acks = []
+        while True:
+            decoder = session["decoder"]
+            if decoder is None:
+                line = buffer.next_line()
+                if line is None:
+                    break
+                with line:
+                    ack = self._process_frame(line, addr, session)
+            else:
+                frame = buffer.next_frame(HEADER)
+                if frame is None:
+                    break
+                (_, kind, seq), payload = frame
+                with payload:
+                    ack = self._process_binary_frame(kind, seq, payload, addr, session)
+            if ack is None:
+                return acks, False
+            acks.append(ack)
+        return acks, True
 
-                client_socket.sendall(b"ACK\n")
+    def _process_frame(self, frame, addr, session: Optional[dict] = None):
+        try:
+            text = str(frame, 'utf-8')
+            if not text.strip():
+                return b""
+            message = json.loads(text)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            self.logger.error(f"Nieprawidłowy JSON od {addr}: {e}")
+            return None
 
-            except Exception as e:
-                self.logger.error(f"[ERROR] Błąd klienta {addr}: {e}")
+        # ACK z numerem sekwencyjnym pozwala klientowi dopasować potwierdzenie
+        seq = message.get("seq") if isinstance(message, dict) else None
+        if is_hello(message):
+            return self._negotiate(message, seq, session)
+
+        if not self._dispatch(message, addr):
+            # Bez ACK klient zachowa wiadomość (ponowi albo odłoży do spoola)
+            self.logger.warning(f"Kolejka ingestii pełna, ramka od {addr} nie została potwierdzona")
+            return None
+        if seq is not None:
+            return f"ACK {seq}\n".encode()
+        return b"ACK\n"
+
+    def _process_binary_frame(self, kind: int, seq: int, payload: memoryview, addr, session: dict):
+        try:
+            messages = session["decoder"].decode(kind, payload)
+        except (ValueError, KeyError, struct.error) as e:
+            self.logger.error(f"Nieprawidłowa ramka binarna od {addr}: {e}")
+            return None
+        if not all(self._dispatch(message, addr) for message in messages):
+            self.logger.warning(f"Kolejka ingestii pełna, ramka {seq} od {addr} nie została potwierdzona")
+            return None
+        return f"ACK {seq}\n".encode()
+
+    def _negotiate(self, message: dict, seq, session: Optional[dict]):
+        wire_format = message.get("format", FORMAT_JSON)
+        if wire_format == FORMAT_BINARY and self.allow_binary and session is not None:
+            session["decoder"] = BinaryDecoder()
+        else:
+            wire_format = FORMAT_JSON
+        return f"ACK {seq} {wire_format}\n".encode()
+
+    def _dispatch(self, message, addr) -> bool:
+        # Paczka jest potwierdzana raz, a rozpakowywana na pojedyncze rekordy;
+        # False - rekord odrzucony, ramki nie wolno potwierdzić
+        records = decode_batch(message) if is_batch(message) else [message]
+        return all(self._handle_message(record, addr) for record in records)
+
+    def _handle_message(self, message: dict, addr) -> bool:
+        # Obsługa wiadomości odbywa się w wątkach ingestii, nie w wątku połączenia
+        if self.pipeline is not None:
+            return self.pipeline.submit(message, addr)
+        return True
+
+    def _start_pipeline(self):
+        self.pipeline = build_pipeline(self.config.get("ingest", {}), self.config_dir)
+        self.pipeline.start()
 
+    def _stop_pipeline(self):
+        if self.pipeline is not None:
+            self.pipeline.stop()
+            self.pipeline = None
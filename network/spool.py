@@ -0,0 +1,177 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from typing import List, Tuple
+
+# Rekord w segmencie: nagłówek (długość, crc32) + JSON w UTF-8
+RECORD = struct.Struct("<II")
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".log"
+CURSOR_FILE = "cursor.json"
+
+
+class Spool:
+    # Trwała kolejka na dysku (append-only) dla wiadomości, których nie udało
+    # się wysłać. Segmenty i pozycja odczytu przetrwają restart klienta,
+    # a łączny rozmiar jest ograniczony przez max_bytes (najstarsze segmenty są usuwane).
+    def __init__(self, directory: str, max_bytes: int = 50 * 1024 * 1024,
+                 segment_bytes: int = 1024 * 1024, fsync: bool = False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.dropped_segments = 0
+        self._lock = threading.RLock()
+        self._sizes = {}
+
+        os.makedirs(directory, exist_ok=True)
+        self._segments = sorted(
+            int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+            for name in os.listdir(directory)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+        self._read_pos = self._load_cursor()
+        for segment in [s for s in self._segments if s < self._read_pos[0]]:
+            self._remove_segment(segment)
+        if not self._segments:
+            self._segments.append(max(1, self._read_pos[0]))
+        if self._read_pos[0] not in self._segments:
+            self._read_pos = (self._segments[0], 0)
+
+        self._repair_tail(self._segments[-1])
+        self._file = open(self._segment_path(self._segments[-1]), 'ab')
+        self._sizes = {s: os.path.getsize(self._segment_path(s)) for s in self._segments}
+
+    def append(self, messages: List[dict]):
+        with self._lock:
+            for message in messages:
+                raw = json.dumps(message).encode('utf-8')
+                if self._sizes[self._segments[-1]] >= self.segment_bytes:
+                    self._roll_segment()
+                self._file.write(RECORD.pack(len(raw), zlib.crc32(raw)))
+                self._file.write(raw)
+                self._sizes[self._segments[-1]] += RECORD.size + len(raw)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._enforce_limit()
+
+    def has_pending(self) -> bool:
+        with self._lock:
+            segment, offset = self._read_pos
+            return segment != self._segments[-1] or offset < self._sizes[segment]
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def read_batch(self, max_records: int) -> Tuple[List[dict], Tuple[int, int]]:
+        # Zwraca rekordy od bieżącej pozycji i pozycję, którą należy
+        # przekazać do commit() po ich skutecznym wysłaniu
+        with self._lock:
+            records = []
+            segment, offset = self._read_pos
+            for current in [s for s in self._segments if s >= segment]:
+                if current != segment:
+                    offset = 0
+                segment = current
+                offset = self._read_segment(segment, offset, max_records - len(records), records)
+                if len(records) >= max_records:
+                    break
+            return records, (segment, offset)
+
+    def commit(self, position: Tuple[int, int]):
+        with self._lock:
+            self._read_pos = position
+            for segment in [s for s in self._segments[:-1] if s < position[0]]:
+                self._remove_segment(segment)
+            self._save_cursor()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    # --- Metody pomocnicze ---
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{segment:08d}{SEGMENT_SUFFIX}")
+
+    def _read_segment(self, segment: int, offset: int, limit: int, out: List[dict]) -> int:
+        size = self._sizes.get(segment, 0)
+        if offset >= size or limit <= 0:
+            return offset
+        with open(self._segment_path(segment), 'rb') as f, \
+                mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+            while offset + RECORD.size <= size and limit > 0:
+                length, crc = RECORD.unpack_from(mm, offset)
+                end = offset + RECORD.size + length
+                if end > size:
+                    break
+                raw = mm[offset + RECORD.size:end]
+                offset = end
+                if zlib.crc32(raw) != crc:
+                    continue  # uszkodzony rekord jest pomijany
+                out.append(json.loads(raw))
+                limit -= 1
+        return offset
+
+    def _roll_segment(self):
+        self._file.close()
+        segment = self._segments[-1] + 1
+        self._segments.append(segment)
+        self._sizes[segment] = 0
+        self._file = open(self._segment_path(segment), 'ab')
+
+    def _enforce_limit(self):
+        while sum(self._sizes.values()) > self.max_bytes and len(self._segments) > 1:
+            oldest = self._segments[0]
+            self._remove_segment(oldest)
+            self.dropped_segments += 1
+            if self._read_pos[0] <= oldest:
+                self._read_pos = (self._segments[0], 0)
+                self._save_cursor()
+
+    def _remove_segment(self, segment: int):
+        try:
+            os.remove(self._segment_path(segment))
+        except FileNotFoundError:
+            pass
+        self._segments.remove(segment)
+        self._sizes.pop(segment, None)
+
+    def _repair_tail(self, segment: int):
+        # Obcina niepełny rekord pozostawiony przez przerwany zapis
+        path = self._segment_path(segment)
+        if not os.path.isfile(path):
+            return
+        size = os.path.getsize(path)
+        offset = 0
+        with open(path, 'rb') as f:
+            while offset + RECORD.size <= size:
+                f.seek(offset)
+                length, _ = RECORD.unpack(f.read(RECORD.size))
+                if offset + RECORD.size + length > size:
+                    break
+                offset += RECORD.size + length
+        if offset < size:
+            with open(path, 'r+b') as f:
+                f.truncate(offset)
+
+    def _load_cursor(self) -> Tuple[int, int]:
+        path = os.path.join(self.directory, CURSOR_FILE)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                cursor = json.load(f)
+            return int(cursor["segment"]), int(cursor["offset"])
+        except (FileNotFoundError, ValueError, KeyError):
+            return (self._segments[0] if self._segments else 1), 0
+
+    def _save_cursor(self):
+        path = os.path.join(self.directory, CURSOR_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"segment": self._read_pos[0], "offset": self._read_pos[1]}, f)
+        os.replace(tmp_path, path)
@@ -0,0 +1,174 @@
+import json
+import struct
+from datetime import datetime
+from typing import List, Optional, Tuple
+from network.batch import is_batch, decode_batch
+
+FORMAT_JSON = "json"
+FORMAT_BINARY = "binary"
+
+# Ramka binarna: nagłówek (długość danych, rodzaj ramki, seq) + dane
+HEADER = struct.Struct("<IBI")
+KIND_JSON = 1
+KIND_READINGS = 2
+KIND_READING_ROWS = 3  # paczka log_readings (wiersze z Logger.log_readings)
+
+# Dane ramki KIND_READINGS: liczniki, nowe wpisy słownika czujników, rekordy
+COUNTS = struct.Struct("<HI")       # liczba nowych wpisów słownika, liczba rekordów
+ENTRY = struct.Struct("<H")         # indeks czujnika w słowniku
+TEXT_LEN = struct.Struct("<H")      # długość tekstu UTF-8
+READING = struct.Struct("<dHd")     # timestamp (epoch), indeks czujnika, wartość
+
+MAX_SENSORS = 2 ** 16
+
+def hello_message(seq: int, wire_format: str = FORMAT_BINARY) -> dict:
+    return {"type": "hello", "format": wire_format, "seq": seq}
+
+def is_hello(message) -> bool:
+    return isinstance(message, dict) and message.get("type") == "hello"
+
+def is_reading(message) -> bool:
+    return (
+        isinstance(message, dict)
+        and message.get("type") == "logger_event"
+        and message.get("event") == "log_reading"
+        and isinstance(message.get("details"), dict)
+    )
+
+def is_reading_rows(message) -> bool:
+    return (
+        isinstance(message, dict)
+        and message.get("type") == "logger_event"
+        and message.get("event") == "log_readings"
+        and isinstance(message.get("details"), dict)
+        and isinstance(message["details"].get("readings"), list)
+    )
+
+def _row_details(row) -> dict:
+    timestamp, sensor_id, sensor_name, value, unit = row
+    return {"timestamp": timestamp, "sensor_id": sensor_id, "sensor_name": sensor_name, "value": value, "unit": unit}
+
+
+class BinaryEncoder:
+    # Stan jednego połączenia: czujniki (sensor_id, nazwa, jednostka) są
+    # kodowane słownikowo, a wpis słownika jest wysyłany tylko przy pierwszym użyciu
+    def __init__(self):
+        self._index = {}
+
+    def encode(self, message: dict, seq: int) -> bytes:
+        kind, readings = self._as_readings(message)
+        payload = None
+        if readings is not None:
+            try:
+                payload = self._encode_readings(readings)
+            except (KeyError, TypeError, ValueError):
+                payload = None  # np. niepoprawny timestamp - słownik pozostaje bez zmian
+        if payload is None:
+            kind = KIND_JSON
+            payload = json.dumps(message).encode('utf-8')
+        return HEADER.pack(len(payload), kind, seq) + payload
+
+    def _as_readings(self, message: dict) -> Tuple[int, Optional[List[dict]]]:
+        # Pojedyncze odczyty (log_reading) albo paczki wierszy (log_readings);
+        # mieszane ramki i inne wiadomości idą jako JSON
+        items = decode_batch(message) if is_batch(message) else [message]
+        if not items:
+            return KIND_JSON, None
+        try:
+            if all(is_reading(item) for item in items):
+                kind, readings = KIND_READINGS, [item["details"] for item in items]
+            elif all(is_reading_rows(item) for item in items):
+                kind = KIND_READING_ROWS
+                readings = [_row_details(row) for item in items for row in item["details"]["readings"]]
+            else:
+                return KIND_JSON, None
+            new_keys = {self._key(d) for d in readings} - self._index.keys()
+        except (KeyError, TypeError, ValueError):
+            return KIND_JSON, None
+        if len(self._index) + len(new_keys) > MAX_SENSORS:
+            return KIND_JSON, None
+        return kind, readings
+
+    def _encode_readings(self, readings: List[dict]) -> bytes:
+        # Nowe wpisy trafiają do słownika dopiero po spakowaniu całej ramki -
+        # wyjątek w trakcie nie zostawia wpisów, których serwer nigdy nie dostał
+        added = {}
+        records = bytearray(READING.size * len(readings))
+        for i, details in enumerate(readings):
+            key = self._key(details)
+            index = self._index.get(key)
+            if index is None:
+                index = added.get(key)
+            if index is None:
+                index = len(self._index) + len(added)
+                added[key] = index
+            timestamp = datetime.fromisoformat(details["timestamp"]).timestamp()
+            READING.pack_into(records, i * READING.size, timestamp, index, float(details["value"]))
+
+        parts = [COUNTS.pack(len(added), len(readings))]
+        for key, index in added.items():
+            parts.append(ENTRY.pack(index))
+            for text in key:
+                raw = text.encode('utf-8')
+                parts.append(TEXT_LEN.pack(len(raw)))
+                parts.append(raw)
+        parts.append(records)
+        payload = b"".join(parts)
+        self._index.update(added)
+        return payload
+
+    @staticmethod
+    def _key(details: dict):
+        return (str(details["sensor_id"]), str(details.get("sensor_name", "")), str(details.get("unit", "")))
+
+
+class BinaryDecoder:
+    def __init__(self):
+        self._entries = {}
+
+    def decode(self, kind: int, payload: memoryview) -> List[dict]:
+        if kind == KIND_JSON:
+            return [json.loads(str(payload, 'utf-8'))]
+        if kind not in (KIND_READINGS, KIND_READING_ROWS):
+            raise ValueError(f"Nieznany rodzaj ramki: {kind}")
+
+        n_entries, n_records = COUNTS.unpack_from(payload, 0)
+        offset = COUNTS.size
+        for _ in range(n_entries):
+            (index,) = ENTRY.unpack_from(payload, offset)
+            offset += ENTRY.size
+            texts = []
+            for _ in range(3):
+                (length,) = TEXT_LEN.unpack_from(payload, offset)
+                offset += TEXT_LEN.size
+                texts.append(str(payload[offset:offset + length], 'utf-8'))
+                offset += length
+            self._entries[index] = tuple(texts)
+
+        end = offset + n_records * READING.size
+        if end != len(payload):
+            raise ValueError("Niezgodna długość ramki z odczytami")
+
+        if kind == KIND_READING_ROWS:
+            # Cała ramka wraca jako jedna paczka log_readings
+            rows = []
+            for timestamp, index, value in READING.iter_unpack(payload[offset:end]):
+                sensor_id, sensor_name, unit = self._entries[index]
+                rows.append([datetime.fromtimestamp(timestamp).isoformat(), sensor_id, sensor_name, value, unit])
+            return [{"type": "logger_event", "event": "log_readings", "details": {"readings": rows}}]
+
+        records = []
+        for timestamp, index, value in READING.iter_unpack(payload[offset:end]):
+            sensor_id, sensor_name, unit = self._entries[index]
+            records.append({
+                "type": "logger_event",
+                "event": "log_reading",
+                "details": {
+                    "timestamp": datetime.fromtimestamp(timestamp).isoformat(),
+                    "sensor_id": sensor_id,
+                    "sensor_name": sensor_name,
+                    "value": value,
+                    "unit": unit
+                }
+            })
+        return records
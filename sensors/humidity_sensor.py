@@ -10,3 +10,8 @@ class HumiditySensor(Sensor):
         temp_effect = random.uniform(-5, 5)
         base_humidity = random.uniform(self.min_value, self.max_value)
         self.last_value = round(base_humidity + temp_effect, 2)
+
+    def _generate_values(self, np, rng, timestamps):
+        temp_effect = rng.uniform(-5, 5, len(timestamps))
+        base_humidity = rng.uniform(self.min_value, self.max_value, len(timestamps))
+        return np.round(base_humidity + temp_effect, 2)
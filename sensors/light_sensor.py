@@ -1,5 +1,5 @@
 from datetime import datetime
-from sensors.sensor import Sensor
+from sensors.sensor import Sensor, _local_hours
 import random
 import math
 
@@ -13,4 +13,11 @@ class LightSensor(Sensor):
         else:
             base_light = 0
         noise = random.uniform(-100, 100)
-        self.last_value = round(max(0, base_light + noise), 2)
\ No newline at end of file
+        self.last_value = round(max(0, base_light + noise), 2)
+
+    def _generate_values(self, np, rng, timestamps):
+        hours = _local_hours(np, timestamps)
+        daylight = (hours >= 6) & (hours <= 18)
+        base_light = np.where(daylight, self.max_value * np.sin(((hours - 6) / 12.0) * np.pi), 0)
+        noise = rng.uniform(-100, 100, len(timestamps))
+        return np.round(np.maximum(0, base_light + noise), 2)
@@ -8,4 +8,9 @@ class PressureSensor(Sensor):
             raise Exception("Czujnik ciśnienia jest wyłączony.")
         fluctuation = random.gauss(0, 1.5)
         pressure = (self.max_value + self.min_value) / 2 + fluctuation
-        self.last_value = round(pressure, 2)
\ No newline at end of file
+        self.last_value = round(pressure, 2)
+
+    def _generate_values(self, np, rng, timestamps):
+        fluctuation = rng.normal(0, 1.5, len(timestamps))
+        pressure = (self.max_value + self.min_value) / 2 + fluctuation
+        return np.round(pressure, 2)
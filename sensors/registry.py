@@ -0,0 +1,99 @@
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+class SensorRegistry:
+    # Czujniki indeksowane po id oraz po typie i jednostce, z osobnym zbiorem
+    # aktywnych. Indeksy są aktualizowane przez powiadomienia z Sensor
+    # (edit_values, start, stop), więc zmiana sensor_id nie psuje wyszukiwania.
+    # Zachowuje się jak lista czujników (iteracja, len, indeks) w kolejności dodania.
+    def __init__(self):
+        self._sensors = []  # kolejność dodania
+        self._by_id = {}
+        self._by_type: Dict[str, dict] = {}
+        self._by_unit: Dict[str, dict] = {}
+        self._active = {}
+
+    def add(self, sensor):
+        if sensor.sensor_id in self._by_id:
+            raise ValueError(f"Czujnik o id {sensor.sensor_id} już istnieje.")
+        self._by_id[sensor.sensor_id] = sensor
+        self._sensors.append(sensor)
+        self._index(self._by_type, self._type_of(sensor), sensor)
+        self._index(self._by_unit, sensor.unit, sensor)
+        if sensor.active:
+            self._active[sensor] = None
+        sensor.add_listener(self._on_sensor_changed)
+
+    def remove(self, sensor_id) -> Optional[object]:
+        sensor = self._by_id.pop(sensor_id, None)
+        if sensor is None:
+            return None
+        self._sensors.remove(sensor)
+        self._unindex(self._by_type, self._type_of(sensor), sensor)
+        self._unindex(self._by_unit, sensor.unit, sensor)
+        self._active.pop(sensor, None)
+        sensor.remove_listener(self._on_sensor_changed)
+        return sensor
+
+    def get(self, sensor_id):
+        return self._by_id.get(sensor_id)
+
+    def by_type(self, sensor_type: str) -> List:
+        return list(self._by_type.get(sensor_type, ()))
+
+    def by_unit(self, unit: str) -> List:
+        return list(self._by_unit.get(unit, ()))
+
+    def active(self) -> List:
+        return list(self._active)
+
+    def select(self, predicate: Callable) -> List:
+        return [sensor for sensor in self._sensors if predicate(sensor)]
+
+    def __iter__(self) -> Iterator:
+        return iter(list(self._sensors))
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __getitem__(self, index):
+        return self._sensors[index]
+
+    def __contains__(self, sensor) -> bool:
+        return self._by_id.get(getattr(sensor, "sensor_id", None)) is sensor
+
+    # --- Metody pomocnicze ---
+
+    @staticmethod
+    def _type_of(sensor) -> str:
+        return getattr(sensor, "type", None) or type(sensor).__name__
+
+    @staticmethod
+    def _index(index: dict, key, sensor):
+        index.setdefault(key, {})[sensor] = None
+
+    @staticmethod
+    def _unindex(index: dict, key, sensor):
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(sensor, None)
+            if not bucket:
+                del index[key]
+
+    def _on_sensor_changed(self, sensor, field, old, new):
+        # Wywoływane przed zmianą atrybutu - wyjątek blokuje zmianę
+        if field == "sensor_id":
+            if new in self._by_id:
+                raise ValueError(f"Czujnik o id {new} już istnieje.")
+            self._by_id[new] = self._by_id.pop(old)
+        elif field == "type":
+            self._unindex(self._by_type, old or type(sensor).__name__, sensor)
+            self._index(self._by_type, new or type(sensor).__name__, sensor)
+        elif field == "unit":
+            self._unindex(self._by_unit, old, sensor)
+            self._index(self._by_unit, new, sensor)
+        elif field == "active":
+            if new:
+                self._active[sensor] = None
+            else:
+                self._active.pop(sensor, None)
@@ -0,0 +1,54 @@
+import datetime
+from array import array
+from bisect import bisect_left
+from typing import Iterator, Optional, Tuple
+
+
+class RingBuffer:
+    # Bufor historii czujnika: czasy (epoch, float) i wartości w tablicach array('d').
+    # Każda próbka jest zapisywana dwukrotnie (na pozycji i oraz i + capacity),
+    # dzięki czemu ostatnie n próbek zawsze leży w ciągłym fragmencie tablicy
+    # i można je udostępnić jako memoryview bez kopiowania.
+    def __init__(self, capacity: int = 100):
+        if capacity <= 0:
+            raise ValueError("Pojemność bufora musi być większa niż 0.")
+        self.capacity = capacity
+        self._timestamps = array('d', bytes(16 * capacity))
+        self._values = array('d', bytes(16 * capacity))
+        self._count = 0
+
+    def append(self, timestamp: float, value: float):
+        pos = self._count % self.capacity
+        self._timestamps[pos] = self._timestamps[pos + self.capacity] = timestamp
+        self._values[pos] = self._values[pos + self.capacity] = value
+        self._count += 1
+
+    def window(self, n: Optional[int] = None) -> Tuple[memoryview, memoryview]:
+        # Ostatnie n próbek (domyślnie wszystkie) jako widoki na tablice
+        size = len(self)
+        n = size if n is None else max(0, min(n, size))
+        end = (self._count - 1) % self.capacity + 1 + self.capacity if self._count else 0
+        return memoryview(self._timestamps)[end - n:end], memoryview(self._values)[end - n:end]
+
+    def since(self, timestamp: float) -> Tuple[memoryview, memoryview]:
+        # Próbki nowsze lub równe timestamp - wyszukiwanie binarne po czasie
+        timestamps, values = self.window()
+        start = bisect_left(timestamps, timestamp)
+        return timestamps[start:], values[start:]
+
+    @property
+    def total(self) -> int:
+        # Liczba wszystkich dopisanych próbek - pozwala wykryć nowe dane bez kopiowania
+        return self._count
+
+    def clear(self):
+        self._count = 0
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def __iter__(self) -> Iterator[Tuple[datetime.datetime, float]]:
+        # Zgodność z dawną historią w deque: pary (datetime, wartość)
+        timestamps, values = self.window()
+        for timestamp, value in zip(timestamps, values):
+            yield datetime.datetime.fromtimestamp(timestamp), value
@@ -0,0 +1,109 @@
+import asyncio
+import datetime
+import heapq
+import itertools
+import math
+import time
+
+
+class SensorScheduler:
+    # Jedno zadanie asyncio dla wszystkich czujników: kopiec terminów kolejnych
+    # odczytów, wybudzenie raz na takt i odczyt wszystkich czujników, których
+    # termin minął. Terminy są wyrównane do zegara (wielokrotności frequency od
+    # epoch) i liczone od poprzedniego terminu, więc opóźnienia się nie kumulują.
+    def __init__(self):
+        self._heap = []
+        self._entries = {}
+        self._seq = itertools.count()
+        self._callbacks = []
+        self._task = None
+        self._wakeup = None
+
+    def attach(self, sensor):
+        # Sensor.start()/stop() będą korzystać z harmonogramu zamiast własnego zadania
+        sensor._scheduler = self
+        if sensor.active:
+            self._schedule(sensor)
+
+    def detach(self, sensor):
+        self._unschedule(sensor)
+        if getattr(sensor, "_scheduler", None) is self:
+            sensor._scheduler = None
+
+    def register_callback(self, callback):
+        # callback(readings) - lista krotek (timestamp, sensor_id, name, value, unit) z jednego taktu
+        if callable(callback):
+            self._callbacks.append(callback)
+        else:
+            raise ValueError("Callback musi być callable")
+
+    def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        self._heap.clear()
+        self._entries.clear()
+
+    # --- Metody pomocnicze ---
+
+    def _schedule(self, sensor):
+        now = time.time()
+        deadline = math.ceil(now / sensor.frequency) * sensor.frequency
+        self._push(sensor, deadline)
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        else:
+            self._wakeup.set()
+
+    def _unschedule(self, sensor):
+        # Wpis w kopcu zostaje, ale jest pomijany przy zdjęciu (inny numer sekwencji)
+        self._entries.pop(sensor, None)
+
+    def _push(self, sensor, deadline):
+        seq = next(self._seq)
+        self._entries[sensor] = seq
+        heapq.heappush(self._heap, (deadline, seq, sensor))
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            timeout = None
+            if self._heap:
+                timeout = max(0.0, self._heap[0][0] - time.time())
+            if timeout is None or timeout > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                    continue  # nowy czujnik - przelicz najbliższy termin
+                except asyncio.TimeoutError:
+                    pass
+            self._tick(time.time())
+
+    def _tick(self, now):
+        readings = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, seq, sensor = heapq.heappop(self._heap)
+            if self._entries.get(sensor) != seq:
+                continue
+            timestamp = datetime.datetime.fromtimestamp(deadline)
+            try:
+                value = sensor._sample(timestamp)
+                readings.append((timestamp, sensor.sensor_id, sensor.name, value, sensor.unit))
+                if sensor._callback is not None:
+                    sensor._callback(timestamp, sensor.sensor_id, sensor.name, value, sensor.unit)
+            except Exception as e:
+                print(e)
+            # Kolejny termin liczony od poprzedniego; zaległe takty są pomijane
+            next_deadline = deadline + sensor.frequency
+            if next_deadline <= now:
+                next_deadline += math.ceil((now - next_deadline) / sensor.frequency) * sensor.frequency
+                if next_deadline <= now:
+                    next_deadline += sensor.frequency
+            self._push(sensor, next_deadline)
+        if not readings:
+            return
+        for callback in self._callbacks:
+            try:
+                callback(readings)
+            except Exception as e:
+                print(f"Błąd callbacku harmonogramu: {e}")
@@ -1,10 +1,23 @@
 import random
 import asyncio
 import datetime
-from collections import deque
+from sensors.ring_buffer import RingBuffer
+
+def _load_numpy():
+    # numpy jest potrzebny tylko w trybie wsadowym (read_values)
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("read_values wymaga pakietu numpy (pip install numpy)") from e
+    return numpy
+
+def _local_hours(np, timestamps):
+    # Pełna godzina czasu lokalnego dla każdego znacznika (strefa z pierwszej próbki)
+    offset = datetime.datetime.fromtimestamp(float(timestamps[0])).astimezone().utcoffset().total_seconds()
+    return np.floor(((timestamps + offset) % 86400) / 3600)
 
 class Sensor:
-    def __init__(self, sensor_id, name, unit, min_value, max_value, frequency=1):
+    def __init__(self, sensor_id, name, unit, min_value, max_value, frequency=1, history_size=100):
         self.sensor_id = sensor_id
         self.name = name
         self.unit = unit
@@ -13,9 +26,11 @@ class Sensor:
         self.frequency = frequency
         self.active = False
         self.last_value = None
-        self.history = deque(maxlen=100)  # ← bufor historii (do 100 wartości)
+        self.history = RingBuffer(history_size)  # ← bufor historii (do history_size wartości)
 
         self._callback = None
+        self._listeners = []
+        self._scheduler = None
         self._stop_event = asyncio.Event()
         self._stop_event.set()
         self._task = None
@@ -23,11 +38,11 @@ class Sensor:
     def edit_values(self, sensor_id=None, name=None, unit=None,
                     min_value=None, max_value=None, frequency=None, type=None):
         if sensor_id is not None:
-            self.sensor_id = sensor_id
+            self._set_indexed("sensor_id", sensor_id)
         if name is not None:
             self.name = name
         if unit is not None:
-            self.unit = unit
+            self._set_indexed("unit", unit)
         if min_value is not None:
             self.min_value = float(min_value)
         if max_value is not None:
@@ -38,7 +53,24 @@ class Sensor:
                 raise ValueError("Częstotliwość musi być większa niż 0.")
             self.frequency = freq
         if type is not None:
-            self.type = type  # jeśli atrybut `type` istnieje lub potrzebny
+            self._set_indexed("type", type)  # jeśli atrybut `type` istnieje lub potrzebny
+
+    def add_listener(self, listener):
+        # listener(sensor, field, old, new) - wywoływany przed zmianą id, typu,
+        # jednostki lub stanu aktywności (np. przez SensorRegistry)
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _set_indexed(self, field, value):
+        old = getattr(self, field, None)
+        if old == value:
+            return
+        for listener in self._listeners:
+            listener(self, field, old, value)
+        setattr(self, field, value)
 
 
     def read_value(self):
@@ -49,6 +81,25 @@ class Sensor:
         self.last_value = value
         return value
 
+    def read_values(self, n, start_ts=None, step=None, seed=None):
+        # Tryb wsadowy do testów obciążeniowych: n odczytów naraz jako tablice numpy
+        # (czasy epoch, wartości), z tym samym modelem co read_value. Nie wymaga
+        # uruchomionego czujnika; ten sam seed daje te same wartości.
+        np = _load_numpy()
+        if start_ts is None:
+            start_ts = datetime.datetime.now().timestamp()
+        if step is None:
+            step = self.frequency
+        rng = np.random.default_rng(seed)
+        timestamps = start_ts + step * np.arange(n, dtype=np.float64)
+        values = self._generate_values(np, rng, timestamps) if n else np.empty(0)
+        if n:
+            self.last_value = float(values[-1])
+        return timestamps, values
+
+    def _generate_values(self, np, rng, timestamps):
+        return rng.uniform(self.min_value, self.max_value, len(timestamps))
+
     def calibrate(self, calibration_factor):
         if self.last_value is None:
             self.read_value()
@@ -61,8 +112,17 @@ class Sensor:
             return self.read_value()
         return self.last_value
 
-    def get_history(self):
-        return list(self.history)
+    def get_history(self, since=None, as_arrays=False):
+        # as_arrays=True zwraca widoki (czasy epoch, wartości) bez kopiowania danych
+        if since is None:
+            timestamps, values = self.history.window()
+        else:
+            if isinstance(since, datetime.datetime):
+                since = since.timestamp()
+            timestamps, values = self.history.since(since)
+        if as_arrays:
+            return timestamps, values
+        return [(datetime.datetime.fromtimestamp(ts), value) for ts, value in zip(timestamps, values)]
     
     def register_callback(self, callback):
         if callable(callback):
@@ -70,28 +130,40 @@ class Sensor:
         else:
             raise ValueError("Callback musi być callable")
 
+    def _sample(self, timestamp=None):
+        # Jeden odczyt zapisany w historii; zwraca wartość
+        self.read_value()
+        if timestamp is None:
+            timestamp = datetime.datetime.now()
+        self.history.append(timestamp.timestamp(), self.last_value)
+        return self.last_value
+
     def _notify_callbacks(self):
         timestamp = datetime.datetime.now()
         self._callback(timestamp, self.sensor_id, self.name, self.get_last_value(), self.unit)
 
     def start(self):
         if not self.active:
-            self.active = True
+            self._set_indexed("active", True)
             self._stop_event.clear()
-            self._task = asyncio.create_task(self._run_loop())
+            if self._scheduler is not None:
+                self._scheduler._schedule(self)
+            else:
+                self._task = asyncio.create_task(self._run_loop())
 
     def stop(self):
         if self.active:
-            self.active = False
+            self._set_indexed("active", False)
             self._stop_event.set()
+            if self._scheduler is not None:
+                self._scheduler._unschedule(self)
             if self._task:
                 self._task.cancel()
 
     async def _run_loop(self):
         try:
             while not self._stop_event.is_set():
-                self.read_value()
-                self.history.append((datetime.datetime.now(), self.last_value))
+                self._sample()
                 self._notify_callbacks()
                 await asyncio.sleep(self.frequency)
         except Exception as e:
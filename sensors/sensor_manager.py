@@ -1,12 +1,19 @@
+import os
 import json
+import asyncio
 from .temperature_sensor import TemperatureSensor
 from .humidity_sensor import HumiditySensor
 from .pressure_sensor import PressureSensor
 from .light_sensor import LightSensor
 import datetime
-from typing import Optional
+from typing import Optional, Union
 from network.client import NetworkClient
+from network.async_client import AsyncNetworkClient
 from logger.logger import Logger
+from .scheduler import SensorScheduler
+from .registry import SensorRegistry
+from .ring_buffer import RingBuffer
+from .snapshot import SnapshotChannel
 
 class SensorManager:
     SENSOR_TYPES = {
@@ -16,76 +23,142 @@ class SensorManager:
         "light": LightSensor
     }
 
-    def __init__(self, config_path: str, client: Optional[NetworkClient] = None):
-        self.sensors = []
+    def __init__(self, config_path: str, client: Optional[Union[NetworkClient, AsyncNetworkClient]] = None,
+                 scheduler: Optional[SensorScheduler] = None):
+        self.sensors = SensorRegistry()
         self.client = client
+        # Wspólny harmonogram zamiast osobnego zadania asyncio dla każdego czujnika
+        self.scheduler = scheduler
+        self.config_path = config_path
+        self._config_mtime = None
+        self._logger = None
+        self._started = False
+        self._watch_task = None
+        self._publish_task = None
         self.load_config(config_path)
 
     def load_config(self, path):
-        with open(path, 'r', encoding="utf-8") as f:
-            config = json.load(f)
-        for sensor_data in config:
-            sensor_type = sensor_data.get("type", "").lower()
-            sensor_class = self.SENSOR_TYPES.get(sensor_type)
-            if sensor_class:
-                sensor = sensor_class(
-                    sensor_id=sensor_data["id"],
-                    name=sensor_data["name"],
-                    unit=sensor_data["unit"],
-                    min_value=sensor_data["min_value"],
-                    max_value=sensor_data["max_value"],
-                    frequency=sensor_data["frequency"],
-                )
-                self.sensors.append(sensor)
-            else:
-                print(f"Nieznany typ czujnika: {sensor_type}")
+        config = self._parse_config(path)
+        for sensor_data in config.values():
+            self._add_sensor(sensor_data)
+
+    def reload_config(self, path: Optional[str] = None) -> Optional[dict]:
+        # Porównuje plik z działającymi czujnikami i zmienia tylko różnice:
+        # nowe są dodawane (i uruchamiane, jeśli manager działa), usunięte
+        # zatrzymywane, zmienione edytowane w miejscu - z zachowaniem historii.
+        # Błędny plik nie zmienia niczego.
+        path = path or self.config_path
+        try:
+            config = self._parse_config(path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Błąd wczytywania konfiguracji czujników: {e}")
+            return None
+        self.config_path = path
+
+        removed = [sensor.sensor_id for sensor in self.sensors if sensor.sensor_id not in config]
+        added, updated = [], []
+        for sensor_id in removed:
+            self._remove_sensor(sensor_id)
+        for sensor_id, sensor_data in config.items():
+            sensor = self.sensors.get(sensor_id)
+            if sensor is None:
+                self._add_sensor(sensor_data)
+                added.append(sensor_id)
+            elif sensor.type != sensor_data["type"]:
+                # Zmiana typu wymaga innej klasy czujnika
+                self._remove_sensor(sensor_id)
+                self._add_sensor(sensor_data)
+                updated.append(sensor_id)
+            elif self._update_sensor(sensor, sensor_data):
+                updated.append(sensor_id)
+        return {"added": added, "removed": removed, "updated": updated}
+
+    def watch_config(self, interval: float = 1.0):
+        # Przeładowanie po zmianie pliku (sprawdzanie daty modyfikacji co interval sekund)
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.get_running_loop().create_task(self._watch_loop(interval))
+        return self._watch_task
+
+    def stop_watching(self):
+        if self._watch_task:
+            self._watch_task.cancel()
+            self._watch_task = None
+
+    def publish_snapshots(self, channel: SnapshotChannel, interval: float = 0.1):
+        # Okresowa publikacja stanu czujników dla GUI działającego w innym wątku;
+        # pierwsza publikacja od razu, żeby kanał nie był pusty
+        channel.publish(self.sensors)
+        if self._publish_task is None or self._publish_task.done():
+            self._publish_task = asyncio.get_running_loop().create_task(self._publish_loop(channel, interval))
+        return self._publish_task
 
-    def register_callbacks(self, logger: Logger):
+    def stop_publishing(self):
+        if self._publish_task:
+            self._publish_task.cancel()
+            self._publish_task = None
+
+    def register_callbacks(self, logger: Logger, batch: bool = False):
+        if batch:
+            # Wszystkie odczyty z jednego taktu harmonogramu trafiają do loggera jedną paczką
+            if self.scheduler is None:
+                raise ValueError("Tryb wsadowy wymaga harmonogramu (SensorScheduler).")
+            self.scheduler.register_callback(logger.log_readings)
+            return
+        self._logger = logger
         for sensor in self.sensors:
-            sensor.register_callback(
-                lambda timestamp, sensor_id, sensor_name, value, unit, logger=logger: 
-                    logger.log_reading(timestamp, sensor_id,sensor_name, value, unit)
-            )
+            self._register_logger(sensor)
 
     def start_all(self):
+        self._started = True
         for sensor in self.sensors:
             sensor.start()
             self._send("start_sensor", sensor.sensor_id, {"status": "started"})
 
     def stop_all(self):
+        self._started = False
         for sensor in self.sensors:
             sensor.stop()
             self._send("stop_sensor", sensor.sensor_id, {"status": "stopped"})
 
+    def start_where(self, predicate):
+        # Uruchamia wszystkie nieaktywne czujniki spełniające warunek, np. lambda s: s.type == "light"
+        started = self.sensors.select(lambda sensor: not sensor.active and predicate(sensor))
+        for sensor in started:
+            sensor.start()
+            self._send("start_sensor", sensor.sensor_id, {"status": "started"})
+        return started
+
+    def stop_where(self, predicate):
+        stopped = [sensor for sensor in self.sensors.active() if predicate(sensor)]
+        for sensor in stopped:
+            sensor.stop()
+            self._send("stop_sensor", sensor.sensor_id, {"status": "stopped"})
+        return stopped
+
     def get_all_sensors(self):
-        return self.sensors
+        return list(self.sensors)
 
     def get_sensor(self, sensor_id):
-        for sensor in self.sensors:
-            if sensor.sensor_id == sensor_id:
-                return sensor
-        return None
+        return self.sensors.get(sensor_id)
 
     def stop_sensor(self, sensor_id):
-        for sensor in self.sensors:
-            if sensor.sensor_id == sensor_id:
-                sensor.stop()
-                self._send("stop_sensor", sensor_id, {"status": "stopped"})
-                break
+        sensor = self.sensors.get(sensor_id)
+        if sensor is not None:
+            sensor.stop()
+            self._send("stop_sensor", sensor_id, {"status": "stopped"})
 
     def start_sensor(self, sensor_id):
-        for sensor in self.sensors:
-            if sensor.sensor_id == sensor_id:
-                sensor.start()
-                self._send("start_sensor", sensor_id, {"status": "started"})
-                break
+        sensor = self.sensors.get(sensor_id)
+        if sensor is not None:
+            sensor.start()
+            self._send("start_sensor", sensor_id, {"status": "started"})
 
     def log_sensor(self, sensor_id):
-        for sensor in self.sensors:
-            if sensor.sensor_id == sensor_id:
-                message = str(sensor)
-                print(message)
-                self._send("log_sensor", sensor_id, {"data": message})
+        sensor = self.sensors.get(sensor_id)
+        if sensor is not None:
+            message = str(sensor)
+            print(message)
+            self._send("log_sensor", sensor_id, {"data": message})
 
     def log_all_sensors(self):
         for sensor in self.sensors:
@@ -93,6 +166,120 @@ class SensorManager:
             print(message)
             self._send("log_sensor", sensor.sensor_id, {"data": message})
 
+    def _parse_config(self, path) -> dict:
+        # Cały plik jest sprawdzany, zanim cokolwiek zostanie zmienione
+        with open(path, 'r', encoding="utf-8") as f:
+            config = json.load(f)
+        if not isinstance(config, list):
+            raise ValueError("Konfiguracja czujników musi być listą")
+        if path == self.config_path:
+            self._config_mtime = os.path.getmtime(path)
+        sensors = {}
+        for sensor_data in config:
+            if not isinstance(sensor_data, dict):
+                raise ValueError(f"Wpis konfiguracji czujnika musi być obiektem: {sensor_data!r}")
+            sensor_type = str(sensor_data.get("type", "")).lower()
+            if sensor_type not in self.SENSOR_TYPES:
+                print(f"Nieznany typ czujnika: {sensor_type}")
+                continue
+            if sensor_data["id"] in sensors:
+                print(f"Powtórzone id czujnika: {sensor_data['id']}")
+                continue
+            for key in ("name", "unit", "min_value", "max_value", "frequency"):
+                if key not in sensor_data:
+                    raise KeyError(f"Brak pola '{key}' dla czujnika {sensor_data['id']}")
+            # Wartości liczbowe sprawdzane tutaj, żeby edit_values nie zawiodło w połowie zmian
+            try:
+                numbers = {key: float(sensor_data[key]) for key in ("min_value", "max_value", "frequency")}
+            except (TypeError, ValueError):
+                raise ValueError(f"Niepoprawna wartość liczbowa dla czujnika {sensor_data['id']}")
+            if numbers["frequency"] <= 0:
+                raise ValueError(f"Częstotliwość czujnika {sensor_data['id']} musi być większa niż 0.")
+            sensors[sensor_data["id"]] = dict(sensor_data, type=sensor_type, **numbers)
+        return sensors
+
+    def _add_sensor(self, sensor_data: dict):
+        sensor = self.SENSOR_TYPES[sensor_data["type"]](
+            sensor_id=sensor_data["id"],
+            name=sensor_data["name"],
+            unit=sensor_data["unit"],
+            min_value=sensor_data["min_value"],
+            max_value=sensor_data["max_value"],
+            frequency=sensor_data["frequency"],
+            history_size=sensor_data.get("history_size", 100),
+        )
+        sensor.type = sensor_data["type"]
+        if self.sensors.get(sensor.sensor_id) is not None:
+            print(f"Powtórzone id czujnika: {sensor.sensor_id}")
+            return None
+        if self.scheduler is not None:
+            self.scheduler.attach(sensor)
+        self.sensors.add(sensor)
+        if self._logger is not None:
+            self._register_logger(sensor)
+        if self._started:
+            sensor.start()
+            self._send("start_sensor", sensor.sensor_id, {"status": "started"})
+        return sensor
+
+    def _remove_sensor(self, sensor_id):
+        sensor = self.sensors.remove(sensor_id)
+        if sensor is None:
+            return
+        if sensor.active:
+            sensor.stop()
+            self._send("stop_sensor", sensor_id, {"status": "stopped"})
+        if self.scheduler is not None:
+            self.scheduler.detach(sensor)
+
+    def _update_sensor(self, sensor, sensor_data: dict) -> bool:
+        changes = {
+            key: sensor_data[key]
+            for key in ("name", "unit", "min_value", "max_value", "frequency")
+            if getattr(sensor, key) != sensor_data[key]
+        }
+        if changes:
+            sensor.edit_values(**changes)
+        history_size = sensor_data.get("history_size", 100)
+        if history_size != sensor.history.capacity:
+            # Nowy bufor z zachowaniem ostatnich próbek
+            history = RingBuffer(history_size)
+            for timestamp, value in zip(*sensor.history.window(history_size)):
+                history.append(timestamp, value)
+            sensor.history = history
+            changes["history_size"] = history_size
+        return bool(changes)
+
+    def _register_logger(self, sensor):
+        logger = self._logger
+        sensor.register_callback(
+            lambda timestamp, sensor_id, sensor_name, value, unit, logger=logger: 
+                logger.log_reading(timestamp, sensor_id,sensor_name, value, unit)
+        )
+
+    async def _watch_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                mtime = os.path.getmtime(self.config_path)
+            except OSError:
+                continue
+            if mtime != self._config_mtime:
+                self._config_mtime = mtime
+                try:
+                    result = self.reload_config()
+                except Exception as e:
+                    # Błąd jednego przeładowania nie kończy obserwowania pliku
+                    print(f"Błąd przeładowania konfiguracji czujników: {e}")
+                    continue
+                if result is not None:
+                    print(f"Przeładowano konfigurację czujników: {result}")
+
+    async def _publish_loop(self, channel: SnapshotChannel, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            channel.publish(self.sensors)
+
     def _send(self, action: str, sensor_id: Optional[str] = None, extra: Optional[dict] = None):
         if not self.client:
             return  # Nie wysyłamy, jeśli nie podano klienta
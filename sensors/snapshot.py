@@ -0,0 +1,81 @@
+from array import array
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class HistorySnapshot:
+    # Niezmienna kopia ostatnich próbek bufora historii - to samo API do odczytu
+    # co RingBuffer (window, total, len), ale bezpieczna do czytania z innego wątku.
+    def __init__(self, timestamps: array, values: array, total: int, capacity: int):
+        self._timestamps = timestamps
+        self._values = values
+        self._total = total
+        self.capacity = capacity
+
+    @classmethod
+    def of(cls, history, n: Optional[int] = None) -> "HistorySnapshot":
+        # Kopiowane jest tylko n ostatnich próbek - tyle, ile rysują widoki
+        timestamps, values = history.window(n)
+        return cls(array('d', timestamps), array('d', values), history.total, history.capacity)
+
+    def window(self, n: Optional[int] = None) -> Tuple[memoryview, memoryview]:
+        size = len(self._values)
+        n = size if n is None else max(0, min(n, size))
+        return memoryview(self._timestamps)[size - n:], memoryview(self._values)[size - n:]
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class SensorSnapshot:
+    # Stan czujnika w chwili publikacji (pola jak w Sensor, historia jako HistorySnapshot)
+    FIELDS = ("sensor_id", "name", "type", "unit", "min_value", "max_value", "frequency", "active", "last_value")
+
+    def __init__(self, sensor, history: HistorySnapshot):
+        for field in self.FIELDS:
+            setattr(self, field, getattr(sensor, field, None))
+        self.history = history
+
+    def matches(self, sensor) -> bool:
+        # Czy czujnik nie zmienił się od utworzenia snapshotu
+        return sensor.history.total == self.history.total and all(
+            getattr(sensor, field, None) == getattr(self, field) for field in self.FIELDS
+        )
+
+
+class SnapshotChannel:
+    # Kanał publikacji stanu czujników dla GUI. Strona czujników (pętla asyncio)
+    # buduje nową mapę snapshotów i podmienia ją jednym przypisaniem referencji,
+    # które w CPython jest atomowe; czytelnik (wątek GUI) tylko pobiera najnowszą
+    # mapę. Bez blokad - żadna ze stron nie czeka na drugą. Snapshot zawiera
+    # tylko history_points ostatnich próbek, więc koszt publikacji nie zależy
+    # od głębokości historii czujnika.
+    def __init__(self, history_points: int = 1000):
+        self.history_points = history_points
+        self._latest: Tuple[int, Dict[str, SensorSnapshot]] = (0, {})
+
+    def publish(self, sensors: Iterable) -> int:
+        # Kopiowane są tylko czujniki zmienione od poprzedniej publikacji
+        previous = self._latest[1]
+        snapshots = {}
+        for sensor in sensors:
+            snapshot = previous.get(sensor.sensor_id)
+            if snapshot is None or not snapshot.matches(sensor):
+                snapshot = SensorSnapshot(sensor, HistorySnapshot.of(sensor.history, self.history_points))
+            snapshots[sensor.sensor_id] = snapshot
+        version = self._latest[0] + 1
+        self._latest = (version, snapshots)
+        return version
+
+    @property
+    def version(self) -> int:
+        return self._latest[0]
+
+    def latest(self) -> Dict[str, SensorSnapshot]:
+        return self._latest[1]
+
+    def get(self, sensor_id) -> Optional[SensorSnapshot]:
+        return self._latest[1].get(sensor_id)
@@ -1,5 +1,5 @@
 import datetime
-from sensors.sensor import Sensor
+from sensors.sensor import Sensor, _local_hours
 import random
 import math
 
@@ -13,4 +13,12 @@ class TemperatureSensor(Sensor):
         temp = base_temp + amplitude * math.sin((hour / 24.0) * 2 * math.pi)
         noise = random.uniform(-1.5, 1.5)
         self.last_value = round(temp + noise, 2)
+
+    def _generate_values(self, np, rng, timestamps):
+        hours = _local_hours(np, timestamps)
+        base_temp = (self.max_value + self.min_value) / 2
+        amplitude = (self.max_value - self.min_value) / 2
+        temp = base_temp + amplitude * np.sin((hours / 24.0) * 2 * np.pi)
+        noise = rng.uniform(-1.5, 1.5, len(timestamps))
+        return np.round(temp + noise, 2)
     
\ No newline at end of file
@@ -1,31 +1,64 @@
 import asyncio
-import unittest
+import argparse
+import threading
+from typing import Optional
 from sensors.sensor_manager import SensorManager
 from logger.logger import Logger 
-from datetime import datetime
 from network.client import NetworkClient
-from gui.gui import GUI
+from network.async_client import AsyncNetworkClient
+from network.config import load_config
+from sensors.scheduler import SensorScheduler
+from sensors.snapshot import SnapshotChannel
+# GUI (tkinter, matplotlib) importowane dopiero w trybie z oknem - patrz main()
 
 CONFIG_PATH = "./configs/sensors_config.json"
 LOGGER_CONFIG_PATH = "./configs/logger_config.json"  # plik konfig dla loggera
+CLIENT_CONFIG_PATH = "./configs/client_config.yaml"
 
-async def main():
-    client = NetworkClient()
+async def run_sensors(channel: Optional[SnapshotChannel] = None, on_started=None):
+    # Część czujników: pętla asyncio z czujnikami, loggerem i siecią. Działa do
+    # wywołania funkcji stop przekazanej do on_started(manager, logger, loop, stop).
+    # Klient asynchroniczny tylko kolejkuje wiadomości, więc nie blokuje pętli czujników
+    if load_config(CLIENT_CONFIG_PATH).get("async", False):
+        client = AsyncNetworkClient()
+    else:
+        client = NetworkClient()
     client.connect()
     logger = Logger(LOGGER_CONFIG_PATH, client=client)
     logger.start()
 
-    manager = SensorManager(CONFIG_PATH, client=client)
-    manager.register_callbacks(logger)
+    manager = SensorManager(CONFIG_PATH, client=client, scheduler=SensorScheduler())
+    manager.register_callbacks(logger, batch=True)
     manager.start_all()
+    manager.watch_config()  # zmiany w sensors_config.json bez restartu
+    if channel is not None:
+        manager.publish_snapshots(channel)
+
+    stopping = asyncio.Event()
+    if on_started is not None:
+        on_started(manager, logger, asyncio.get_running_loop(), stopping.set)
+    try:
+        await stopping.wait()
+    finally:
+        manager.stop_publishing()
+        manager.stop_watching()
+        manager.stop_all()
+        logger.stop()
+        if isinstance(client, AsyncNetworkClient):
+            await client.aclose()
+        else:
+            client.close()
 
-    gui = GUI(manager)
-    await gui.async_mainloop()
+def run_headless():
+    # Węzeł bez okna: czujniki, logger i sieć; zatrzymanie przez Ctrl+C
+    try:
+        asyncio.run(run_sensors())
+    except KeyboardInterrupt:
+        pass
     print("end")
-    client.close()
 
-if __name__ == "__main__":
-    # Uruchom testy
+def run_self_tests() -> bool:
+    import unittest
     loader = unittest.TestLoader()
     suite = unittest.TestSuite()
     suite.addTests(loader.discover('./tests', pattern='test_*.py'))
@@ -36,6 +69,47 @@ if __name__ == "__main__":
         print("\n✅ Wszystkie testy przeszły pomyślnie!\n")
     else:
         print("\n❌ Niektóre testy zakończyły się niepowodzeniem.\n")
-        exit()
+    return result.wasSuccessful()
+
+def main():
+    from gui.gui import GUI
+
+    # Czujniki w osobnym wątku z własną pętlą asyncio, GUI w wątku głównym
+    # z jednym mainloop; wymiana danych tylko przez SnapshotChannel
+    channel = SnapshotChannel()
+    started = threading.Event()
+    runtime = {}
+
+    def on_started(manager, logger, loop, stop):
+        runtime.update(manager=manager, logger=logger, loop=loop, stop=stop)
+        started.set()
+
+    sensor_thread = threading.Thread(target=asyncio.run, args=(run_sensors(channel, on_started),),
+                                     name="SensorLoop", daemon=True)
+    sensor_thread.start()
+    while not started.wait(0.1):
+        if not sensor_thread.is_alive():
+            return  # błąd uruchamiania czujników
 
-    asyncio.run(main())
+    try:
+        GUI(runtime["manager"], channel, runtime["loop"], logger=runtime["logger"]).run()
+    finally:
+        runtime["loop"].call_soon_threadsafe(runtime["stop"])
+        sensor_thread.join()
+    print("end")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Klient systemu czujników")
+    parser.add_argument("--headless", action="store_true",
+                        help="bez GUI - tylko czujniki, logger i sieć (tkinter i matplotlib nie są ładowane)")
+    parser.add_argument("--self-test", action="store_true",
+                        help="uruchom testy jednostkowe przed startem")
+    args = parser.parse_args()
+
+    if args.self_test and not run_self_tests():
+        exit(1)
+
+    if args.headless:
+        run_headless()
+    else:
+        main()
@@ -1,5 +1,13 @@
 from network.server.server import NetworkServer
+from network.server.async_server import AsyncNetworkServer
+from network.config import load_config
+
+SERVER_CONFIG_PATH = "./configs/server_config.yaml"
 
 if __name__ == "__main__":
-    server = NetworkServer()
-    server.start()
\ No newline at end of file
+    # Tryb "asyncio" obsługuje wszystkie połączenia na jednym wątku
+    if load_config(SERVER_CONFIG_PATH).get("mode", "thread") == "asyncio":
+        server = AsyncNetworkServer()
+    else:
+        server = NetworkServer()
+    server.start()
@@ -0,0 +1,486 @@
+import os
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+import zlib
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+from logger.logger import Logger
+from logger.index import LogIndex, INDEX_SUFFIX, JOURNAL_SUFFIX
+from logger.rollup import RollupStore
+from logger.columnar import COLUMNAR_SUFFIX, read_columnar, read_footer, write_columnar, _load_numpy
+from logger.playback import HistoryLoader, downsample_minmax
+
+START = datetime(2025, 5, 26, 12, 0, 0)
+
+class LoggerTestCase(unittest.TestCase):
+    config = {
+        "filename_pattern": "sensors_%Y%m%d.csv",
+        "buffer_size": 10,
+        "rotate_every_hours": 24,
+        "max_size_mb": 5,
+        "rotate_after_lines": None,
+        "retention_days": 30,
+        "index_block_rows": 20
+    }
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.config_path = os.path.join(self.tmp, "logger_config.json")
+        with open(self.config_path, "w", encoding="utf-8") as f:
+            json.dump(dict(self.config, log_dir=os.path.join(self.tmp, "logs")), f)
+        self.logger = Logger(self.config_path)
+        self.logger.start()
+
+    def log(self, n, sensors=("T1", "H1")):
+        for i in range(n):
+            sensor_id = sensors[i % len(sensors)]
+            self.logger.log_reading(START + timedelta(seconds=i), sensor_id, f"Czujnik {sensor_id}", float(i), "C")
+
+
+class TestLogIndex(LoggerTestCase):
+    def test_index_written_on_flush(self):
+        self.log(100)
+        index = LogIndex.load(self.logger.current_filename + INDEX_SUFFIX)
+        self.assertEqual(index.rows, 100)
+        self.assertEqual(index.sensor_ids, {"T1", "H1"})
+        self.assertEqual(len(index.blocks), 5)
+        self.assertEqual(index.end, os.path.getsize(self.logger.current_filename))
+
+    def test_flush_appends_only_to_journal(self):
+        index_path = self.logger.current_filename + INDEX_SUFFIX
+        with patch.object(LogIndex, "save") as save:
+            self.log(100)
+            self.logger.stop()
+            save.assert_called_once_with(index_path)  # tylko przy zamknięciu
+        self.assertTrue(os.path.isfile(index_path + JOURNAL_SUFFIX))
+        self.assertEqual(LogIndex.load(index_path).rows, 100)
+        self.logger._index.save(index_path)
+        self.assertFalse(os.path.isfile(index_path + JOURNAL_SUFFIX))
+        index = LogIndex.load(index_path)
+        self.assertEqual((index.rows, len(index.blocks)), (100, 5))
+
+    def test_journal_with_torn_tail(self):
+        self.log(30)
+        index_path = self.logger.current_filename + INDEX_SUFFIX
+        with open(index_path + JOURNAL_SUFFIX, "a", encoding="utf-8") as f:
+            f.write('{"end": 99999, "blo')
+        index = LogIndex.load(index_path)
+        self.assertEqual(index.rows, 30)
+        self.assertEqual(index.end, os.path.getsize(self.logger.current_filename))
+
+    def test_readers_get_copy_of_current_index(self):
+        self.log(20)
+        self.logger.stop()
+        self.logger.start()
+        index = self.logger._load_index(self.logger.current_filename)
+        self.assertIsNot(index, self.logger._index)
+        self.log(20)
+        self.logger.stop()
+        self.assertEqual((index.rows, self.logger._index.rows), (20, 40))
+
+    def test_read_logs_uses_blocks_in_range(self):
+        self.log(100)
+        self.logger.stop()
+        start, end = START + timedelta(seconds=45), START + timedelta(seconds=50)
+        with patch.object(self.logger, "_parse_rows", wraps=self.logger._parse_rows) as parse:
+            rows = list(self.logger.read_logs(start, end, "T1"))
+        self.assertEqual([r["value"] for r in rows], [46.0, 48.0, 50.0])
+        self.assertEqual(parse.call_count, 1)  # tylko blok z wierszami 40-59
+
+    def test_files_outside_range_are_skipped(self):
+        self.log(20)
+        self.logger.stop()
+        with patch.object(self.logger, "_read_file") as read_file:
+            list(self.logger.read_logs(START + timedelta(days=1), START + timedelta(days=2)))
+            list(self.logger.read_logs(START, START + timedelta(days=1), "P1"))
+        read_file.assert_not_called()
+
+    def test_index_rebuilt_for_file_without_sidecar(self):
+        self.log(50)
+        self.logger.stop()
+        os.remove(self.logger.current_filename + INDEX_SUFFIX)
+        self.logger.start()
+        self.assertEqual(self.logger._index.rows, 50)
+        self.assertEqual(len(list(self.logger.read_logs(START, START + timedelta(minutes=1)))), 50)
+
+    def test_archive_keeps_index(self):
+        self.log(40)
+        self.logger._rotate()
+        archives = os.listdir(self.logger.archive_dir)
+        self.assertEqual(len([a for a in archives if a.endswith(".zip")]), 1)
+        self.assertEqual(len([a for a in archives if a.endswith(INDEX_SUFFIX)]), 1)
+        rows = list(self.logger.read_logs(START + timedelta(seconds=30), START + timedelta(seconds=35), "H1"))
+        self.assertEqual([r["value"] for r in rows], [31.0, 33.0, 35.0])
+
+
+class TestRotationBookkeeping(LoggerTestCase):
+    def test_size_tracked_without_stat(self):
+        with patch("logger.logger.os.path.getsize") as getsize:
+            self.log(100)
+        getsize.assert_not_called()
+        self.assertEqual(self.logger.bytes_written, os.path.getsize(self.logger.current_filename))
+        self.assertEqual(self.logger.lines_written, 101)
+
+    def test_restart_scans_only_unindexed_tail(self):
+        self.log(40)
+        self.logger.stop()
+        with open(self.logger.current_filename, "a", encoding="utf-8", newline="") as f:
+            f.write("2025-05-26T13:00:00,P1,Czujnik P1,1013.0,hPa\r\n")
+        with patch.object(LogIndex, "add_rows", autospec=True, side_effect=LogIndex.add_rows) as add_rows:
+            self.logger.start()
+        add_rows.assert_called_once()
+        self.assertEqual(add_rows.call_args[0][3], [(datetime(2025, 5, 26, 13).timestamp(), "P1")])
+        self.assertEqual(self.logger.lines_written, 41)
+        self.assertEqual(self.logger.bytes_written, os.path.getsize(self.logger.current_filename))
+        rows = list(self.logger.read_logs(START, START + timedelta(hours=2), "P1"))
+        self.assertEqual([r["value"] for r in rows], [1013.0])
+
+
+class TestRollup(LoggerTestCase):
+    config = dict(LoggerTestCase.config, rollup=True, retention_days=36500, rollup_retention_days=36500)
+
+    def test_minute_buckets(self):
+        self.log(240)
+        self.logger.stop()
+        buckets = self.logger.read_rollup(START, START + timedelta(minutes=4), "T1", max_points=10)
+        self.assertEqual([b["timestamp"] for b in buckets], [START + timedelta(minutes=m) for m in range(4)])
+        self.assertEqual({b["resolution"] for b in buckets}, {60})
+        first = buckets[0]
+        self.assertEqual((first["count"], first["min"], first["max"], first["last"]), (30, 0.0, 58.0, 58.0))
+        self.assertEqual(first["mean"], 29.0)
+
+    def test_resolution_follows_point_budget(self):
+        rollup = self.logger._rollup
+        self.assertEqual(rollup.choose_resolution(START, START + timedelta(hours=2), 500), 60)
+        self.assertEqual(rollup.choose_resolution(START, START + timedelta(days=2), 500), 3600)
+        self.assertEqual(rollup.choose_resolution(START, START + timedelta(days=30), 500), 86400)
+        self.log(100)
+        self.logger.stop()
+        buckets = self.logger.read_rollup(START, START + timedelta(days=30), "H1")
+        self.assertEqual(len(buckets), 1)
+        self.assertEqual((buckets[0]["timestamp"], buckets[0]["count"]), (datetime(2025, 5, 26), 50))
+
+    def test_rollup_persisted(self):
+        self.log(120)
+        self.logger.stop()
+        self.logger.start()
+        self.log(20)  # kolejne zapisy dopisują zmienione kubełki
+        self.logger.stop()
+        reloaded = Logger(self.config_path)
+        self.assertEqual(
+            reloaded.read_rollup(START, START + timedelta(minutes=2), "T1"),
+            self.logger.read_rollup(START, START + timedelta(minutes=2), "T1")
+        )
+        self.assertEqual(reloaded.read_rollup(START, START + timedelta(minutes=2), "T1")[0]["count"], 40)
+
+    def test_minute_buckets_follow_retention(self):
+        self.log(20)
+        self.logger.stop()
+        reloaded = RollupStore(self.logger._rollup.directory, retention_days=30)
+        self.assertEqual(reloaded.query(START, START + timedelta(minutes=1), "T1", resolution=60), [])
+        self.assertEqual(reloaded.query(START, START + timedelta(minutes=1), "T1", resolution=3600)[0]["count"], 10)
+
+    def test_files_stay_compact_while_running(self):
+        store = RollupStore(os.path.join(self.tmp, "store"))
+        for second in range(3600):
+            store.add([(START + timedelta(seconds=second), f"S{i}", float(second)) for i in range(10)])
+            store.save()
+        for res in store.resolutions:
+            with open(store._path(res), encoding="utf-8") as f:
+                lines = sum(1 for _ in f)
+            self.assertLessEqual(lines, 2 * store._count(res) + 1000 + 10)
+        reloaded = RollupStore(store.directory)
+        self.assertEqual(reloaded.query(START, START + timedelta(hours=1), "S3", resolution=3600)[0]["count"], 3600)
+
+    def test_retention_applied_while_running(self):
+        store = RollupStore(os.path.join(self.tmp, "store"), retention_days=1, coarse_retention_days=2)
+        old, recent = datetime.now() - timedelta(days=5), datetime.now()
+        store.add([(old, "T1", 1.0), (recent, "T1", 2.0)])
+        store.save()
+        self.assertEqual(len(store.query(old, recent, "T1", resolution=60)), 1)
+        self.assertEqual(len(store.query(old, recent, "T1", resolution=3600)), 1)
+        self.assertEqual(len(store.query(old, recent, "T1", resolution=86400)), 2)
+
+    def test_unknown_resolution(self):
+        with self.assertRaises(ValueError):
+            self.logger.read_rollup(START, START + timedelta(hours=1), "T1", resolution=120)
+
+
+class TestHistoryLoader(LoggerTestCase):
+    config = dict(LoggerTestCase.config, rollup=True, retention_days=36500, rollup_retention_days=36500)
+
+    def setUp(self):
+        super().setUp()
+        self.loader = HistoryLoader(self.logger, tile_columns=64)
+        self.addCleanup(self.loader.close)
+
+    def log_wave(self, n):
+        # Piła 0..99 z jednym skokiem w połowie zakresu
+        rows = [(START + timedelta(seconds=i), "T1", "Czujnik T1", 1000.0 if i == n // 2 else float(i % 100), "C")
+                for i in range(n)]
+        self.logger.log_readings(rows)
+        self.logger.stop()
+
+    def test_close_does_not_wait_for_slow_read(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        with patch.object(self.loader, "load", side_effect=lambda *args: release.wait(5) and ((), ())):
+            self.loader.request("T1", START, START + timedelta(seconds=10), 10)
+            started = datetime.now()
+            self.loader.close(timeout=0.05)
+        self.assertLess(datetime.now() - started, timedelta(seconds=1))
+
+    def test_downsample_keeps_extremes_in_time_order(self):
+        points = [(t, v, v) for t, v in [(0.5, 3.0), (0.1, 5.0), (0.9, 1.0), (1.5, 2.0), (7.0, 9.0)]]
+        timestamps, values = downsample_minmax(points, 0.0, 1.0, 4)
+        self.assertEqual(list(timestamps), [0.1, 0.9, 1.5])
+        self.assertEqual(list(values), [5.0, 1.0, 2.0])
+
+    def test_raw_window_is_downsampled(self):
+        self.log_wave(2000)
+        timestamps, values = self.loader.load("T1", START, START + timedelta(seconds=2000), 100)
+        self.assertLessEqual(len(values), 2 * 64 * 3)
+        self.assertEqual((min(values), max(values)), (0.0, 1000.0))
+        self.assertEqual(list(timestamps), sorted(timestamps))
+
+    def test_tiles_are_cached(self):
+        self.log_wave(2000)
+        with patch.object(self.logger, "read_logs", wraps=self.logger.read_logs) as read_logs:
+            first = self.loader.load("T1", START, START + timedelta(seconds=500), 50)
+            calls = read_logs.call_count
+            # Przesunięcie w obrębie tych samych kafelków nie czyta logów ponownie
+            second = self.loader.load("T1", START + timedelta(seconds=10), START + timedelta(seconds=510), 50)
+        self.assertGreater(calls, 0)
+        self.assertEqual(read_logs.call_count, calls)
+        self.assertEqual(first, second)
+
+    def test_wide_columns_use_rollup(self):
+        self.log_wave(4 * 3600)
+        with patch.object(self.logger, "read_logs") as read_logs:
+            timestamps, values = self.loader.load("T1", START, START + timedelta(hours=4), 100)
+        read_logs.assert_not_called()
+        self.assertEqual((min(values), max(values)), (0.0, 1000.0))
+
+    def test_background_request(self):
+        self.log_wave(300)
+        first = self.loader.request("T1", START, START + timedelta(seconds=300), 10)
+        latest = self.loader.request("T1", START, START + timedelta(seconds=300), 20)
+        self.assertGreater(latest, first)
+        for _ in range(100):
+            result = self.loader.poll()
+            if result is not None and result[0] == latest:
+                break
+            threading.Event().wait(0.01)
+        self.assertEqual(result[0], latest)
+        self.assertEqual(max(result[2]), 1000.0)
+
+
+class TestLogReadings(LoggerTestCase):
+    def batch(self, n, offset=0):
+        return [(START + timedelta(seconds=offset + i), "T1", "Czujnik T1", float(offset + i), "C") for i in range(n)]
+
+    def test_batch_written_with_one_event(self):
+        self.logger.client = MagicMock()
+        self.logger.log_readings(self.batch(25))
+        events = [c[0][0] for c in self.logger.client.send.call_args_list if c[0][0]["event"] != "flush"]
+        self.assertEqual([e["event"] for e in events], ["log_readings"])
+        self.assertEqual(len(events[0]["details"]["readings"]), 25)
+        self.logger.client.send_buffered.assert_not_called()
+        self.logger.client = None
+        self.logger.stop()
+        rows = list(self.logger.read_logs(START, START + timedelta(minutes=1), "T1"))
+        self.assertEqual([r["value"] for r in rows], [float(i) for i in range(25)])
+
+    def test_columns_with_epoch_timestamps(self):
+        self.logger.log_readings({
+            "timestamp": [(START + timedelta(seconds=i)).timestamp() for i in range(5)],
+            "sensor_id": "P1",
+            "sensor_name": "Czujnik P1",
+            "value": [1000.0, 1001.0, 1002.0, 1003.0, 1004.0],
+            "unit": "hPa"
+        })
+        self.logger.stop()
+        rows = list(self.logger.read_logs(START, START + timedelta(minutes=1), "P1"))
+        self.assertEqual([(r["timestamp"], r["value"]) for r in rows],
+                         [(START + timedelta(seconds=i), 1000.0 + i) for i in range(5)])
+
+    def test_batches_in_background_writer(self):
+        self.logger.stop()
+        self.logger.background_writer = True
+        self.logger.start()
+        self.logger.log_readings(self.batch(15))
+        self.logger.log_readings(self.batch(15, offset=15))
+        self.logger.stop()
+        self.assertEqual(len(list(self.logger.read_logs(START, START + timedelta(minutes=1)))), 30)
+
+
+class TestReadZip(LoggerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.log(40)
+        self.logger._rotate()
+        for name in os.listdir(self.logger.archive_dir):
+            if name.endswith(INDEX_SUFFIX):
+                os.remove(os.path.join(self.logger.archive_dir, name))
+        self.zip_path = [os.path.join(self.logger.archive_dir, name)
+                         for name in os.listdir(self.logger.archive_dir)][0]
+
+    def test_partial_range_scans_whole_archive(self):
+        rows = list(self.logger.read_logs(START, START + timedelta(seconds=5)))
+        self.assertEqual(len(rows), 6)
+        self.assertIn(self.zip_path, self.logger._scanned_archives)
+
+    def test_scanned_archive_is_skipped_later(self):
+        rows = list(self.logger.read_logs(START, START + timedelta(hours=1), "T1"))
+        self.assertEqual(len(rows), 20)
+        self.assertIn(self.zip_path, self.logger._scanned_archives)
+        with patch("logger.logger.zipfile.ZipFile") as zip_file:
+            list(self.logger.read_logs(START + timedelta(days=1), START + timedelta(days=2)))
+            list(self.logger.read_logs(START, START + timedelta(hours=1), "P1"))
+        zip_file.assert_not_called()
+
+
+class TestUnorderedRows(LoggerTestCase):
+    # Serwer zapisuje odczyty wielu klientów - wiersze nie są uporządkowane w czasie
+    def setUp(self):
+        super().setUp()
+        late = [(START + timedelta(seconds=10 + i), "A", "Czujnik A", float(i), "C") for i in range(10)]
+        early = [(START + timedelta(seconds=i), "B", "Czujnik B", float(i), "C") for i in range(10)]
+        self.logger.log_readings(late)
+        self.logger.log_readings(early)
+
+    def check_ranges(self):
+        self.assertEqual(len(list(self.logger.read_logs(START, START + timedelta(seconds=9), "B"))), 10)
+        self.assertEqual(len(list(self.logger.read_logs(START, START + timedelta(seconds=12)))), 13)
+
+    def test_current_file(self):
+        self.logger.stop()
+        self.check_ranges()
+
+    def test_zip_archive(self):
+        self.logger._rotate()
+        self.check_ranges()
+        for name in os.listdir(self.logger.archive_dir):
+            if name.endswith(INDEX_SUFFIX):
+                os.remove(os.path.join(self.logger.archive_dir, name))
+        self.check_ranges()
+
+
+class TestColumnarArchive(LoggerTestCase):
+    config = dict(LoggerTestCase.config, archive_format="columnar", columnar_block_rows=16)
+
+    def setUp(self):
+        super().setUp()
+        self.log(40)
+        self.logger._rotate()
+        self.col_path = os.path.join(self.logger.archive_dir, os.listdir(self.logger.archive_dir)[0])
+
+    def test_rotated_file_is_columnar(self):
+        self.assertEqual(os.listdir(self.logger.archive_dir), [os.path.basename(self.col_path)])
+        self.assertTrue(self.col_path.endswith(COLUMNAR_SUFFIX))
+        footer = read_footer(self.col_path)
+        self.assertEqual([b["rows"] for b in footer["blocks"]], [16, 16, 8])
+        self.assertEqual(footer["entries"], [["T1", "Czujnik T1", "C"], ["H1", "Czujnik H1", "C"]])
+
+    def test_read_logs_matches_csv(self):
+        rows = list(self.logger.read_logs(START + timedelta(seconds=30), START + timedelta(seconds=35), "H1"))
+        self.assertEqual([r["value"] for r in rows], [31.0, 33.0, 35.0])
+        self.assertEqual(rows[0], {
+            "timestamp": START + timedelta(seconds=31), "sensor_id": "H1", "value": 31.0, "unit": "C"
+        })
+        self.assertEqual(len(list(self.logger.read_logs(START, START + timedelta(hours=1)))), 40)
+        self.assertEqual(list(self.logger.read_logs(START, START + timedelta(hours=1), "P1")), [])
+
+    def test_blocks_outside_range_are_not_decompressed(self):
+        with patch("logger.columnar.zlib.decompress", wraps=zlib.decompress) as decompress:
+            rows = list(read_columnar(self.col_path, START + timedelta(seconds=20), START + timedelta(seconds=25)))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(decompress.call_count, 1)
+
+    def test_same_rows_without_numpy(self):
+        ranges = [(START, START + timedelta(hours=1), None),
+                  (START + timedelta(seconds=5), START + timedelta(seconds=30), "T1")]
+        for start, end, sensor_id in ranges:
+            with patch("logger.columnar._load_numpy", return_value=None):
+                expected = list(read_columnar(self.col_path, start, end, sensor_id))
+            self.assertEqual(list(read_columnar(self.col_path, start, end, sensor_id)), expected)
+        self.assertEqual([r["value"] for r in expected], [6.0, 8.0, 10.0, 12.0, 14.0, 16.0, 18.0, 20.0, 22.0, 24.0, 26.0, 28.0, 30.0])
+
+    def test_unordered_rows_are_sorted_in_blocks(self):
+        csv_path = os.path.join(self.tmp, "unordered.csv")
+        col_path = os.path.join(self.tmp, "unordered" + COLUMNAR_SUFFIX)
+        with open(csv_path, "w", encoding="utf-8") as f:
+            f.write("timestamp,sensor_id,sensor_name,value,unit\n")
+            for i in list(range(10, 20)) + list(range(10)):
+                f.write(f"{(START + timedelta(seconds=i)).isoformat()},T1,Czujnik,{i},C\n")
+        write_columnar(csv_path, col_path, block_rows=16)
+        self.assertTrue(all(b["sorted"] for b in read_footer(col_path)["blocks"]))
+        for load_numpy in (_load_numpy, lambda: None):
+            with patch("logger.columnar._load_numpy", side_effect=load_numpy):
+                rows = list(read_columnar(col_path, START + timedelta(seconds=3), START + timedelta(seconds=12)))
+            self.assertEqual(sorted(r["value"] for r in rows), [float(i) for i in range(3, 13)])
+
+    def test_dictionary_beyond_uint16(self):
+        csv_path = os.path.join(self.tmp, "many.csv")
+        col_path = os.path.join(self.tmp, "many" + COLUMNAR_SUFFIX)
+        with open(csv_path, "w", encoding="utf-8") as f:
+            f.write("timestamp,sensor_id,sensor_name,value,unit\n")
+            for i in range(70000):
+                f.write(f"{(START + timedelta(seconds=i)).isoformat()},S{i},Czujnik,{i},C\n")
+        write_columnar(csv_path, col_path, block_rows=10000)
+        self.assertEqual([b["code_type"] for b in read_footer(col_path)["blocks"]], ["H"] * 6 + ["I"])
+        rows = list(read_columnar(col_path, START, START + timedelta(days=1), "S69999"))
+        self.assertEqual([(r["sensor_id"], r["value"]) for r in rows], [("S69999", 69999.0)])
+        with patch("logger.columnar._load_numpy", return_value=None):
+            self.assertEqual(list(read_columnar(col_path, START, START + timedelta(days=1), "S69999")), rows)
+
+
+class TestBackgroundWriter(LoggerTestCase):
+    config = dict(LoggerTestCase.config, background_writer=True, flush_interval_ms=20, rotate_after_lines=31)
+
+    def test_log_reading_only_queues(self):
+        with patch.object(self.logger, "_flush_buffer") as flush:
+            self.logger.log_reading(START, "T1", "Czujnik T1", 1.0, "C")
+            self.assertEqual(self.logger._queue.qsize() + len(self.logger.buffer), 1)
+            self.logger.stop()
+        self.assertTrue(flush.called)
+
+    def test_rotation_and_archiving_in_background(self):
+        threads = []
+        finish_archive = self.logger._finish_archive
+        def record_thread(*args):
+            threads.append(threading.current_thread().name)
+            finish_archive(*args)
+        with patch.object(self.logger, "_finish_archive", side_effect=record_thread):
+            self.log(40)
+            self.logger.stop()
+        self.assertEqual(threads, ["LoggerArchiver"])
+        archives = os.listdir(self.logger.archive_dir)
+        self.assertEqual(len([a for a in archives if a.endswith(".zip")]), 1)
+        self.assertFalse([a for a in archives if a.endswith(".csv")])
+        self.assertEqual(len(list(self.logger.read_logs(START, START + timedelta(minutes=1)))), 40)
+
+    def test_staged_file_is_readable_and_resumed(self):
+        self.logger.stop()
+        self.logger.background_writer = False
+        self.logger.start()
+        self.log(20)
+        with patch.object(self.logger, "_submit_archive"):
+            self.logger._rotate()
+        self.logger.stop()
+        staged = [a for a in os.listdir(self.logger.archive_dir) if a.endswith(".csv")]
+        self.assertEqual(len(staged), 1)
+        self.assertEqual(len(list(self.logger.read_logs(START, START + timedelta(minutes=1), "T1"))), 10)
+        self.logger.start()
+        archives = os.listdir(self.logger.archive_dir)
+        self.assertFalse([a for a in archives if a.endswith(".csv")])
+        self.assertEqual(len([a for a in archives if a.endswith(".zip")]), 1)
+        self.assertEqual(len(list(self.logger.read_logs(START, START + timedelta(minutes=1), "T1"))), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
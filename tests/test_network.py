@@ -0,0 +1,533 @@
+import io
+import os
+import socket
+import tempfile
+import asyncio
+import time
+import threading
+import unittest
+from contextlib import redirect_stdout
+from datetime import datetime
+from unittest.mock import patch
+from network.client import NetworkClient
+from network.async_client import AsyncNetworkClient
+from network.batch import MessageBatcher, encode_batch, decode_batch
+from network.wire import BinaryEncoder, BinaryDecoder, HEADER, FORMAT_BINARY
+from network.framing import FrameBuffer, FrameTooLarge
+from network.spool import Spool
+from network.server.server import NetworkServer
+from network.server.async_server import AsyncNetworkServer
+from network.server.ingest import IngestionPipeline, readings_from_message
+from logger.logger import Logger
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+def start_test_server(server_class=NetworkServer, port=0, handler=None):
+    server = server_class()
+    server.port = port  # 0 - dowolny wolny port
+    if handler is not None:
+        server._handle_message = handler
+    server.config["ingest"] = {"sinks": ["aggregate"], "workers": 2}
+    thread = threading.Thread(target=server.start, daemon=True)
+    thread.start()
+    deadline = time.time() + 5
+    while not server.running and time.time() < deadline:
+        time.sleep(0.01)
+    return server, thread, server.sock.getsockname()[1]
+
+
+class TestPersistentClient(unittest.TestCase):
+    def setUp(self):
+        self._stdout = redirect_stdout(io.StringIO())
+        self._stdout.__enter__()
+        self.server, self.thread, port = start_test_server()
+        self.client = NetworkClient()
+        self.client.port = port
+        self.client.persistent = True
+        self.client.pipeline_window = 4
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+        self.thread.join(timeout=5)
+        self._stdout.__exit__(None, None, None)
+
+    def test_send_many_pipelines_on_one_socket(self):
+        self.assertTrue(self.client.send_many([{"i": i} for i in range(10)]))
+        sock = self.client.sock
+        self.assertIsNotNone(sock)
+        self.assertTrue(self.client.send({"i": 10}))
+        self.assertIs(self.client.sock, sock)
+
+    def test_batch_is_acknowledged_once(self):
+        received = []
+        self.server._handle_message = lambda message, addr: received.append(message) or True
+        self.assertTrue(self.client.send_batch([{"i": i, "unit": "C"} for i in range(5)]))
+        self.assertEqual(self.client._seq, 1)
+        self.assertEqual(received, [{"i": i, "unit": "C"} for i in range(5)])
+
+    def test_binary_format_is_negotiated(self):
+        received = []
+        self.server._handle_message = lambda message, addr: received.append(message) or True
+        self.client.wire_format = FORMAT_BINARY
+        self.assertTrue(self.client.send_batch([reading(i) for i in range(3)]))
+        self.assertIsNotNone(self.client._encoder)
+        self.assertEqual(received, [reading(i) for i in range(3)])
+
+    def test_reconnects_after_connection_loss(self):
+        self.assertTrue(self.client.send({"i": 1}))
+        self.client.sock.close()
+        self.assertTrue(self.client.send({"i": 2}))
+
+
+class TestFrameBuffer(unittest.TestCase):
+    def test_lines_split_across_chunks(self):
+        buffer = FrameBuffer(chunk_size=4)
+        buffer.feed(b'{"a": 1}\n{"b"')
+        self.assertEqual(buffer.next_line().tobytes(), b'{"a": 1}')
+        self.assertIsNone(buffer.next_line())
+        buffer.feed(b': 2}\n')
+        self.assertEqual(buffer.next_line().tobytes(), b'{"b": 2}')
+        self.assertEqual(buffer.pending(), 0)
+
+    def test_long_line_is_not_rescanned(self):
+        buffer = FrameBuffer(chunk_size=64)
+        for _ in range(200):
+            buffer.feed(b"x" * 100)
+            self.assertIsNone(buffer.next_line())
+            self.assertEqual(buffer._scan, buffer._end)  # przeszukane dane nie są czytane ponownie
+        buffer.feed(b"\r")
+        self.assertIsNone(buffer.next_line(b"\r\n"))
+        buffer.feed(b"\nabc")
+        self.assertEqual(len(buffer.next_line(b"\r\n")), 20000)
+        self.assertEqual(buffer.pending_bytes(), b"abc")
+
+    def test_length_prefixed_frames(self):
+        buffer = FrameBuffer()
+        frame = HEADER.pack(3, 1, 9) + b"abc"
+        buffer.feed(frame[:5])
+        self.assertIsNone(buffer.next_frame(HEADER))
+        buffer.feed(frame[5:] + frame)
+        for _ in range(2):
+            (length, kind, seq), payload = buffer.next_frame(HEADER)
+            self.assertEqual((length, kind, seq, payload.tobytes()), (3, 1, 9, b"abc"))
+
+    def test_max_frame_size(self):
+        buffer = FrameBuffer(max_frame_size=8)
+        buffer.feed(b"x" * 20)
+        with self.assertRaises(FrameTooLarge):
+            buffer.next_line()
+        buffer = FrameBuffer(max_frame_size=8)
+        buffer.feed(HEADER.pack(100, 1, 1))
+        with self.assertRaises(FrameTooLarge):
+            buffer.next_frame(HEADER)
+
+
+class TestSpool(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_read_commit_and_restart(self):
+        spool = Spool(self.tmp.name)
+        spool.append([{"i": i} for i in range(5)])
+        records, position = spool.read_batch(3)
+        self.assertEqual(records, [{"i": 0}, {"i": 1}, {"i": 2}])
+        spool.commit(position)
+        spool.close()
+
+        spool = Spool(self.tmp.name)
+        self.assertTrue(spool.has_pending())
+        records, position = spool.read_batch(10)
+        self.assertEqual(records, [{"i": 3}, {"i": 4}])
+        spool.commit(position)
+        self.assertFalse(spool.has_pending())
+        spool.close()
+
+    def test_torn_tail_is_truncated(self):
+        spool = Spool(self.tmp.name)
+        spool.append([{"i": 1}])
+        spool.close()
+        segment = [name for name in os.listdir(self.tmp.name) if name.startswith("segment-")][0]
+        with open(os.path.join(self.tmp.name, segment), 'ab') as f:
+            f.write(b"\x50\x00\x00\x00garbage")
+        spool = Spool(self.tmp.name)
+        spool.append([{"i": 2}])
+        self.assertEqual(spool.read_batch(10)[0], [{"i": 1}, {"i": 2}])
+        spool.close()
+
+    def test_disk_usage_is_bounded(self):
+        spool = Spool(self.tmp.name, max_bytes=2000, segment_bytes=500)
+        for i in range(100):
+            spool.append([{"i": i, "pad": "x" * 20}])
+        self.assertLessEqual(spool.size_bytes(), 2000)
+        self.assertGreater(spool.dropped_segments, 0)
+        records, _ = spool.read_batch(1000)
+        self.assertEqual(records[-1]["i"], 99)
+        spool.close()
+
+
+class TestClientSpool(unittest.TestCase):
+    def setUp(self):
+        self._stdout = redirect_stdout(io.StringIO())
+        self._stdout.__enter__()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.port = free_port()
+        self.client = NetworkClient()
+        self.client.port = self.port
+        self.client.persistent = True
+        self.client.timeout = 1.0
+        self.client.spool_dir = self.tmp.name
+        self.client.spool_backoff = 0.05
+        self.server = None
+
+    def tearDown(self):
+        self.client.close()
+        if self.server is not None:
+            self.server.stop()
+            self.thread.join(timeout=5)
+        self.tmp.cleanup()
+        self._stdout.__exit__(None, None, None)
+
+    def test_messages_are_spooled_and_replayed(self):
+        self.assertTrue(self.client.send({"i": 0}))
+        started = time.time()
+        for i in range(1, 10):
+            self.assertTrue(self.client.send({"i": i}))
+        self.assertLess(time.time() - started, 0.5)
+        self.assertTrue(self.client._spool.has_pending())
+
+        received = []
+        self.server, self.thread, _ = start_test_server(
+            port=self.port, handler=lambda message, addr: received.append(message["i"]) or True)
+        deadline = time.time() + 5
+        while len(received) < 10 and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(received, list(range(10)))
+
+    def test_only_undelivered_messages_are_spooled(self):
+        self.client.persistent = False
+        self.client.spool_backoff = 10.0
+        with patch.object(self.client, "_deliver_single", side_effect=lambda message, retries: message["i"] < 2):
+            self.assertTrue(self.client.send_many([{"i": i} for i in range(5)]))
+        self.client.close()
+        spool = Spool(self.tmp.name)
+        records, _ = spool.read_batch(10)
+        spool.close()
+        self.assertEqual(records, [{"i": 2}, {"i": 3}, {"i": 4}])
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.messages = [{
+            "type": "logger_event",
+            "event": "log_reading",
+            "details": {"sensor_id": f"T{i}", "value": i * 1.5, "filename": "a.csv", "buffer_size": 100}
+        } for i in range(5)]
+
+    def test_roundtrip_factors_out_common_keys(self):
+        frame = encode_batch(self.messages)
+        self.assertEqual(frame["common"]["details"], {"filename": "a.csv", "buffer_size": 100})
+        self.assertNotIn("filename", frame["items"][0]["details"])
+        self.assertEqual(decode_batch(frame), self.messages)
+
+    def test_batcher_flushes_after_max_messages(self):
+        flushed = []
+        batcher = MessageBatcher(flushed.append, max_messages=3, max_delay_ms=10000)
+        for message in self.messages:
+            batcher.add(message)
+        self.assertEqual(len(flushed), 1)
+        self.assertEqual(len(flushed[0]), 3)
+        batcher.flush()
+        self.assertEqual(len(flushed[1]), 2)
+
+    def test_batcher_flushes_after_delay(self):
+        flushed = []
+        batcher = MessageBatcher(flushed.append, max_messages=100, max_delay_ms=50)
+        batcher.add(self.messages[0])
+        time.sleep(0.2)
+        self.assertEqual(flushed, [[self.messages[0]]])
+
+
+def reading(i, sensor_id="T1"):
+    return {
+        "type": "logger_event",
+        "event": "log_reading",
+        "details": {
+            "timestamp": f"2025-05-26T12:00:{i:02d}.250000",
+            "sensor_id": sensor_id,
+            "sensor_name": "Temp",
+            "value": 20.0 + i,
+            "unit": "C"
+        }
+    }
+
+
+class TestBinaryWireFormat(unittest.TestCase):
+    def decode(self, decoder, frame):
+        length, kind, seq = HEADER.unpack_from(frame)
+        return seq, decoder.decode(kind, memoryview(frame)[HEADER.size:HEADER.size + length])
+
+    def test_readings_roundtrip(self):
+        encoder, decoder = BinaryEncoder(), BinaryDecoder()
+        batch = encode_batch([reading(i, f"S{i % 2}") for i in range(4)])
+        seq, records = self.decode(decoder, encoder.encode(batch, 7))
+        self.assertEqual(seq, 7)
+        self.assertEqual(records, [reading(i, f"S{i % 2}") for i in range(4)])
+        # drugi raz słownik czujników nie jest już przesyłany
+        frame = encoder.encode(reading(5, "S1"), 8)
+        self.assertEqual(self.decode(decoder, frame)[1], [reading(5, "S1")])
+        self.assertLess(len(frame), len(encoder.encode(reading(5, "S9"), 9)))
+
+    def test_reading_rows_roundtrip(self):
+        rows = [[reading(i)["details"]["timestamp"], f"S{i % 2}", "Czujnik", float(i), "C"] for i in range(4)]
+        message = {"type": "logger_event", "event": "log_readings", "details": {"readings": rows}}
+        length, kind, _ = HEADER.unpack_from(BinaryEncoder().encode(message, 1))
+        self.assertNotEqual(kind, 1)  # nie JSON
+        seq, records = self.decode(BinaryDecoder(), BinaryEncoder().encode(message, 1))
+        self.assertEqual(records, [message])
+
+    def test_failed_frame_leaves_dictionary_unchanged(self):
+        encoder, decoder = BinaryEncoder(), BinaryDecoder()
+        bad = reading(1, "S7")
+        bad["details"]["timestamp"] = "wczoraj"
+        self.assertEqual(self.decode(decoder, encoder.encode(bad, 1))[1], [bad])  # JSON
+        self.assertEqual(self.decode(decoder, encoder.encode(reading(2, "S7"), 2))[1], [reading(2, "S7")])
+        missing_id = reading(3)
+        del missing_id["details"]["sensor_id"]
+        self.assertEqual(self.decode(decoder, encoder.encode(missing_id, 3))[1], [missing_id])
+
+    def test_other_messages_fall_back_to_json(self):
+        message = {"type": "sensor_action", "action": "start_sensor"}
+        seq, records = self.decode(BinaryDecoder(), BinaryEncoder().encode(message, 1))
+        self.assertEqual(records, [message])
+
+
+class TestIngestion(unittest.TestCase):
+    def setUp(self):
+        self._stdout = redirect_stdout(io.StringIO())
+        self._stdout.__enter__()
+        self.server, self.thread, port = start_test_server()
+        self.client = NetworkClient()
+        self.client.port = port
+        self.client.persistent = True
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+        self.thread.join(timeout=5)
+        self._stdout.__exit__(None, None, None)
+
+    def test_readings_reach_aggregate_sink(self):
+        sink = self.server.pipeline.sinks[0]
+        self.assertTrue(self.client.send_batch([reading(i) for i in range(5)]))
+        deadline = time.time() + 5
+        while sink.snapshot().get("T1", {}).get("count") != 5 and time.time() < deadline:
+            time.sleep(0.01)
+        stats = sink.snapshot()["T1"]
+        self.assertEqual(stats["count"], 5)
+        self.assertEqual((stats["min"], stats["max"], stats["last"]), (20.0, 24.0, 24.0))
+
+    def test_reading_batch_event(self):
+        sink = self.server.pipeline.sinks[0]
+        rows = [[reading(i)["details"]["timestamp"], "H1", "Wilgotność", float(i), "%"] for i in range(3)]
+        self.assertTrue(self.client.send({"type": "logger_event", "event": "log_readings",
+                                          "details": {"readings": rows}}))
+        deadline = time.time() + 5
+        while sink.snapshot().get("H1", {}).get("count") != 3 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(sink.snapshot()["H1"]["sum"], 3.0)
+
+    def test_full_queue_is_not_acknowledged(self):
+        pipeline, full = self.server.pipeline, IngestionPipeline([], queue_size=1, workers=1)
+        self.server.pipeline = full  # bez wątków - kolejka się nie opróżnia
+        self.client.spool_dir = None
+        self.client.retries = 1
+        try:
+            self.assertTrue(self.client.send(reading(0)))
+            self.assertFalse(self.client.send(reading(1)))
+        finally:
+            self.server.pipeline = pipeline
+        self.assertGreaterEqual(full.dropped, 1)
+
+    def test_stop_with_stuck_worker(self):
+        pipeline = IngestionPipeline([], queue_size=1, workers=1)
+        self.assertTrue(pipeline.submit({}, "addr"))
+        started = time.time()
+        pipeline.stop(timeout=0.05)
+        self.assertLess(time.time() - started, 1.0)
+
+
+class TestAsyncServer(unittest.TestCase):
+    def setUp(self):
+        self._stdout = redirect_stdout(io.StringIO())
+        self._stdout.__enter__()
+        self.server, self.thread, port = start_test_server(AsyncNetworkServer)
+        self.client = NetworkClient()
+        self.client.port = port
+        self.client.persistent = True
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+        self.thread.join(timeout=5)
+        self._stdout.__exit__(None, None, None)
+
+    def test_many_frames_on_one_connection(self):
+        self.assertTrue(self.client.send_many([{"i": i} for i in range(100)]))
+        self.assertEqual(len(self.server._connections), 1)
+
+    def test_binary_frames(self):
+        received = []
+        self.server._handle_message = lambda message, addr: received.append(message) or True
+        self.client.wire_format = FORMAT_BINARY
+        self.assertTrue(self.client.send_many([reading(i) for i in range(10)]))
+        self.assertEqual(received, [reading(i) for i in range(10)])
+
+    def test_logger_batch_in_binary_frames(self):
+        # Ścieżka klienta: SensorScheduler -> Logger.log_readings -> jedno zdarzenie na takt
+        received = []
+        self.server._handle_message = lambda message, addr: received.append(message) or True
+        self.client.wire_format = FORMAT_BINARY
+        rows = Logger._rows_from_batch([(datetime(2025, 5, 26, 12, 0, i), "T1", "Temp", 20.0 + i, "C") for i in range(5)])
+        message = {"type": "logger_event", "event": "log_readings", "details": {"readings": rows}}
+        with patch.object(BinaryEncoder, "_encode_readings", autospec=True,
+                          side_effect=BinaryEncoder._encode_readings) as encode:
+            self.assertTrue(self.client.send_many([message]))
+        encode.assert_called()
+        self.assertEqual(readings_from_message(received[0]), readings_from_message(message))
+
+    def test_idle_connection_is_closed(self):
+        self.server.idle_timeout = 0.1
+        self.assertTrue(self.client.send({"i": 1}))
+        time.sleep(0.3)
+        self.assertEqual(len(self.server._connections), 0)
+
+    def test_stop_does_not_wait_for_accept_timeout(self):
+        started = time.time()
+        self.server.stop()
+        self.thread.join(timeout=5)
+        self.assertFalse(self.thread.is_alive())
+        self.assertLess(time.time() - started, 0.5)
+
+
+class TestAsyncClient(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._stdout = redirect_stdout(io.StringIO())
+        self._stdout.__enter__()
+
+    def tearDown(self):
+        self._stdout.__exit__(None, None, None)
+
+    def test_drop_oldest_when_queue_full(self):
+        client = AsyncNetworkClient()
+        client.queue_size = 2
+        client._queue = asyncio.Queue(maxsize=2)
+        for i in range(3):
+            self.assertTrue(client.send({"i": i}))
+        self.assertEqual(client.dropped, 1)
+        self.assertEqual(client._queue.get_nowait(), {"i": 1})
+
+    async def test_block_policy_keeps_sync_sends(self):
+        client = AsyncNetworkClient()
+        client.backpressure = "block"
+        client._queue = asyncio.Queue(maxsize=2)
+        client._loop = asyncio.get_running_loop()
+        for i in range(5):
+            self.assertTrue(client.send({"i": i}))
+        received = []
+        for _ in range(5):
+            received.append((await client._queue.get())["i"])
+        self.assertEqual(received, [0, 1, 2, 3, 4])
+        self.assertEqual(client.dropped, 0)
+
+    async def test_writer_survives_unencodable_message(self):
+        received = []
+        server, thread, port = start_test_server(handler=lambda message, addr: received.append(message.get("i")) or True)
+        client = AsyncNetworkClient()
+        client.port = port
+        client.connect()
+        client.send({"i": 0, "when": datetime.now()})  # datetime nie jest serializowalny do JSON
+        await asyncio.sleep(0.2)
+        client.send({"i": 1})
+        await client.aclose()
+        server.stop()
+        thread.join(timeout=5)
+        self.assertEqual(received, [None, 1, None])
+        self.assertEqual(client.dropped, 1)
+
+    async def test_writer_delivers_queued_messages(self):
+        server, thread, port = start_test_server()
+        client = AsyncNetworkClient()
+        client.port = port
+        client.connect()
+        for i in range(20):
+            client.send({"i": i})
+        await client.aclose()
+        server.stop()
+        thread.join(timeout=5)
+        self.assertTrue(client._queue.empty())
+        self.assertEqual(client.dropped, 0)
+
+    async def test_failed_batch_is_spooled_and_replayed(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        port = free_port()
+        client = AsyncNetworkClient()
+        client.port = port
+        client.timeout = 0.2
+        client.retries = 1
+        client.spill_dir = tmp.name
+        client.spool_backoff = 0.05
+        client.connect()
+        for i in range(5):
+            client.send({"i": i})
+        deadline = time.time() + 5
+        while client.spilled < 6 and time.time() < deadline:
+            await asyncio.sleep(0.02)
+        self.assertEqual((client.spilled, client.dropped), (6, 0))
+
+        received = []
+        server, thread, _ = start_test_server(
+            port=port, handler=lambda message, addr: received.append(message.get("i")) or True)
+        deadline = time.time() + 5
+        while len(received) < 6 and time.time() < deadline:
+            await asyncio.sleep(0.02)
+        client.close()
+        server.stop()
+        thread.join(timeout=5)
+        self.assertEqual(received, [None, 0, 1, 2, 3, 4])
+
+    async def test_spool_committed_only_after_delivery(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        spool = Spool(tmp.name)
+        spool.append([{"i": i} for i in range(3)])
+        spool.close()
+        client = AsyncNetworkClient()
+        client.port = free_port()
+        client.timeout = 0.2
+        client.retries = 1
+        client.spill_dir = tmp.name
+        client.spool_backoff = 0.05
+        with patch.object(client, "_deliver", wraps=client._deliver) as deliver:
+            client.connect()
+            deadline = time.time() + 5
+            while deliver.call_count < 2 and time.time() < deadline:
+                await asyncio.sleep(0.02)
+        client.close()
+        spool = Spool(tmp.name)
+        records, _ = spool.read_batch(10)
+        spool.close()
+        # Nieudane ponowienia nie zdejmują wiadomości ze spoola ani nie przenoszą ich na koniec
+        self.assertEqual(records[:3], [{"i": 0}, {"i": 1}, {"i": 2}])
+        self.assertEqual(records[3]["event"], "started connection")
+
+
+if __name__ == "__main__":
+    unittest.main()
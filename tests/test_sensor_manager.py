@@ -3,7 +3,14 @@ from unittest.mock import MagicMock, patch, mock_open
 from sensors.sensor_manager import SensorManager
 from sensors.temperature_sensor import TemperatureSensor
 from sensors.humidity_sensor import HumiditySensor
+from sensors.scheduler import SensorScheduler
+from sensors.snapshot import SnapshotChannel
+from sensors.ring_buffer import RingBuffer
+import os
 import json
+import shutil
+import tempfile
+import asyncio
 
 SAMPLE_CONFIG = json.dumps([
     {
@@ -85,5 +92,200 @@ class TestSensorManager(unittest.TestCase):
         self.manager.stop_sensor(sensor.sensor_id)
         sensor.stop.assert_called_once()
 
+    def test_batch_callbacks_require_scheduler(self):
+        with self.assertRaises(ValueError):
+            self.manager.register_callbacks(MagicMock(), batch=True)
+
+    def test_batch_callbacks_registered_on_scheduler(self):
+        scheduler = SensorScheduler()
+        manager = SensorManager(self.config_path, scheduler=scheduler)
+        logger = MagicMock()
+        manager.register_callbacks(logger, batch=True)
+        self.assertTrue(all(sensor._scheduler is scheduler for sensor in manager.sensors))
+        self.assertTrue(all(sensor._callback is None for sensor in manager.sensors))
+        self.assertEqual(scheduler._callbacks, [logger.log_readings])
+
+class TestSensorRegistry(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        config = [
+            {"id": f"T{i}", "type": "temperature", "name": f"Temp {i}", "unit": "C",
+             "min_value": -10, "max_value": 40, "frequency": 10} for i in range(3)
+        ] + [
+            {"id": "H1", "type": "humidity", "name": "Hum", "unit": "%",
+             "min_value": 10, "max_value": 90, "frequency": 10}
+        ]
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        self.config_path = os.path.join(tmp, "sensors.json")
+        with open(self.config_path, "w", encoding="utf-8") as f:
+            json.dump(config, f)
+        self.manager = SensorManager(self.config_path)
+
+    def tearDown(self):
+        self.manager.stop_all()
+
+    def test_lookup_follows_id_change(self):
+        sensor = self.manager.get_sensor("T1")
+        sensor.edit_values(sensor_id="T9", unit="K")
+        self.assertIsNone(self.manager.get_sensor("T1"))
+        self.assertIs(self.manager.get_sensor("T9"), sensor)
+        self.assertEqual([s.sensor_id for s in self.manager.sensors], ["T0", "T9", "T2", "H1"])
+        self.assertEqual(self.manager.sensors.by_unit("K"), [sensor])
+        with self.assertRaises(ValueError):
+            sensor.edit_values(sensor_id="T0")
+        self.assertEqual(sensor.sensor_id, "T9")
+
+    async def test_secondary_indexes_and_bulk_start_stop(self):
+        self.assertEqual(len(self.manager.sensors.by_type("temperature")), 3)
+        started = self.manager.start_where(lambda s: s.type == "temperature")
+        self.assertEqual(len(started), 3)
+        self.assertEqual(set(self.manager.sensors.active()), set(self.manager.sensors.by_type("temperature")))
+        self.manager.stop_where(lambda s: s.sensor_id != "T0")
+        self.assertEqual([s.sensor_id for s in self.manager.sensors.active()], ["T0"])
+
+class TestConfigReload(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.config = [
+            {"id": f"T{i}", "type": "temperature", "name": f"Temp {i}", "unit": "C",
+             "min_value": -10, "max_value": 40, "frequency": 10} for i in range(3)
+        ]
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        self.config_path = os.path.join(tmp, "sensors.json")
+        self.write_config()
+        self.manager = SensorManager(self.config_path)
+        self.logger = MagicMock()
+        self.manager.register_callbacks(self.logger)
+
+    def tearDown(self):
+        self.manager.stop_watching()
+        self.manager.stop_all()
+
+    def write_config(self, content=None):
+        with open(self.config_path, "w", encoding="utf-8") as f:
+            f.write(content if content is not None else json.dumps(self.config))
+
+    async def test_only_differences_are_applied(self):
+        self.manager.start_all()
+        kept = self.manager.get_sensor("T0")
+        kept.history.append(1.0, 21.5)
+        self.config[1]["max_value"] = 50
+        del self.config[2]
+        self.config.append({"id": "L1", "type": "light", "name": "Light", "unit": "lux",
+                            "min_value": 0, "max_value": 1000, "frequency": 10})
+        self.write_config()
+        with patch.object(kept, "edit_values") as edit_kept:
+            result = self.manager.reload_config()
+        self.assertEqual(result, {"added": ["L1"], "removed": ["T2"], "updated": ["T1"]})
+        edit_kept.assert_not_called()
+        self.assertIs(self.manager.get_sensor("T0"), kept)
+        self.assertEqual(len(kept.history), 1)
+        self.assertEqual(self.manager.get_sensor("T1").max_value, 50.0)
+        self.assertIsNone(self.manager.get_sensor("T2"))
+        added = self.manager.get_sensor("L1")
+        self.assertTrue(added.active)
+        self.assertIsNotNone(added._callback)
+
+    async def test_invalid_config_keeps_running_set(self):
+        self.write_config("[{\"id\": \"T0\", ")
+        self.assertIsNone(self.manager.reload_config())
+        del self.config[0]["frequency"]
+        self.write_config()
+        self.assertIsNone(self.manager.reload_config())
+        self.assertEqual([s.sensor_id for s in self.manager.sensors], ["T0", "T1", "T2"])
+
+    async def test_invalid_value_applies_nothing(self):
+        del self.config[2]
+        self.config[1]["min_value"] = "abc"
+        self.write_config()
+        self.assertIsNone(self.manager.reload_config())
+        self.write_config("[1, 2]")
+        self.assertIsNone(self.manager.reload_config())
+        self.assertEqual([s.sensor_id for s in self.manager.sensors], ["T0", "T1", "T2"])
+        self.assertEqual(self.manager.get_sensor("T1").min_value, -10)
+
+    async def test_watch_survives_bad_file(self):
+        self.manager.watch_config(interval=0.02)
+        await asyncio.sleep(0.05)
+        with patch.object(self.manager, "reload_config", side_effect=RuntimeError("błąd")):
+            self.write_config()
+            os.utime(self.config_path, (0, 0))
+            await asyncio.sleep(0.1)
+        self.config.append(dict(self.config[0], id="T3"))
+        self.write_config()
+        os.utime(self.config_path, (1, 1))
+        await asyncio.sleep(0.1)
+        self.assertIsNotNone(self.manager.get_sensor("T3"))
+
+    async def test_large_config_single_change(self):
+        self.config = [dict(self.config[0], id=f"T{i}") for i in range(10000)]
+        self.write_config()
+        self.manager.reload_config()
+        self.config[5000]["name"] = "Zmieniony"
+        self.write_config()
+        result = self.manager.reload_config()
+        self.assertEqual(result, {"added": [], "removed": [], "updated": ["T5000"]})
+
+    async def test_watch_reloads_on_change(self):
+        self.manager.watch_config(interval=0.02)
+        await asyncio.sleep(0.05)
+        self.config.append(dict(self.config[0], id="T3"))
+        self.write_config()
+        os.utime(self.config_path, (0, 0))  # inna data modyfikacji niezależnie od rozdzielczości zegara
+        await asyncio.sleep(0.1)
+        self.assertIsNotNone(self.manager.get_sensor("T3"))
+
+class TestSnapshotChannel(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        with patch.object(SensorManager, "load_config"):
+            self.manager = SensorManager("unused.json")
+        for i in range(3):
+            self.manager._add_sensor({"id": f"T{i}", "type": "temperature", "name": f"Temp {i}", "unit": "C",
+                                      "min_value": -10, "max_value": 40, "frequency": 10})
+        self.channel = SnapshotChannel()
+
+    def tearDown(self):
+        self.manager.stop_publishing()
+
+    def test_snapshot_is_independent_copy(self):
+        sensor = self.manager.get_sensor("T0")
+        sensor.history.append(1.0, 20.0)
+        self.channel.publish(self.manager.sensors)
+        sensor.history.append(2.0, 21.0)
+        sensor.edit_values(name="Nowa")
+        snapshot = self.channel.get("T0")
+        self.assertEqual(snapshot.name, "Temp 0")
+        self.assertEqual(snapshot.history.total, 1)
+        self.assertEqual(list(snapshot.history.window()[1]), [20.0])
+
+    def test_unchanged_sensors_are_not_copied(self):
+        self.channel.publish(self.manager.sensors)
+        first = self.channel.latest()
+        self.manager.get_sensor("T1").history.append(1.0, 5.0)
+        version = self.channel.publish(self.manager.sensors)
+        second = self.channel.latest()
+        self.assertEqual(version, 2)
+        self.assertIs(second["T0"], first["T0"])
+        self.assertIsNot(second["T1"], first["T1"])
+        self.assertIsNot(second, first)
+
+    def test_only_tail_is_copied(self):
+        sensor = self.manager.get_sensor("T0")
+        sensor.history = RingBuffer(100000)
+        for i in range(100000):
+            sensor.history.append(float(i), float(i))
+        channel = SnapshotChannel(history_points=50)
+        channel.publish(self.manager.sensors)
+        history = channel.get("T0").history
+        self.assertEqual((len(history), history.total), (50, 100000))
+        self.assertEqual(list(history.window(2)[1]), [99998.0, 99999.0])
+
+    async def test_publish_loop(self):
+        self.manager.publish_snapshots(self.channel, interval=0.01)
+        self.assertEqual(set(self.channel.latest()), {"T0", "T1", "T2"})
+        self.manager.get_sensor("T2").history.append(1.0, 7.0)
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.channel.get("T2").history.total, 1)
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,11 +1,14 @@
 import unittest
 import asyncio
+import datetime
 from unittest.mock import patch
 from sensors.sensor import Sensor
 from sensors.temperature_sensor import TemperatureSensor
 from sensors.humidity_sensor import HumiditySensor
 from sensors.pressure_sensor import PressureSensor
 from sensors.light_sensor import LightSensor
+from sensors.ring_buffer import RingBuffer
+from sensors.scheduler import SensorScheduler
 
 class TestSensorBase(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
@@ -116,5 +119,133 @@ class TestLightSensor(unittest.IsolatedAsyncioTestCase):
             self.assertGreaterEqual(val, 0)
             self.assertLessEqual(val, 1100)
 
+class TestRingBuffer(unittest.TestCase):
+    def setUp(self):
+        self.buffer = RingBuffer(4)
+        for i in range(6):
+            self.buffer.append(1000.0 + i, float(i))
+
+    def test_keeps_last_capacity_samples(self):
+        self.assertEqual(len(self.buffer), 4)
+        timestamps, values = self.buffer.window()
+        self.assertEqual(list(values), [2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(list(timestamps), [1002.0, 1003.0, 1004.0, 1005.0])
+        self.assertEqual(list(self.buffer.window(2)[1]), [4.0, 5.0])
+
+    def test_window_is_zero_copy_view(self):
+        timestamps, values = self.buffer.window()
+        self.assertIsInstance(values, memoryview)
+        self.assertIs(values.obj, self.buffer._values)
+
+    def test_since(self):
+        timestamps, values = self.buffer.since(1003.5)
+        self.assertEqual(list(values), [4.0, 5.0])
+
+    def test_sensor_history(self):
+        sensor = Sensor("1", "Generic", "unit", 0, 100, history_size=3)
+        for i in range(5):
+            sensor.history.append(datetime.datetime(2025, 5, 26, 12, 0, i).timestamp(), float(i))
+        self.assertEqual(sensor.get_history(), [(datetime.datetime(2025, 5, 26, 12, 0, i), float(i)) for i in (2, 3, 4)])
+        since = datetime.datetime(2025, 5, 26, 12, 0, 3)
+        self.assertEqual([v for _, v in sensor.get_history(since=since)], [3.0, 4.0])
+        timestamps, values = sensor.get_history(as_arrays=True)
+        self.assertEqual(list(values), [2.0, 3.0, 4.0])
+
+class TestSensorScheduler(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.scheduler = SensorScheduler()
+        self.batches = []
+        self.scheduler.register_callback(self.batches.append)
+        self.fast = [Sensor(f"F{i}", "Fast", "unit", 0, 100, frequency=0.05) for i in range(3)]
+        self.slow = Sensor("S1", "Slow", "unit", 0, 100, frequency=0.1)
+        for sensor in self.fast + [self.slow]:
+            self.scheduler.attach(sensor)
+
+    def tearDown(self):
+        self.scheduler.close()
+
+    async def test_one_batch_per_tick_aligned_to_clock(self):
+        for sensor in self.fast + [self.slow]:
+            sensor.start()
+        self.assertTrue(all(sensor._task is None for sensor in self.fast))
+        await asyncio.sleep(0.33)
+        for sensor in self.fast + [self.slow]:
+            sensor.stop()
+        self.assertGreaterEqual(len(self.batches), 5)
+        for batch in self.batches:
+            timestamps = {timestamp for timestamp, *_ in batch}
+            self.assertEqual(len(timestamps), 1)
+            ticks = timestamps.pop().timestamp() / 0.05
+            self.assertAlmostEqual(ticks, round(ticks), places=3)
+            self.assertTrue({"F0", "F1", "F2"} <= {sensor_id for _, sensor_id, *_ in batch})
+        slow_ticks = [b for b in self.batches if any(r[1] == "S1" for r in b)]
+        self.assertAlmostEqual(len(slow_ticks), len(self.batches) / 2, delta=1)
+        self.assertEqual(len(self.fast[0].history), len(self.batches))
+
+    async def test_stopped_sensor_is_not_sampled(self):
+        self.fast[0].start()
+        self.fast[1].start()
+        await asyncio.sleep(0.12)
+        self.fast[1].stop()
+        self.batches.clear()
+        await asyncio.sleep(0.12)
+        self.fast[0].stop()
+        sampled = {sensor_id for batch in self.batches for _, sensor_id, *_ in batch}
+        self.assertEqual(sampled, {"F0"})
+
+    async def test_per_sensor_callback_still_called(self):
+        readings = []
+        self.slow.register_callback(lambda *reading: readings.append(reading))
+        self.slow.start()
+        await asyncio.sleep(0.25)
+        self.slow.stop()
+        self.assertGreaterEqual(len(readings), 2)
+        self.assertEqual(readings[0][1], "S1")
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class TestBatchSampling(unittest.TestCase):
+    START_TS = datetime.datetime(2025, 5, 26, 0, 0).timestamp()
+
+    def setUp(self):
+        self.sensors = [
+            TemperatureSensor("temp1", "Temp", "C", -10, 40),
+            HumiditySensor("hum1", "Humidity", "%", 30, 90),
+            PressureSensor("pres1", "Pressure", "hPa", 980, 1050),
+            LightSensor("light1", "Light", "lux", 0, 1000),
+        ]
+
+    @unittest.skipIf(numpy is not None, "numpy jest zainstalowany")
+    def test_requires_numpy(self):
+        with self.assertRaises(ImportError):
+            self.sensors[0].read_values(10)
+
+    @unittest.skipUnless(numpy is not None, "wymaga numpy")
+    def test_shapes_and_ranges(self):
+        limits = {"temp1": (-15, 45), "hum1": (25, 95), "pres1": (970, 1060), "light1": (0, 1100)}
+        for sensor in self.sensors:
+            timestamps, values = sensor.read_values(24 * 60, start_ts=self.START_TS, step=60, seed=1)
+            self.assertEqual(values.shape, (24 * 60,))
+            self.assertEqual(timestamps[1] - timestamps[0], 60)
+            low, high = limits[sensor.sensor_id]
+            self.assertGreaterEqual(values.min(), low)
+            self.assertLessEqual(values.max(), high)
+            self.assertEqual(sensor.last_value, values[-1])
+
+    @unittest.skipUnless(numpy is not None, "wymaga numpy")
+    def test_seed_is_reproducible(self):
+        for sensor in self.sensors:
+            _, first = sensor.read_values(1000, start_ts=self.START_TS, step=1, seed=42)
+            _, second = sensor.read_values(1000, start_ts=self.START_TS, step=1, seed=42)
+            numpy.testing.assert_array_equal(first, second)
+
+    @unittest.skipUnless(numpy is not None, "wymaga numpy")
+    def test_light_is_zero_at_night(self):
+        _, values = self.sensors[3].read_values(5 * 60, start_ts=self.START_TS, step=60, seed=3)
+        self.assertLessEqual(values.max(), 100)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def loaded_modules(module):
+    # Moduły załadowane przez import w świeżym interpreterze
+    code = f"import sys, {module}; print(' '.join(sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+class TestLazyImports(unittest.TestCase):
+    def test_headless_client_skips_gui_stack(self):
+        modules = loaded_modules("start_client")
+        self.assertNotIn("matplotlib", modules)
+        self.assertNotIn("tkinter", modules)
+        self.assertNotIn("unittest", modules)
+
+    def test_gui_defers_matplotlib(self):
+        try:
+            import tkinter  # noqa: F401
+        except ImportError:
+            self.skipTest("brak tkinter")
+        self.assertNotIn("matplotlib", loaded_modules("gui.gui"))
+
+if __name__ == "__main__":
+    unittest.main()